@@ -2,14 +2,28 @@
 Aplicación Flask - Tier 2: Lógica de Negocio
 Inicializa la aplicación y configura las rutas
 """
-import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 from app.config.database import init_db
+from app.config.settings import AppSettings
+from app.commands import register_commands
+from app.admission import init_admission
+from app.compression import init_compression
+from app.instrumentation import init_instrumentation
+from app.jobs import init_jobs
+from app.repositories.cache import init_cache
+from app.repositories.change_log_repository import init_change_log
+from app.repositories.idempotency_repository import init_idempotency
+from app.repositories.versioning import init_versioning
 from app.controllers.empresa_controller import empresa_bp
 from app.controllers.servicio_controller import servicio_bp
 from app.controllers.contrato_controller import contrato_bp
+from app.controllers.cache_controller import cache_bp
+from app.controllers.reporte_controller import reporte_bp
+from app.controllers.metrics_controller import metrics_bp
+from app.controllers.change_controller import change_bp
+from app.controllers.job_controller import job_bp
 
 # Cargar variables de entorno desde archivo .env
 load_dotenv()
@@ -18,27 +32,37 @@ def create_app():
     """Factory function para crear la aplicación Flask"""
     app = Flask(__name__)
     
-    # Configuración - Usar variables de entorno o valores por defecto
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv(
-        'SQLALCHEMY_DATABASE_URI',
-        'sqlite:///limpieza_empresas.db'
-    )
+    # Configuración - Variables de entorno o valores por defecto (app/config/settings.py)
+    settings = AppSettings.from_env()
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    app.config.update(settings.to_config())
     
     # Configurar CORS - Permitir orígenes desde variables de entorno
-    cors_origins = os.getenv('CORS_ORIGINS', 'http://localhost:3001').split(',')
     CORS(app, resources={
-        r"/api/*": {"origins": cors_origins}
+        r"/api/*": {"origins": app.config['CORS_ORIGINS'], "expose_headers": ["ETag", "Last-Modified", "Server-Timing", "Idempotent-Replayed", "Retry-After", "Location"]}
     })
     
-    # Inicializar base de datos
+    # Inicializar base de datos y caché de catálogos
     init_db(app)
+    init_cache(app)
+    init_idempotency(app)
+    init_versioning(app)
+    init_change_log(app)
+    init_instrumentation(app)
+    init_admission(app)
+    init_compression(app)
+    init_jobs(app)
     
     # Registrar blueprints (rutas)
     app.register_blueprint(empresa_bp)
     app.register_blueprint(servicio_bp)
     app.register_blueprint(contrato_bp)
+    app.register_blueprint(cache_bp)
+    app.register_blueprint(reporte_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(change_bp)
+    app.register_blueprint(job_bp)
+    register_commands(app)
     
     @app.route('/')
     def index():
@@ -0,0 +1,255 @@
+"""
+Control de admisión - Tier 2: Lógica de Negocio
+Limita las peticiones antes de que lleguen a los servicios:
+- Límite de tasa por cliente (cubo de fichas), identificado por la IP o por la
+  cabecera de API key si su valor está en RATE_LIMIT_API_KEYS (una clave que no
+  se comprueba la elegiría el propio cliente); se configura por blueprint. Al
+  agotarse responde 429 con Retry-After.
+- Límite de concurrencia: como máximo ADMISSION_MAX_CONCURRENT peticiones en
+  curso por proceso (por defecto, el tamaño máximo del pool de conexiones, o
+  DEFAULT_MAX_CONCURRENT si el motor no tiene pool acotado, p. ej. SQLite). Una
+  petición espera hasta ADMISSION_QUEUE_TIMEOUT segundos a que quede un hueco y
+  si no, responde 503 con Retry-After, antes de que se agote el pool.
+El estado (peticiones en curso, rechazos, clientes) se publica en /metrics.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import g, jsonify, make_response, request
+
+# Blueprints que no se limitan nunca (las métricas deben poder leerse bajo carga)
+EXEMPT_BLUEPRINTS = frozenset({'metrics'})
+# Endpoints de larga duración que no ocupan hueco de concurrencia (tienen su propio límite)
+LONG_LIVED_ENDPOINTS = frozenset({'change.stream_changes'})
+# Peticiones en curso por proceso cuando el motor no define pool_size (SQLite)
+DEFAULT_MAX_CONCURRENT = 64
+
+
+def parse_rate(valor):
+    """'20/40' -> (20.0 peticiones por segundo, ráfaga de 40); '' u 'off' -> None"""
+    valor = (valor or '').strip().lower()
+    if valor in ('', '0', 'off', 'none'):
+        return None
+    tasa, _, rafaga = valor.partition('/')
+    tasa = float(tasa)
+    rafaga = int(rafaga) if rafaga else max(1, math.ceil(tasa))
+    if tasa <= 0 or rafaga <= 0:
+        raise ValueError(f'Límite de tasa no válido: {valor}')
+    return tasa, rafaga
+
+
+def parse_blueprint_rates(valor):
+    """'contrato=10/20,reporte=off' -> {'contrato': (10.0, 20), 'reporte': None}"""
+    limites = {}
+    for parte in (valor or '').split(','):
+        if parte.strip():
+            blueprint, _, limite = parte.partition('=')
+            limites[blueprint.strip()] = parse_rate(limite)
+    return limites
+
+
+class RateLimiter:
+    """Cubos de fichas por cliente: `tasa` fichas por segundo hasta un máximo de `rafaga`"""
+
+    def __init__(self, tasa, rafaga, max_clients=10000, clock=time.monotonic):
+        self.tasa = tasa
+        self.rafaga = rafaga
+        self.max_clients = max_clients
+        self._clock = clock
+        # cliente -> (fichas, instante de la última recarga); orden LRU para acotar la memoria
+        self._cubos = OrderedDict()
+        self._lock = threading.Lock()
+        self.permitidas = 0
+        self.rechazadas = 0
+
+    def acquire(self, cliente):
+        """Consume una ficha; devuelve None si se admite o los segundos hasta la siguiente ficha"""
+        ahora = self._clock()
+        with self._lock:
+            fichas, ultima = self._cubos.pop(cliente, (self.rafaga, ahora))
+            fichas = min(self.rafaga, fichas + (ahora - ultima) * self.tasa)
+            if fichas >= 1:
+                self._cubos[cliente] = (fichas - 1, ahora)
+                self.permitidas += 1
+                espera = None
+            else:
+                self._cubos[cliente] = (fichas, ahora)
+                self.rechazadas += 1
+                espera = (1 - fichas) / self.tasa
+            while len(self._cubos) > self.max_clients:
+                self._cubos.popitem(last=False)
+        return espera
+
+    def clients(self):
+        return len(self._cubos)
+
+
+class ConcurrencyLimiter:
+    """Semáforo de peticiones en curso con contadores para las métricas"""
+
+    def __init__(self, max_concurrent):
+        self.max_concurrent = max_concurrent
+        self._semaforo = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.en_curso = 0
+        self.rechazadas = 0
+
+    def acquire(self, timeout=0):
+        admitida = self._semaforo.acquire(timeout=timeout) if timeout > 0 else self._semaforo.acquire(blocking=False)
+        with self._lock:
+            if admitida:
+                self.en_curso += 1
+            else:
+                self.rechazadas += 1
+        return admitida
+
+    def release(self):
+        with self._lock:
+            self.en_curso -= 1
+        self._semaforo.release()
+
+
+class AdmissionController:
+    """Límites de tasa por blueprint y de concurrencia por proceso"""
+
+    def __init__(self, por_defecto=None, por_blueprint=None, max_concurrent=0, queue_timeout=1.0,
+                 key_header='X-API-Key', api_keys=(), max_clients=10000, clock=time.monotonic):
+        self.por_defecto = por_defecto
+        self.por_blueprint = dict(por_blueprint or {})
+        self.queue_timeout = queue_timeout
+        self.key_header = key_header
+        self.api_keys = frozenset(api_keys)
+        self._max_clients = max_clients
+        self._clock = clock
+        self._limitadores = {}
+        self._lock = threading.Lock()
+        self.concurrencia = ConcurrencyLimiter(max_concurrent) if max_concurrent > 0 else None
+
+    def client_key(self, api_key, remote_addr):
+        """
+        Identificador del cliente: su API key si es una de las configuradas, si no su IP.
+
+        Una clave desconocida se ignora: si no, cada valor nuevo de la cabecera tendría un
+        cubo lleno y desalojaría del LRU los cubos de los demás clientes.
+        """
+        return f'key:{api_key}' if api_key and api_key in self.api_keys else f'ip:{remote_addr}'
+
+    def _limitador(self, blueprint):
+        limitador = self._limitadores.get(blueprint)
+        if limitador is None:
+            limite = self.por_blueprint.get(blueprint, self.por_defecto)
+            if limite is None:
+                return None
+            with self._lock:
+                limitador = self._limitadores.setdefault(
+                    blueprint, RateLimiter(*limite, max_clients=self._max_clients, clock=self._clock)
+                )
+        return limitador
+
+    def check_rate(self, blueprint, cliente):
+        """None si la petición cabe en el límite del blueprint; si no, segundos hasta poder reintentar"""
+        if blueprint is None or blueprint in EXEMPT_BLUEPRINTS:
+            return None
+        limitador = self._limitador(blueprint)
+        return limitador.acquire(cliente) if limitador is not None else None
+
+    def limits_concurrency(self, blueprint, endpoint=None):
+        """Indica si las peticiones del blueprint (o endpoint) ocupan un hueco de concurrencia"""
+        return (self.concurrencia is not None and blueprint not in EXEMPT_BLUEPRINTS
+                and endpoint not in LONG_LIVED_ENDPOINTS)
+
+    def enter(self, timeout=None):
+        """Reserva un hueco de concurrencia; False si no lo hubo en el plazo de espera"""
+        return self.concurrencia.acquire(self.queue_timeout if timeout is None else timeout)
+
+    def leave(self):
+        self.concurrencia.release()
+
+    def render(self):
+        """Líneas en formato de exposición de Prometheus"""
+        lineas = []
+        if self.concurrencia is not None:
+            lineas += [
+                '# HELP admission_in_flight Peticiones en curso en este proceso',
+                '# TYPE admission_in_flight gauge',
+                f'admission_in_flight {self.concurrencia.en_curso}',
+                '# HELP admission_max_concurrent Máximo de peticiones en curso admitidas',
+                '# TYPE admission_max_concurrent gauge',
+                f'admission_max_concurrent {self.concurrencia.max_concurrent}',
+                '# HELP admission_rejected_total Peticiones rechazadas con 503 por el límite de concurrencia',
+                '# TYPE admission_rejected_total counter',
+                f'admission_rejected_total {self.concurrencia.rechazadas}',
+            ]
+        limitadores = sorted(self._limitadores.items())
+        if limitadores:
+            for nombre, tipo, ayuda, campo in (
+                ('rate_limit_allowed_total', 'counter', 'Peticiones admitidas por el límite de tasa', 'permitidas'),
+                ('rate_limit_rejected_total', 'counter', 'Peticiones rechazadas con 429', 'rechazadas'),
+            ):
+                lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} {tipo}']
+                lineas += [f'{nombre}{{blueprint="{bp}"}} {getattr(limitador, campo)}'
+                           for bp, limitador in limitadores]
+            lineas += ['# HELP rate_limit_clients Clientes con cubo de fichas activo', '# TYPE rate_limit_clients gauge']
+            lineas += [f'rate_limit_clients{{blueprint="{bp}"}} {limitador.clients()}'
+                       for bp, limitador in limitadores]
+        return lineas
+
+
+def _rechazo(status, mensaje, espera):
+    response = make_response(jsonify({'error': mensaje}), status)
+    response.headers['Retry-After'] = str(max(1, math.ceil(espera)))
+    return response
+
+
+def init_admission(app):
+    """
+    Crea el controlador de admisión según RATE_LIMIT_* y ADMISSION_* y registra los hooks.
+
+    Debe llamarse después de init_instrumentation para que los rechazos también se midan.
+    """
+    por_defecto = parse_rate(app.config.get('RATE_LIMIT_DEFAULT'))
+    por_blueprint = parse_blueprint_rates(app.config.get('RATE_LIMIT_BLUEPRINTS'))
+    max_concurrent = app.config.get('ADMISSION_MAX_CONCURRENT')
+    if max_concurrent is None:
+        opciones = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        if 'pool_size' in opciones:
+            max_concurrent = opciones['pool_size'] + opciones.get('max_overflow', 0)
+        else:
+            max_concurrent = DEFAULT_MAX_CONCURRENT
+    if por_defecto is None and not any(por_blueprint.values()) and max_concurrent <= 0:
+        app.extensions['admission'] = None
+        return None
+
+    controller = AdmissionController(
+        por_defecto, por_blueprint, max_concurrent,
+        queue_timeout=app.config.get('ADMISSION_QUEUE_TIMEOUT', 1.0),
+        key_header=app.config.get('RATE_LIMIT_KEY_HEADER', 'X-API-Key'),
+        api_keys=[clave.strip() for clave in app.config.get('RATE_LIMIT_API_KEYS', '').split(',') if clave.strip()],
+        max_clients=app.config.get('RATE_LIMIT_MAX_CLIENTS', 10000)
+    )
+    app.extensions['admission'] = controller
+    registry = app.extensions.get('metrics')
+    if registry is not None:
+        registry.add_collector(controller.render)
+
+    @app.before_request
+    def _admitir():
+        if request.method == 'OPTIONS':
+            return None
+        cliente = controller.client_key(request.headers.get(controller.key_header or ''), request.remote_addr)
+        espera = controller.check_rate(request.blueprint, cliente)
+        if espera is not None:
+            return _rechazo(429, 'Demasiadas peticiones; reintente más tarde', espera)
+        if controller.limits_concurrency(request.blueprint, request.endpoint):
+            if not controller.enter():
+                return _rechazo(503, 'Servidor ocupado; reintente más tarde', 1)
+            g.admission_slot = True
+        return None
+
+    @app.teardown_request
+    def _liberar(exc):
+        if g.pop('admission_slot', False):
+            controller.leave()
+
+    return controller
@@ -0,0 +1,398 @@
+"""
+Aplicación ASGI - Tier 2: Lógica de Negocio
+Modo de ejecución alternativo sobre un servidor ASGI (por ejemplo uvicorn).
+Los listados, detalles y altas de empresas, servicios y contratos se atienden
+de forma asíncrona con los repositorios asyncio, usando las mismas
+validaciones, serializadores y ETags que los controladores Flask. El resto de
+rutas (modificaciones, borrados, lotes, reportes...) se delegan a la
+aplicación Flask mediante un adaptador WSGI que las ejecuta en un hilo.
+
+Requiere las dependencias opcionales de requirements-async.txt.
+"""
+import json
+import math
+import re
+from datetime import date
+from urllib.parse import parse_qsl
+from flask import current_app
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_accept_header, parse_etags
+from app import create_app
+from app.config.async_database import create_async_db
+from app.controllers.conditional import collection_etag, row_etag, validator_headers
+from app.controllers.serialization import dumps, rows_payload, dicts_floats_ok
+from app.instrumentation import instrument_engine, record, start_timing, stop_timing
+from app.repositories.async_repository import AsyncEmpresaRepository, AsyncServicioRepository, AsyncContratoRepository
+from app.repositories.versioning import get_version_store
+from app.services.empresa_service import EmpresaService
+from app.services.servicio_service import ServicioService
+from app.services.contrato_service import ContratoService
+from app.services.pagination import parse_page_args, page_response
+
+
+class AsgiRequest:
+    """Datos de una petición HTTP ASGI con la interfaz que usan los servicios (args, headers)"""
+
+    def __init__(self, scope, body=b''):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query_string = scope.get('query_string', b'')
+        self.args = MultiDict(parse_qsl(self.query_string.decode('utf-8', 'replace'), keep_blank_values=True))
+        self.headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+        self.remote_addr = (scope.get('client') or ('',))[0]
+        self.body = body
+
+    def get_json(self):
+        try:
+            return json.loads(self.body) if self.body else None
+        except ValueError:
+            raise ValueError('El cuerpo de la petición no es un JSON válido')
+
+
+class AsgiResponse:
+    """Respuesta HTTP: estado, cuerpo en bytes y cabeceras"""
+
+    def __init__(self, status, body=b'', headers=None):
+        self.status = status
+        self.body = body
+        self.headers = {'Content-Type': 'application/json'}
+        self.headers.update(headers or {})
+
+    @classmethod
+    def json(cls, status, obj, floats_ok=True, headers=None):
+        return cls(status, dumps(obj, floats_ok) + b'\n', headers)
+
+
+def _condicional(request, calcular_etag, colecciones):
+    """Devuelve (respuesta 304 o None, cabeceras de validación) según If-None-Match"""
+    store = get_version_store()
+    if store is None:
+        return None, {}
+    etag = calcular_etag(store)
+    headers = validator_headers(etag, store, colecciones)
+    if parse_etags(request.headers.get('if-none-match')).contains_weak(etag):
+        return AsgiResponse(304, b'', headers), headers
+    return None, headers
+
+
+def _agregar_vary(headers, valor):
+    actual = headers.get('Vary')
+    headers['Vary'] = f'{actual}, {valor}' if actual else valor
+
+
+def _error(status, mensaje):
+    return AsgiResponse.json(status, {'error': mensaje})
+
+
+# --- Empresas y servicios -------------------------------------------------
+
+async def _listar_catalogo(app, request, repositorio, service):
+    no_modificado, headers = _condicional(
+        request, lambda store: collection_etag(store, (repositorio.coleccion,), request.query_string),
+        (repositorio.coleccion,)
+    )
+    if no_modificado:
+        return no_modificado
+    filtros = service.parse_filtros(request.args)
+    page = parse_page_args(request.args, current_app.config.get('API_PAGINATION_REQUIRED', False))
+    async with app.session() as session:
+        if page is None:
+            items, floats_ok = rows_payload(repositorio.rows, await repositorio.get_rows(session, filtros))
+            return AsgiResponse.json(200, items, floats_ok, headers)
+        limit, cursor = page
+        rows, next_cursor = await repositorio.get_page(session, filtros, limit, cursor)
+    items, floats_ok = rows_payload(repositorio.rows, rows)
+    return AsgiResponse.json(200, page_response(items, next_cursor, limit), floats_ok, headers)
+
+
+async def _detalle_catalogo(app, request, entidad_id, repositorio, no_encontrado):
+    no_modificado, headers = _condicional(
+        request, lambda store: row_etag(store, repositorio.coleccion, entidad_id, ()), (repositorio.coleccion,)
+    )
+    if no_modificado:
+        return no_modificado
+    async with app.session() as session:
+        row = await repositorio.get_row_by_id(session, entidad_id)
+    if not row:
+        return _error(404, no_encontrado)
+    return AsgiResponse.json(200, repositorio.rows.to_dict(row), repositorio.rows.floats_ok(row), headers)
+
+
+async def _crear_catalogo(app, request, repositorio, validar):
+    data = request.get_json()
+    validar(data)
+    async with app.session() as session:
+        nuevo_id = await repositorio.create(session, data)
+        row = await repositorio.get_row_by_id(session, nuevo_id)
+    return AsgiResponse.json(201, repositorio.rows.to_dict(row), repositorio.rows.floats_ok(row))
+
+
+async def listar_empresas(app, request):
+    return await _listar_catalogo(app, request, AsyncEmpresaRepository, EmpresaService)
+
+
+async def detalle_empresa(app, request, empresa_id):
+    return await _detalle_catalogo(app, request, int(empresa_id), AsyncEmpresaRepository, 'Empresa no encontrada')
+
+
+async def crear_empresa(app, request):
+    return await _crear_catalogo(app, request, AsyncEmpresaRepository, EmpresaService.validate_create)
+
+
+async def listar_servicios(app, request):
+    return await _listar_catalogo(app, request, AsyncServicioRepository, ServicioService)
+
+
+async def detalle_servicio(app, request, servicio_id):
+    return await _detalle_catalogo(app, request, int(servicio_id), AsyncServicioRepository, 'Servicio no encontrado')
+
+
+async def crear_servicio(app, request):
+    return await _crear_catalogo(app, request, AsyncServicioRepository, ServicioService.validate_create)
+
+
+# --- Contratos ---------------------------------------------------------------
+
+CONTRATO_COLECCIONES = ('contratos', 'empresas', 'servicios')
+
+
+async def _respuesta_contratos(session, rows, vista, cuerpo, headers):
+    """Equivalente asíncrono de la respuesta con vista del controlador de contratos"""
+    items, floats_ok = rows_payload(ContratoService.get_serializer(vista), rows)
+    respuesta = cuerpo(items)
+    if vista and vista['sideload']:
+        ids = ContratoService.included_ids(rows, vista)
+        repositorios = {'empresa': AsyncEmpresaRepository, 'servicio': AsyncServicioRepository}
+        datos = {rel: await repositorios[rel].get_cached(session, rel_ids) for rel, rel_ids in ids.items()}
+        included = ContratoService.format_included(vista, datos)
+        floats_ok = floats_ok and all(dicts_floats_ok(por_id.values()) for por_id in included.values())
+        respuesta['included'] = included
+    return AsgiResponse.json(200, respuesta, floats_ok, headers)
+
+
+async def listar_contratos(app, request):
+    no_modificado, headers = _condicional(
+        request, lambda store: collection_etag(store, CONTRATO_COLECCIONES, request.query_string),
+        CONTRATO_COLECCIONES
+    )
+    if no_modificado:
+        return no_modificado
+    filtros = ContratoService.parse_filtros(request.args)
+    vista = ContratoService.parse_vista(request.args)
+    serializer = ContratoService.get_serializer(vista)
+    page = parse_page_args(request.args, current_app.config.get('API_PAGINATION_REQUIRED', False))
+    async with app.session() as session:
+        if page is None:
+            rows = await AsyncContratoRepository.get_rows(session, filtros, serializer)
+            if vista and vista['sideload']:
+                return await _respuesta_contratos(session, rows, vista, lambda items: {'items': items}, headers)
+            items, floats_ok = rows_payload(serializer, rows)
+            return AsgiResponse.json(200, items, floats_ok, headers)
+        limit, cursor = page
+        rows, next_cursor = await AsyncContratoRepository.get_page(session, filtros, limit, cursor, serializer)
+        return await _respuesta_contratos(
+            session, rows, vista, lambda items: page_response(items, next_cursor, limit), headers
+        )
+
+
+async def detalle_contrato(app, request, contrato_id):
+    contrato_id = int(contrato_id)
+    no_modificado, headers = _condicional(
+        request, lambda store: row_etag(store, 'contratos', contrato_id, ('empresas', 'servicios')),
+        CONTRATO_COLECCIONES
+    )
+    if no_modificado:
+        return no_modificado
+    vista = ContratoService.parse_vista(request.args)
+    async with app.session() as session:
+        row = await AsyncContratoRepository.get_row_by_id(session, contrato_id, ContratoService.get_serializer(vista))
+        if not row:
+            return _error(404, 'Contrato no encontrado')
+        if vista and vista['sideload']:
+            return await _respuesta_contratos(session, [row], vista, lambda items: {'item': items[0]}, headers)
+        return await _respuesta_contratos(session, [row], vista, lambda items: items[0], headers)
+
+
+async def crear_contrato(app, request):
+    data = request.get_json()
+    empresa_ids, servicio_ids = ContratoService.referencia_ids([data])
+    async with app.session() as session:
+        referencias = await AsyncContratoRepository.load_referencias(session, empresa_ids, servicio_ids, date.today())
+        nuevo_id = await AsyncContratoRepository.create(session, ContratoService.validate_create(data, referencias))
+        row = await AsyncContratoRepository.get_row_by_id(session, nuevo_id)
+    serializer = ContratoService.get_serializer()
+    return AsgiResponse.json(201, serializer.to_dict(row), serializer.floats_ok(row))
+
+
+RUTAS = [
+    ('GET', r'/api/empresas', listar_empresas),
+    ('POST', r'/api/empresas', crear_empresa),
+    ('GET', r'/api/empresas/(\d+)', detalle_empresa),
+    ('GET', r'/api/servicios', listar_servicios),
+    ('POST', r'/api/servicios', crear_servicio),
+    ('GET', r'/api/servicios/(\d+)', detalle_servicio),
+    ('GET', r'/api/contratos', listar_contratos),
+    ('POST', r'/api/contratos', crear_contrato),
+    ('GET', r'/api/contratos/(\d+)', detalle_contrato),
+]
+
+
+class AsgiApp:
+    """Aplicación ASGI: rutas asíncronas propias y el resto delegado a Flask"""
+
+    def __init__(self, flask_app, rutas=RUTAS):
+        from asgiref.wsgi import WsgiToAsgi
+
+        self.flask_app = flask_app
+        self.rutas = [(metodo, re.compile(patron + r'\Z'), handler) for metodo, patron, handler in rutas]
+        self.engine, self.session = create_async_db(flask_app.config['SQLALCHEMY_DATABASE_URI'])
+        instrument_engine(self.engine.sync_engine)
+        self.query_monitor = flask_app.extensions.get('query_monitor')
+        self.admission = flask_app.extensions.get('admission')
+        if self.query_monitor is not None:
+            self.query_monitor.install(self.engine.sync_engine)
+        self.url_map = flask_app.url_map.bind('localhost')
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.cors_origins = set(flask_app.config.get('CORS_ORIGINS', ()))
+
+    def _resolver(self, metodo, path):
+        for metodo_ruta, patron, handler in self.rutas:
+            if metodo_ruta == metodo:
+                coincidencia = patron.match(path)
+                if coincidencia:
+                    return handler, coincidencia.groups()
+        return None, ()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            return await self.wsgi(scope, receive, send)
+
+        handler, params = self._resolver(scope['method'], scope['path'])
+        if handler is None or self._idempotente(scope):
+            return await self.wsgi(scope, receive, send)
+
+        request = AsgiRequest(scope, await self._leer_cuerpo(receive))
+        medicion = start_timing()
+        ruta, blueprint = self._regla(request)
+        with self.flask_app.app_context():
+            response = self._admitir(request, blueprint)
+        if response is None:
+            hueco = self.admission is not None and self.admission.limits_concurrency(blueprint)
+            try:
+                response = await self._atender(handler, request, params)
+            finally:
+                if hueco:
+                    self.admission.leave()
+        stop_timing()
+        self._comprimir(request, response)
+        record(self.flask_app, medicion, request.method, ruta, blueprint, response.status, response.headers)
+        self._cors(request, response)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status,
+            'headers': [(k.encode('latin-1'), str(v).encode('latin-1')) for k, v in response.headers.items()]
+        })
+        await send({'type': 'http.response.body', 'body': response.body})
+
+    @staticmethod
+    def _idempotente(scope):
+        """Las escrituras con Idempotency-Key pasan por Flask, que guarda y repite la respuesta"""
+        return scope['method'] in ('POST', 'PUT') and any(
+            nombre.lower() == b'idempotency-key' for nombre, _ in scope.get('headers', ())
+        )
+
+    @staticmethod
+    async def _leer_cuerpo(receive):
+        partes = []
+        while True:
+            mensaje = await receive()
+            if mensaje['type'] == 'http.disconnect':
+                break
+            partes.append(mensaje.get('body', b''))
+            if not mensaje.get('more_body'):
+                break
+        return b''.join(partes)
+
+    async def _atender(self, handler, request, params):
+        if self.query_monitor is not None:
+            self.query_monitor.begin_request()
+        with self.flask_app.app_context():
+            try:
+                response = await handler(self, request, *params)
+                if self.query_monitor is not None:
+                    self.query_monitor.end_request(f'{request.method} {request.path}')
+            except ValueError as e:
+                response = _error(400, str(e))
+            except Exception as e:
+                response = _error(500, str(e))
+        return response
+
+    def _regla(self, request):
+        """Ruta (regla de Flask) y blueprint del controlador equivalente, para métricas y límites"""
+        try:
+            regla, _ = self.url_map.match(request.path, request.method, return_rule=True)
+            return regla.rule, regla.endpoint.rpartition('.')[0]
+        except HTTPException:
+            return '<unmatched>', ''
+
+    def _admitir(self, request, blueprint):
+        """
+        Aplica los mismos límites que los hooks de Flask; devuelve la respuesta de rechazo o None.
+
+        El hueco de concurrencia se pide sin espera para no bloquear el bucle de eventos.
+        """
+        if self.admission is None:
+            return None
+        cliente = self.admission.client_key(request.headers.get(self.admission.key_header.lower()), request.remote_addr)
+        espera = self.admission.check_rate(blueprint, cliente)
+        if espera is not None:
+            response = _error(429, 'Demasiadas peticiones; reintente más tarde')
+            response.headers['Retry-After'] = str(max(1, math.ceil(espera)))
+            return response
+        if self.admission.limits_concurrency(blueprint) and not self.admission.enter(timeout=0):
+            response = _error(503, 'Servidor ocupado; reintente más tarde')
+            response.headers['Retry-After'] = '1'
+            return response
+        return None
+
+    def _comprimir(self, request, response):
+        """Comprime el cuerpo con el mismo criterio que el hook de Flask (sin la caché de respuestas)"""
+        compressor = self.flask_app.extensions.get('compression')
+        mimetype = response.headers.get('Content-Type', '').partition(';')[0]
+        if compressor is None or response.status != 200 or not compressor.compressible(mimetype):
+            return
+        _agregar_vary(response.headers, 'Accept-Encoding')
+        codec = compressor.negotiate(parse_accept_header(request.headers.get('accept-encoding')))
+        if codec is None or len(response.body) < compressor.min_size:
+            return
+        response.body = codec.compress(response.body)
+        response.headers['Content-Encoding'] = codec.name
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response.headers['ETag'] = 'W/' + etag
+
+    def _cors(self, request, response):
+        """Cabeceras CORS equivalentes a las de Flask-CORS para los orígenes permitidos"""
+        origen = request.headers.get('origin')
+        if origen and (origen in self.cors_origins or '*' in self.cors_origins):
+            response.headers['Access-Control-Allow-Origin'] = origen
+            response.headers['Access-Control-Expose-Headers'] = 'ETag, Last-Modified, Server-Timing, Retry-After'
+            _agregar_vary(response.headers, 'Origin')
+
+    async def _lifespan(self, receive, send):
+        while True:
+            mensaje = await receive()
+            if mensaje['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensaje['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(flask_app=None):
+    """Crea la aplicación ASGI sobre la aplicación Flask (la crea si no se indica)"""
+    return AsgiApp(flask_app or create_app())
@@ -0,0 +1,22 @@
+"""
+Comandos de consola - Tier 2: Lógica de Negocio
+Tareas de mantenimiento que se ejecutan con `flask --app run <comando>`
+"""
+import click
+from flask.cli import with_appcontext
+from app.config.database import db
+from app.repositories.resumen_repository import ResumenRepository
+
+
+@click.command('resumen-rebuild')
+@with_appcontext
+def rebuild_resumen_command():
+    """Recalcula desde cero el resumen de contratos por empresa"""
+    ResumenRepository.rebuild()
+    db.session.commit()
+    click.echo(f'Resumen recalculado: {len(ResumenRepository.get_all())} empresas')
+
+
+def register_commands(app):
+    """Registra los comandos de consola de la aplicación"""
+    app.cli.add_command(rebuild_resumen_command)
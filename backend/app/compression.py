@@ -0,0 +1,259 @@
+"""
+Compresión de respuestas - Tier 2: Lógica de Negocio
+Comprime las respuestas JSON, NDJSON, CSV y de texto con el algoritmo que
+acepte el cliente (Accept-Encoding), en el orden de preferencia de
+COMPRESSION_ALGORITHMS: brotli y zstd si están instalados, gzip siempre.
+
+- Las respuestas menores que COMPRESSION_MIN_SIZE se envían sin comprimir.
+- Las respuestas en streaming (exportaciones) se comprimen bloque a bloque sin
+  acumular el cuerpo completo (COMPRESSION_STREAMING).
+- Las respuestas GET con ETag se guardan ya comprimidas: una repetición con el
+  mismo ETag se sirve desde la caché sin consultar, serializar ni comprimir.
+  Solo si los ETags son coherentes entre procesos: versiones compartidas, o en
+  memoria con un único worker (etags_consistent).
+
+Una representación comprimida lleva el ETag débil (W/"..."), de modo que no se
+confunde con la original; If-None-Match usa la comparación débil y ambas
+validan contra la misma versión de los datos.
+"""
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from flask import Response, current_app, request
+from app.repositories.cache import CacheStats
+from app.config.server import etags_consistent
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = frozenset({'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'})
+
+
+class GzipCodec:
+    name = 'gzip'
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, datos):
+        return gzip.compress(datos, compresslevel=self.level, mtime=0)
+
+    def stream(self, bloques):
+        # wbits=31: formato gzip (cabecera y CRC) en lugar de zlib
+        compresor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        for bloque in bloques:
+            salida = compresor.compress(bloque)
+            if salida:
+                yield salida
+        yield compresor.flush()
+
+
+class BrotliCodec:
+    name = 'br'
+
+    def __init__(self, quality=5):
+        # La calidad 11 comprime algo más pero es decenas de veces más lenta para respuestas dinámicas
+        self.quality = quality
+
+    def compress(self, datos):
+        return brotli.compress(datos, quality=self.quality)
+
+    def stream(self, bloques):
+        compresor = brotli.Compressor(quality=self.quality)
+        for bloque in bloques:
+            salida = compresor.process(bloque)
+            if salida:
+                yield salida
+        yield compresor.finish()
+
+
+class ZstdCodec:
+    name = 'zstd'
+
+    def __init__(self, level=3):
+        self.level = level
+
+    def compress(self, datos):
+        return zstandard.ZstdCompressor(level=self.level).compress(datos)
+
+    def stream(self, bloques):
+        compresor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        for bloque in bloques:
+            salida = compresor.compress(bloque)
+            if salida:
+                yield salida
+        yield compresor.flush()
+
+
+def available_codecs():
+    """Codecs disponibles por nombre de Content-Encoding"""
+    codecs = {'gzip': GzipCodec()}
+    if brotli is not None:
+        codecs['br'] = BrotliCodec()
+    if zstandard is not None:
+        codecs['zstd'] = ZstdCodec()
+    return codecs
+
+
+class CompressedResponseCache:
+    """Cuerpos comprimidos por (ruta, ETag, codificación), con desalojo LRU acotado en bytes"""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entrada = self._data.get(key)
+            if entrada is not None:
+                self._data.move_to_end(key)
+        self.stats.incr('hits' if entrada is not None else 'misses')
+        return entrada
+
+    def set(self, key, cuerpo, mimetype):
+        # Un cuerpo mayor que la cuarta parte de la caché desalojaría casi todo lo demás
+        if len(cuerpo) > self.max_bytes // 4:
+            return
+        with self._lock:
+            anterior = self._data.pop(key, None)
+            if anterior is not None:
+                self._bytes -= len(anterior[0])
+            self._data[key] = (cuerpo, mimetype)
+            self._bytes += len(cuerpo)
+            while self._bytes > self.max_bytes:
+                _, (viejo, _) = self._data.popitem(last=False)
+                self._bytes -= len(viejo)
+                self.evictions += 1
+        self.stats.incr('sets')
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def render(self):
+        """Líneas en formato de exposición de Prometheus"""
+        return [
+            '# HELP compression_cache_hits_total Respuestas servidas ya comprimidas desde la caché',
+            '# TYPE compression_cache_hits_total counter',
+            f'compression_cache_hits_total {self.stats.hits}',
+            '# HELP compression_cache_misses_total Búsquedas en la caché de respuestas comprimidas sin resultado',
+            '# TYPE compression_cache_misses_total counter',
+            f'compression_cache_misses_total {self.stats.misses}',
+            '# HELP compression_cache_bytes Bytes comprimidos guardados',
+            '# TYPE compression_cache_bytes gauge',
+            f'compression_cache_bytes {self._bytes}',
+        ]
+
+
+class ResponseCompressor:
+    """Negociación de la codificación y compresión de respuestas de la aplicación"""
+
+    def __init__(self, algoritmos=('br', 'zstd', 'gzip'), min_size=1024, streaming=True, cache_max_bytes=0):
+        disponibles = available_codecs()
+        self.codecs = {nombre: disponibles[nombre] for nombre in algoritmos if nombre in disponibles}
+        self.min_size = min_size
+        self.streaming = streaming
+        self.cache = CompressedResponseCache(cache_max_bytes) if cache_max_bytes > 0 else None
+
+    def negotiate(self, accept_encodings):
+        """Codec preferido entre los que acepta el cliente (None si no acepta ninguno)"""
+        mejor = accept_encodings.best_match(list(self.codecs))
+        return self.codecs.get(mejor) if mejor else None
+
+    @staticmethod
+    def compressible(mimetype):
+        return mimetype in COMPRESSIBLE_TYPES
+
+    def cached(self, etag):
+        """Respuesta comprimida guardada para el ETag y la petición actual, o None"""
+        if self.cache is None or request.method != 'GET':
+            return None
+        codec = self.negotiate(request.accept_encodings)
+        if codec is None:
+            return None
+        entrada = self.cache.get((request.full_path, etag, codec.name))
+        if entrada is None:
+            return None
+        cuerpo, mimetype = entrada
+        response = Response(cuerpo, mimetype=mimetype)
+        response.headers['Content-Encoding'] = codec.name
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def compress_response(self, response):
+        """Comprime la respuesta si el cliente lo acepta y merece la pena; la guarda si tiene ETag"""
+        if (response.status_code != 200 or not self.compressible(response.mimetype)
+                or 'Content-Encoding' in response.headers or response.direct_passthrough):
+            return response
+        response.vary.add('Accept-Encoding')
+        codec = self.negotiate(request.accept_encodings)
+        if codec is None:
+            return response
+
+        if response.is_streamed:
+            if not self.streaming:
+                return response
+            response.response = codec.stream(response.iter_encoded())
+            response.headers.pop('Content-Length', None)
+        else:
+            datos = response.get_data()
+            if len(datos) < self.min_size:
+                return response
+            response.set_data(codec.compress(datos))
+            etag, debil = response.get_etag()
+            if etag and not debil and self.cache is not None and request.method == 'GET':
+                self.cache.set((request.full_path, etag, codec.name), response.get_data(), response.mimetype)
+        response.headers['Content-Encoding'] = codec.name
+        etag, debil = response.get_etag()
+        if etag and not debil:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def get_compressor():
+    """Devuelve el compresor de la aplicación actual (None si está desactivado)"""
+    return current_app.extensions.get('compression')
+
+
+def init_compression(app):
+    """
+    Activa la compresión de respuestas según COMPRESSION_*.
+
+    Debe llamarse después de init_instrumentation para que el tiempo de compresión cuente en la latencia medida,
+    y después de init_versioning: la caché de respuestas comprimidas depende del almacén de versiones.
+    """
+    if not app.config.get('COMPRESSION_ENABLED', True):
+        app.extensions['compression'] = None
+        return None
+    algoritmos = [a.strip() for a in app.config.get('COMPRESSION_ALGORITHMS', 'br,zstd,gzip').split(',') if a.strip()]
+    # La caché se indexa por ETag: solo es válida si un cambio en cualquier proceso cambia el ETag de este
+    consistentes = etags_consistent(app)
+    compressor = ResponseCompressor(
+        algoritmos,
+        min_size=app.config.get('COMPRESSION_MIN_SIZE', 1024),
+        streaming=app.config.get('COMPRESSION_STREAMING', True),
+        cache_max_bytes=app.config.get('COMPRESSION_CACHE_MAX_BYTES', 32 * 1024 * 1024) if consistentes else 0
+    )
+    app.extensions['compression'] = compressor
+    registry = app.extensions.get('metrics')
+    if registry is not None and compressor.cache is not None:
+        registry.add_collector(compressor.cache.render)
+
+    @app.after_request
+    def _comprimir(response):
+        return compressor.compress_response(response)
+
+    return compressor
@@ -0,0 +1,42 @@
+"""
+Base de datos asíncrona - Tier 3: Acceso a Datos
+Motor SQLAlchemy asyncio para el modo ASGI: la misma base de datos que el motor
+síncrono, con los drivers aiosqlite (SQLite) o asyncpg (PostgreSQL) y las mismas
+opciones de pool y PRAGMAs de EngineSettings
+"""
+from sqlalchemy import event
+from app.config.engine import EngineSettings, is_sqlite
+
+# Driver síncrono -> driver asíncrono
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg'
+}
+
+
+def async_uri(uri):
+    """Convierte la URI de SQLALCHEMY_DATABASE_URI a su driver asíncrono"""
+    esquema, separador, resto = uri.partition('://')
+    if esquema not in ASYNC_DRIVERS:
+        if '+' in esquema:
+            return uri
+        raise ValueError(f'No hay driver asíncrono configurado para {esquema}')
+    return ASYNC_DRIVERS[esquema] + separador + resto
+
+
+def create_async_db(uri, settings=None):
+    """Crea (motor, fábrica de sesiones) asíncronos para la URI indicada"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    settings = settings or EngineSettings.from_env()
+    options = settings.engine_options(uri)
+    if not is_sqlite(uri):
+        # asyncpg no admite el parámetro `options` de libpq; el timeout va en server_settings
+        options.pop('connect_args', None)
+        if settings.statement_timeout_ms:
+            options['connect_args'] = {'server_settings': {'statement_timeout': str(settings.statement_timeout_ms)}}
+    engine = create_async_engine(async_uri(uri), **options)
+    if is_sqlite(uri):
+        event.listen(engine.sync_engine, 'connect', settings.sqlite_connect_listener())
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
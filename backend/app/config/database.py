@@ -2,15 +2,34 @@
 Configuración de la base de datos - Tier 3: Acceso a Datos
 """
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+from app.config.engine import EngineSettings, is_sqlite
+from app.config.migrations import schema_is_current, stamp, upgrade, upgrade_command
+from app.config.query_monitor import init_query_monitor
 
 db = SQLAlchemy()
 
-def init_db(app):
-    """Inicializa la base de datos"""
+def init_db(app, settings=None):
+    """Inicializa la base de datos con las opciones de motor configuradas y aplica las migraciones pendientes"""
+    settings = settings or EngineSettings.from_env()
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', settings.engine_options(uri))
+
     # Verificar si ya está inicializado para evitar errores en tests
     if not hasattr(app, 'extensions') or 'sqlalchemy' not in app.extensions:
         db.init_app(app)
     with app.app_context():
-        db.create_all()
-
-
+        if is_sqlite(uri):
+            event.listen(db.engine, 'connect', settings.sqlite_connect_listener())
+        init_query_monitor(app, db.engine, settings)
+        # Con el esquema ya en la última versión se evita la introspección de create_all (una consulta por tabla)
+        if app.config.get('DB_SCHEMA_CHECK', 'auto') == 'always' or not schema_is_current(db.engine):
+            nueva = not inspect(db.engine).get_table_names()
+            db.create_all()
+            if nueva:
+                # create_all ya creó el esquema de la última versión: las migraciones solo se registran
+                with db.engine.begin() as connection:
+                    stamp(connection)
+            elif app.config.get('DB_AUTO_MIGRATE', True):
+                upgrade(db.engine)
+    app.cli.add_command(upgrade_command)
@@ -0,0 +1,118 @@
+"""
+Configuración del motor de base de datos - Tier 3: Acceso a Datos
+Opciones del pool de conexiones (PostgreSQL) y PRAGMAs de conexión (SQLite),
+configurables mediante variables de entorno
+"""
+import os
+from dataclasses import dataclass
+
+
+def _env_int(environ, nombre, defecto):
+    valor = environ.get(nombre)
+    return int(valor) if valor not in (None, '') else defecto
+
+
+def _env_float(environ, nombre, defecto):
+    valor = environ.get(nombre)
+    return float(valor) if valor not in (None, '') else defecto
+
+
+def _env_bool(environ, nombre, defecto):
+    valor = environ.get(nombre)
+    if valor in (None, ''):
+        return defecto
+    return valor.lower() in ('1', 'true', 'yes')
+
+
+def is_sqlite(uri: str) -> bool:
+    """Indica si la URI apunta a una base de datos SQLite"""
+    return uri.startswith('sqlite')
+
+
+@dataclass(frozen=True)
+class EngineSettings:
+    """Parámetros del motor SQLAlchemy"""
+
+    # Pool de conexiones (PostgreSQL y otros servidores)
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_timeout_ms: int = 0
+
+    # PRAGMAs por conexión (SQLite)
+    sqlite_journal_mode: str = 'WAL'
+    sqlite_synchronous: str = 'NORMAL'
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    # SQLite no aplica las claves foráneas (ni ON DELETE CASCADE) salvo que se active por conexión
+    sqlite_foreign_keys: bool = True
+
+    # Registro de consultas lentas y detector de N+1 (0 = desactivado)
+    slow_query_ms: int = 0
+    repeated_query_threshold: int = 0
+    query_check_strict: bool = False
+
+    @classmethod
+    def from_env(cls, environ=None) -> 'EngineSettings':
+        """Construye la configuración a partir de variables de entorno DB_*"""
+        environ = os.environ if environ is None else environ
+        defecto = cls()
+        return cls(
+            pool_size=_env_int(environ, 'DB_POOL_SIZE', defecto.pool_size),
+            max_overflow=_env_int(environ, 'DB_MAX_OVERFLOW', defecto.max_overflow),
+            pool_timeout=_env_int(environ, 'DB_POOL_TIMEOUT', defecto.pool_timeout),
+            pool_recycle=_env_int(environ, 'DB_POOL_RECYCLE', defecto.pool_recycle),
+            pool_pre_ping=_env_bool(environ, 'DB_POOL_PRE_PING', defecto.pool_pre_ping),
+            statement_timeout_ms=_env_int(environ, 'DB_STATEMENT_TIMEOUT_MS', defecto.statement_timeout_ms),
+            sqlite_journal_mode=environ.get('SQLITE_JOURNAL_MODE', defecto.sqlite_journal_mode),
+            sqlite_synchronous=environ.get('SQLITE_SYNCHRONOUS', defecto.sqlite_synchronous),
+            sqlite_busy_timeout_ms=_env_int(environ, 'SQLITE_BUSY_TIMEOUT_MS', defecto.sqlite_busy_timeout_ms),
+            sqlite_mmap_size=_env_int(environ, 'SQLITE_MMAP_SIZE', defecto.sqlite_mmap_size),
+            sqlite_foreign_keys=_env_bool(environ, 'SQLITE_FOREIGN_KEYS', defecto.sqlite_foreign_keys),
+            slow_query_ms=_env_int(environ, 'DB_SLOW_QUERY_MS', defecto.slow_query_ms),
+            repeated_query_threshold=_env_int(environ, 'DB_REPEATED_QUERY_THRESHOLD', defecto.repeated_query_threshold),
+            query_check_strict=_env_bool(environ, 'DB_QUERY_CHECK_STRICT', defecto.query_check_strict)
+        )
+
+    def engine_options(self, uri: str) -> dict:
+        """Devuelve SQLALCHEMY_ENGINE_OPTIONS para la URI indicada"""
+        if is_sqlite(uri):
+            # SQLite no usa pool de servidor; los ajustes se aplican con PRAGMAs al conectar
+            return {'pool_pre_ping': self.pool_pre_ping}
+
+        options = {
+            'pool_size': self.pool_size,
+            'max_overflow': self.max_overflow,
+            'pool_timeout': self.pool_timeout,
+            'pool_recycle': self.pool_recycle,
+            'pool_pre_ping': self.pool_pre_ping
+        }
+        if self.statement_timeout_ms and uri.startswith('postgresql'):
+            options['connect_args'] = {'options': f'-c statement_timeout={self.statement_timeout_ms}'}
+        return options
+
+    def sqlite_pragmas(self) -> list:
+        """Sentencias PRAGMA que se ejecutan en cada conexión SQLite nueva"""
+        return [
+            f'PRAGMA journal_mode={self.sqlite_journal_mode}',
+            f'PRAGMA synchronous={self.sqlite_synchronous}',
+            f'PRAGMA busy_timeout={self.sqlite_busy_timeout_ms}',
+            f'PRAGMA mmap_size={self.sqlite_mmap_size}',
+            f"PRAGMA foreign_keys={'ON' if self.sqlite_foreign_keys else 'OFF'}"
+        ]
+
+    def sqlite_connect_listener(self):
+        """Devuelve el listener del evento 'connect' que aplica los PRAGMAs"""
+        pragmas = self.sqlite_pragmas()
+
+        def aplicar_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+        return aplicar_pragmas
@@ -0,0 +1,230 @@
+"""
+Migraciones versionadas del esquema - Tier 3: Acceso a Datos
+db.create_all() solo crea las tablas que faltan y nunca modifica las existentes.
+Los cambios posteriores (índices, restricciones) se declaran aquí como
+migraciones numeradas; la tabla schema_version guarda las ya aplicadas, de modo
+que las bases de datos SQLite o PostgreSQL existentes se actualizan al iniciar.
+
+Cada paso es una sentencia SQL o una función que recibe la conexión. Los pasos
+deben ser idempotentes: en una base de datos nueva create_all ya crea los
+objetos declarados en los modelos y la migración solo registra su versión.
+"""
+import logging
+import time
+from dataclasses import dataclass
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Migración del esquema: versión, descripción y pasos a ejecutar en orden"""
+    version: int
+    descripcion: str
+    pasos: tuple
+
+
+INDICES_CONTRATOS = (
+    'CREATE INDEX IF NOT EXISTS ix_contratos_servicio_id ON contratos (servicio_id)',
+    'CREATE INDEX IF NOT EXISTS ix_contratos_estado ON contratos (estado)',
+    'CREATE INDEX IF NOT EXISTS ix_contratos_empresa_estado_fecha ON contratos (empresa_id, estado, fecha_inicio)'
+)
+
+
+def _contratos_on_delete_cascade(connection):
+    """
+    Declara ON DELETE CASCADE en las claves foráneas de contratos.
+
+    PostgreSQL permite reemplazar la restricción; SQLite no admite ALTER de claves
+    foráneas, así que la tabla se reconstruye copiando las filas. Los contratos
+    huérfanos (cuya empresa o servicio ya no existe) no se copian: son justamente
+    los que la cascada habría eliminado. Se registra un aviso con cuántos son y sus ids.
+    """
+    pendientes = [
+        fk for fk in inspect(connection).get_foreign_keys('contratos')
+        if (fk.get('options') or {}).get('ondelete', '').upper() != 'CASCADE'
+    ]
+    if not pendientes:
+        return
+
+    if connection.dialect.name != 'sqlite':
+        for fk in pendientes:
+            columna = fk['constrained_columns'][0]
+            connection.execute(text(f'ALTER TABLE contratos DROP CONSTRAINT {fk["name"]}'))
+            connection.execute(text(
+                f'ALTER TABLE contratos ADD CONSTRAINT {fk["name"]} FOREIGN KEY ({columna}) '
+                f'REFERENCES {fk["referred_table"]} (id) ON DELETE CASCADE'
+            ))
+        return
+
+    huerfanos = connection.execute(text(
+        'SELECT id FROM contratos '
+        'WHERE empresa_id NOT IN (SELECT id FROM empresas) OR servicio_id NOT IN (SELECT id FROM servicios) '
+        'ORDER BY id'
+    )).scalars().all()
+    if huerfanos:
+        ids = ', '.join(str(contrato_id) for contrato_id in huerfanos[:50]) + (', ...' if len(huerfanos) > 50 else '')
+        logger.warning('Se descartan %d contratos cuya empresa o servicio ya no existe (ids: %s)', len(huerfanos), ids)
+
+    connection.execute(text('ALTER TABLE contratos RENAME TO contratos_anterior'))
+    for nombre in ('ix_contratos_servicio_id', 'ix_contratos_estado', 'ix_contratos_empresa_estado_fecha'):
+        connection.execute(text(f'DROP INDEX IF EXISTS {nombre}'))
+    connection.execute(text(
+        'CREATE TABLE contratos ('
+        'id INTEGER NOT NULL PRIMARY KEY, '
+        'empresa_id INTEGER NOT NULL, '
+        'servicio_id INTEGER NOT NULL, '
+        'fecha_inicio DATE NOT NULL, '
+        'fecha_fin DATE, '
+        "estado VARCHAR(20) NOT NULL DEFAULT 'activo', "
+        'precio_final FLOAT NOT NULL, '
+        'FOREIGN KEY(empresa_id) REFERENCES empresas (id) ON DELETE CASCADE, '
+        'FOREIGN KEY(servicio_id) REFERENCES servicios (id) ON DELETE CASCADE)'
+    ))
+    connection.execute(text(
+        'INSERT INTO contratos (id, empresa_id, servicio_id, fecha_inicio, fecha_fin, estado, precio_final) '
+        'SELECT c.id, c.empresa_id, c.servicio_id, c.fecha_inicio, c.fecha_fin, c.estado, c.precio_final '
+        'FROM contratos_anterior c '
+        'WHERE c.empresa_id IN (SELECT id FROM empresas) AND c.servicio_id IN (SELECT id FROM servicios)'
+    ))
+    connection.execute(text('DROP TABLE contratos_anterior'))
+    for sentencia in INDICES_CONTRATOS:
+        connection.execute(text(sentencia))
+
+
+def _resumen_empresas(connection):
+    """Crea la tabla resumen_empresas si falta y la calcula a partir de los contratos existentes"""
+    from app.models.resumen_empresa import ResumenEmpresa
+    from app.repositories.resumen_repository import ResumenRepository
+    ResumenEmpresa.__table__.create(connection, checkfirst=True)
+    ResumenRepository.rebuild(connection)
+
+
+def _idempotency_keys(connection):
+    """Crea la tabla idempotency_keys si falta"""
+    from app.models.idempotency_key import IdempotencyKey
+    IdempotencyKey.__table__.create(connection, checkfirst=True)
+
+
+def _change_log(connection):
+    """Crea la tabla change_log si falta"""
+    from app.models.change_log import ChangeLog
+    ChangeLog.__table__.create(connection, checkfirst=True)
+
+
+def _jobs(connection):
+    """Crea la tabla jobs si falta"""
+    from app.models.job import Job
+    Job.__table__.create(connection, checkfirst=True)
+
+
+# Sustituye al índice solo por estado: el compuesto sirve para contar y para tomar el pendiente más antiguo
+INDICES_JOBS = (
+    'CREATE INDEX IF NOT EXISTS ix_jobs_estado_creado_en ON jobs (estado, creado_en)',
+    'DROP INDEX IF EXISTS ix_jobs_estado',
+)
+
+
+MIGRATIONS = (
+    Migration(1, 'Índices de contratos por servicio, estado y (empresa, estado, fecha de inicio)', INDICES_CONTRATOS),
+    Migration(2, 'ON DELETE CASCADE en las claves foráneas de contratos', (_contratos_on_delete_cascade,)),
+    Migration(3, 'Resumen de contratos por empresa', (_resumen_empresas,)),
+    Migration(4, 'Respuestas guardadas por Idempotency-Key', (_idempotency_keys,)),
+    Migration(5, 'Registro de cambios para el feed de /api/changes', (_change_log,)),
+    Migration(6, 'Cola de trabajos en segundo plano', (_jobs,)),
+    Migration(7, 'Índice de la cola de trabajos por (estado, creado_en)', INDICES_JOBS),
+)
+
+SCHEMA_VERSION_DDL = (
+    'CREATE TABLE IF NOT EXISTS schema_version ('
+    'version INTEGER PRIMARY KEY, descripcion VARCHAR(200) NOT NULL, aplicada_en FLOAT NOT NULL)'
+)
+
+
+def latest_version():
+    """Versión más reciente declarada en MIGRATIONS"""
+    return max((m.version for m in MIGRATIONS), default=0)
+
+
+def current_version(connection):
+    """Última versión aplicada en la base de datos (0 si nunca se migró)"""
+    connection.execute(text(SCHEMA_VERSION_DDL))
+    return connection.execute(text('SELECT COALESCE(MAX(version), 0) FROM schema_version')).scalar()
+
+
+def schema_is_current(engine, migrations=MIGRATIONS):
+    """
+    Indica si la base de datos ya tiene aplicadas todas las migraciones.
+
+    Es una sola consulta y no ejecuta DDL; una base de datos nueva (sin schema_version) devuelve False.
+    """
+    objetivo = max((m.version for m in migrations), default=0)
+    try:
+        with engine.connect() as connection:
+            version = connection.execute(text('SELECT MAX(version) FROM schema_version')).scalar()
+    except SQLAlchemyError:
+        return False
+    return version is not None and version >= objetivo
+
+
+def stamp(connection, migrations=MIGRATIONS):
+    """
+    Registra todas las migraciones como aplicadas sin ejecutar sus pasos.
+
+    Solo es correcto en una base de datos recién creada con create_all, que ya tiene el
+    esquema de la última versión.
+    """
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('SELECT pg_advisory_xact_lock(7246)'))
+    aplicada = current_version(connection)
+    ahora = time.time()
+    pendientes = [{'v': m.version, 'd': m.descripcion, 't': ahora} for m in migrations if m.version > aplicada]
+    if pendientes:
+        connection.execute(
+            text('INSERT INTO schema_version (version, descripcion, aplicada_en) VALUES (:v, :d, :t)'), pendientes
+        )
+
+
+def upgrade(engine, migrations=MIGRATIONS):
+    """
+    Aplica las migraciones pendientes en orden, cada una en su propia transacción.
+
+    Devuelve la lista de versiones aplicadas. En PostgreSQL se toma un bloqueo
+    consultivo para que varios procesos que arrancan a la vez no migren en paralelo.
+    """
+    if schema_is_current(engine, migrations):
+        return []
+    aplicadas = []
+    for migracion in sorted(migrations, key=lambda m: m.version):
+        with engine.begin() as connection:
+            if connection.dialect.name == 'postgresql':
+                connection.execute(text('SELECT pg_advisory_xact_lock(7246)'))
+            if current_version(connection) >= migracion.version:
+                continue
+            for paso in migracion.pasos:
+                if callable(paso):
+                    paso(connection)
+                else:
+                    connection.execute(text(paso))
+            connection.execute(
+                text('INSERT INTO schema_version (version, descripcion, aplicada_en) VALUES (:v, :d, :t)'),
+                {'v': migracion.version, 'd': migracion.descripcion, 't': time.time()}
+            )
+        aplicadas.append(migracion.version)
+    return aplicadas
+
+
+@click.command('db-upgrade')
+@with_appcontext
+def upgrade_command():
+    """Aplica las migraciones pendientes del esquema"""
+    from app.config.database import db
+    aplicadas = upgrade(db.engine)
+    if aplicadas:
+        click.echo(f"Migraciones aplicadas: {', '.join(str(v) for v in aplicadas)}")
+    else:
+        click.echo(f'El esquema ya está en la versión {latest_version()}')
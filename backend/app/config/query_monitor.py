@@ -0,0 +1,132 @@
+"""
+Registro de consultas lentas y detector de N+1 - Tier 3: Acceso a Datos
+Modo opcional sobre los eventos de cursor del motor:
+- las sentencias que superan DB_SLOW_QUERY_MS se registran con sus parámetros y
+  el método de repositorio que las originó;
+- las peticiones que ejecutan la misma sentencia normalizada más de
+  DB_REPEATED_QUERY_THRESHOLD veces (p. ej. la carga perezosa de relaciones en
+  un bucle de to_dict) se registran como posible N+1 y, con
+  DB_QUERY_CHECK_STRICT, fallan con RepeatedQueryError.
+"""
+import logging
+import re
+import sys
+import time
+from contextvars import ContextVar
+from flask import request
+from sqlalchemy import event
+
+logger = logging.getLogger('app.sql')
+
+_CONSULTAS = ContextVar('consultas_peticion', default=None)
+_PARAMETROS_MAX = 500
+
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_MARCADORES = re.compile(r'%\(\w+\)s|\?|:\w+|\$\d+|%s')
+_LISTAS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ESPACIOS = re.compile(r'\s+')
+
+
+class RepeatedQueryError(AssertionError):
+    """Una petición repitió la misma consulta más veces de las permitidas (modo estricto)"""
+
+
+def normalize_sql(statement):
+    """Sentencia sin literales ni diferencias de parámetros, para agrupar consultas equivalentes"""
+    sql = _LITERALES.sub('?', statement)
+    sql = _MARCADORES.sub('?', sql)
+    sql = _LISTAS.sub('(?)', sql)
+    return _ESPACIOS.sub(' ', sql).strip()
+
+
+def query_origin():
+    """Primer método de app/repositories (o, si no hay, de app/) en la pila de llamadas"""
+    frame = sys._getframe(1)
+    primero = None
+    while frame is not None:
+        codigo = frame.f_code
+        ruta = codigo.co_filename.replace('\\', '/')
+        if '/app/' in ruta and not ruta.endswith('/app/config/query_monitor.py'):
+            nombre = f'{ruta.rsplit("/app/", 1)[1]}:{getattr(codigo, "co_qualname", codigo.co_name)}'
+            if '/app/repositories/' in ruta:
+                return nombre
+            primero = primero or nombre
+        frame = frame.f_back
+    return primero or '<desconocido>'
+
+
+class QueryMonitor:
+    """Registra consultas lentas y cuenta las sentencias repetidas de cada petición"""
+
+    def __init__(self, slow_ms=0, repeated_threshold=0, strict=False):
+        self.slow_ms = slow_ms
+        self.repeated_threshold = repeated_threshold
+        self.strict = strict
+
+    def install(self, engine):
+        event.listen(engine, 'before_cursor_execute', self._antes)
+        event.listen(engine, 'after_cursor_execute', self._despues)
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('inicio_monitor', []).append(time.perf_counter())
+
+    def _despues(self, conn, cursor, statement, parameters, context, executemany):
+        duracion_ms = (time.perf_counter() - conn.info['inicio_monitor'].pop()) * 1000
+        if self.slow_ms and duracion_ms >= self.slow_ms:
+            logger.warning(
+                'Consulta lenta (%.1f ms) desde %s: %s | parámetros: %s',
+                duracion_ms, query_origin(), _ESPACIOS.sub(' ', statement), repr(parameters)[:_PARAMETROS_MAX]
+            )
+        consultas = _CONSULTAS.get()
+        if consultas is not None and self.repeated_threshold:
+            clave = normalize_sql(statement)
+            registro = consultas.get(clave)
+            if registro is None:
+                consultas[clave] = [1, query_origin()]
+            else:
+                registro[0] += 1
+
+    def begin_request(self):
+        _CONSULTAS.set({})
+
+    def end_request(self, descripcion):
+        """Comprueba las sentencias repetidas de la petición; en modo estricto lanza RepeatedQueryError"""
+        consultas = _CONSULTAS.get()
+        _CONSULTAS.set(None)
+        if not consultas or not self.repeated_threshold:
+            return []
+        repetidas = [
+            (veces, origen, sql) for sql, (veces, origen) in consultas.items()
+            if veces > self.repeated_threshold
+        ]
+        for veces, origen, sql in repetidas:
+            logger.warning('Posible N+1 en %s: %d ejecuciones desde %s: %s', descripcion, veces, origen, sql)
+        if repetidas and self.strict:
+            veces, origen, sql = max(repetidas)
+            raise RepeatedQueryError(
+                f'{descripcion} ejecutó {veces} veces la misma consulta '
+                f'(máximo {self.repeated_threshold}) desde {origen}: {sql}'
+            )
+        return repetidas
+
+
+def init_query_monitor(app, engine, settings):
+    """Activa el monitor si DB_SLOW_QUERY_MS o DB_REPEATED_QUERY_THRESHOLD están configurados"""
+    if not settings.slow_query_ms and not settings.repeated_query_threshold:
+        app.extensions['query_monitor'] = None
+        return None
+    monitor = QueryMonitor(settings.slow_query_ms, settings.repeated_query_threshold, settings.query_check_strict)
+    monitor.install(engine)
+    app.extensions['query_monitor'] = monitor
+
+    if settings.repeated_query_threshold:
+        @app.before_request
+        def _iniciar_monitor():
+            monitor.begin_request()
+
+        @app.after_request
+        def _comprobar_monitor(response):
+            monitor.end_request(f'{request.method} {request.path}')
+            return response
+
+    return monitor
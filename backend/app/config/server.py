@@ -0,0 +1,102 @@
+"""
+Configuración del servidor de producción - Tier 2: Lógica de Negocio
+Parámetros del lanzador multi-proceso (gunicorn.conf.py) leídos de variables de
+entorno y preparación de cada worker después del fork
+"""
+import os
+from dataclasses import dataclass
+from app.config.engine import _env_bool, _env_int
+
+
+@dataclass(frozen=True)
+class ServerSettings:
+    """Parámetros de los workers WSGI"""
+
+    bind: str = '0.0.0.0:5001'
+    workers: int = 2
+    threads: int = 4
+    max_requests: int = 1000
+    max_requests_jitter: int = 100
+    timeout: int = 30
+    graceful_timeout: int = 30
+    preload: bool = True
+
+    @classmethod
+    def from_env(cls, environ=None):
+        environ = os.environ if environ is None else environ
+        # Un proceso por núcleo solo si la caché y las versiones de ETag se comparten entre procesos;
+        # con almacenes en memoria, un único worker (los hilos cubren la espera de E/S)
+        workers = 1 if local_stores(environ) else os.cpu_count() or 1
+        return cls(
+            bind=f"0.0.0.0:{_env_int(environ, 'PORT', 5001)}",
+            workers=_env_int(environ, 'WEB_WORKERS', workers),
+            threads=_env_int(environ, 'WEB_THREADS', cls.threads),
+            max_requests=_env_int(environ, 'WEB_MAX_REQUESTS', cls.max_requests),
+            max_requests_jitter=_env_int(environ, 'WEB_MAX_REQUESTS_JITTER', cls.max_requests_jitter),
+            timeout=_env_int(environ, 'WEB_TIMEOUT', cls.timeout),
+            graceful_timeout=_env_int(environ, 'WEB_GRACEFUL_TIMEOUT', cls.graceful_timeout),
+            preload=_env_bool(environ, 'WEB_PRELOAD', cls.preload),
+        )
+
+    @property
+    def worker_class(self):
+        return 'gthread' if self.threads > 1 else 'sync'
+
+
+def local_stores(config):
+    """Nombres de los almacenes en memoria del proceso según la configuración o el entorno"""
+    locales = []
+    if config.get('CATALOG_CACHE_BACKEND', 'memory') == 'memory':
+        locales.append('CATALOG_CACHE_BACKEND')
+    if config.get('VERSION_STORE_BACKEND', 'memory') == 'memory':
+        locales.append('VERSION_STORE_BACKEND')
+    return locales
+
+
+def process_local_stores(app):
+    """Nombres de los almacenes en memoria del proceso (no se comparten entre workers)"""
+    return local_stores(app.config)
+
+
+def etags_consistent(app, workers=None):
+    """
+    Indica si los ETags de este proceso valen para todos los que atienden la aplicación.
+
+    Lo son con versiones compartidas, o con versiones en memoria y un único worker (el
+    único caso que check_workers deja arrancar con almacenes del proceso).
+    """
+    workers = ServerSettings.from_env().workers if workers is None else workers
+    return workers <= 1 or 'VERSION_STORE_BACKEND' not in process_local_stores(app)
+
+
+def check_workers(workers, locales):
+    """
+    Impide arrancar varios workers con almacenes en memoria del proceso.
+
+    Cada worker tendría su propia caché y sus propias versiones: tras una escritura en
+    un worker, los demás seguirían respondiendo 304 (o la copia en caché) con datos
+    obsoletos. Lanza RuntimeError, que gunicorn muestra antes de terminar.
+    """
+    if workers > 1 and locales:
+        raise RuntimeError(
+            f"{', '.join(locales)} en memoria con {workers} workers: cada proceso tendría su propia caché "
+            f"y versiones de ETag. Configurar backends shared (o none) o WEB_WORKERS=1"
+        )
+
+
+def init_worker(app):
+    """
+    Prepara un worker recién creado por fork.
+
+    Las conexiones del pool heredadas del proceso padre no deben usarse en el hijo: se
+    descartan sin cerrarlas (dispose(close=False)) y el worker abre las suyas. El almacén
+    de versiones en memoria recibe una época propia para que los ETags de un worker no
+    coincidan con los de otro.
+    """
+    from app.config.database import db
+    from app.repositories.versioning import MemoryVersionStore
+    with app.app_context():
+        db.engine.dispose(close=False)
+    store = app.extensions.get('version_store')
+    if isinstance(store, MemoryVersionStore):
+        store.renew_epoch()
@@ -0,0 +1,119 @@
+"""
+Configuración de la aplicación - Tier 2: Lógica de Negocio
+Valores de app.config que usan create_app y las extensiones, leídos de la
+variable de entorno con el nombre del campo en mayúsculas (jobs_workers ->
+JOBS_WORKERS). Las opciones del motor y del servidor están en EngineSettings
+y ServerSettings.
+"""
+import os
+from dataclasses import dataclass, fields
+from typing import Optional, Union, get_args, get_origin
+from app.config.engine import _env_bool, _env_float, _env_int
+
+
+def _env_str(environ, nombre, defecto):
+    return environ.get(nombre, defecto)
+
+
+def _env_list(environ, nombre, defecto):
+    valor = environ.get(nombre)
+    return tuple(valor.split(',')) if valor is not None else defecto
+
+
+_LECTORES = {int: _env_int, float: _env_float, bool: _env_bool, str: _env_str, tuple: _env_list}
+
+
+def _lector(tipo):
+    """Función de lectura según el tipo del campo (Optional[int] se lee como int)"""
+    if get_origin(tipo) is Union:
+        tipo = next(arg for arg in get_args(tipo) if arg is not type(None))
+    return _LECTORES[tipo]
+
+
+@dataclass(frozen=True)
+class AppSettings:
+    """Parámetros de app.config; cada campo se lee de la variable de entorno con su nombre en mayúsculas"""
+
+    sqlalchemy_database_uri: str = 'sqlite:///limpieza_empresas.db'
+    secret_key: str = 'dev-secret-key-change-in-production'
+    # Si es false, las migraciones del esquema se aplican solo con `flask db-upgrade`
+    db_auto_migrate: bool = True
+    # auto: omite create_all si schema_version ya está en la última versión; always: lo ejecuta en cada arranque
+    db_schema_check: str = 'auto'
+    # Si es true, los listados sin ?limit= también se paginan (por defecto se mantiene la lista completa)
+    api_pagination_required: bool = False
+    # Operaciones en lote: filas por transacción y máximo de elementos por petición
+    bulk_chunk_size: int = 500
+    bulk_max_items: int = 50000
+    # Caché de empresas y servicios: memory, shared (Redis en CATALOG_CACHE_URL) o none
+    catalog_cache_backend: str = 'memory'
+    catalog_cache_url: str = ''
+    catalog_cache_ttl: int = 300
+    catalog_cache_max_entries: int = 10000
+    # Versiones para ETag: memory (por proceso), shared (compartidas entre procesos, Redis en VERSION_STORE_URL) o none
+    version_store_backend: str = 'memory'
+    version_store_url: str = ''
+    # Codificación JSON de listados: auto (orjson si está instalado), orjson o stdlib
+    json_backend: str = 'auto'
+    # Instrumentación: histogramas por ruta en /metrics y cabecera Server-Timing en cada respuesta
+    metrics_enabled: bool = True
+    server_timing_enabled: bool = True
+    # Idempotency-Key en POST/PUT: respuestas guardadas en database, memory o none; TTL y plazo de la reserva en segundos
+    idempotency_store: str = 'database'
+    idempotency_ttl: int = 86400
+    idempotency_max_keys: int = 100000
+    idempotency_lock_timeout: int = 60
+    # Límite de tasa por cliente (API key válida o IP) como 'peticiones_por_segundo/ráfaga'; vacío = sin límite.
+    # RATE_LIMIT_BLUEPRINTS sustituye el valor por defecto en algunos blueprints, p. ej. 'contrato=10/20,reporte=off'
+    rate_limit_default: str = ''
+    rate_limit_blueprints: str = ''
+    # API keys válidas separadas por comas: solo estas identifican al cliente; el resto se limita por IP
+    rate_limit_key_header: str = 'X-API-Key'
+    rate_limit_api_keys: str = ''
+    rate_limit_max_clients: int = 10000
+    # Control de admisión: peticiones en curso por proceso (sin valor = pool_size + max_overflow, o 64 si el motor
+    # no tiene pool acotado, como SQLite; 0 = sin límite) y segundos que una petición espera un hueco antes del 503
+    admission_max_concurrent: Optional[int] = None
+    admission_queue_timeout: float = 1.0
+    # Compresión de respuestas según Accept-Encoding: algoritmos en orden de preferencia (br y zstd si están
+    # instalados), tamaño mínimo en bytes, streaming de exportaciones y caché de respuestas comprimidas por ETag
+    compression_enabled: bool = True
+    compression_algorithms: str = 'br,zstd,gzip'
+    compression_min_size: int = 1024
+    compression_streaming: bool = True
+    compression_cache_max_bytes: int = 32 * 1024 * 1024
+    # Registro de cambios (/api/changes): entradas conservadas, streams SSE abiertos por proceso,
+    # duración de cada stream y segundos entre consultas para ver los cambios de otros procesos
+    change_log_enabled: bool = True
+    change_log_max_entries: int = 100000
+    change_feed_max_streams: int = 2
+    change_feed_stream_timeout: float = 60.0
+    change_feed_poll_interval: float = 1.0
+    # Trabajos en segundo plano (/api/jobs): hilos por proceso, trabajos pendientes admitidos, segundos entre
+    # sondeos de la cola y entre guardados del progreso, conservación del resultado y tamaño máximo de una importación
+    jobs_enabled: bool = True
+    jobs_workers: int = 2
+    jobs_max_queued: int = 100
+    jobs_poll_interval: float = 2.0
+    jobs_progress_interval: float = 1.0
+    jobs_result_ttl: int = 86400
+    jobs_import_max_items: int = 200000
+    # Orígenes permitidos por CORS, separados por comas
+    cors_origins: tuple = ('http://localhost:3001',)
+
+    @classmethod
+    def from_env(cls, environ=None) -> 'AppSettings':
+        """Construye la configuración a partir de las variables de entorno"""
+        environ = os.environ if environ is None else environ
+        return cls(**{
+            campo.name: _lector(campo.type)(environ, campo.name.upper(), campo.default)
+            for campo in fields(cls)
+        })
+
+    def to_config(self) -> dict:
+        """Claves de app.config (los nombres de los campos en mayúsculas)"""
+        config = {}
+        for campo in fields(self):
+            valor = getattr(self, campo.name)
+            config[campo.name.upper()] = list(valor) if isinstance(valor, tuple) else valor
+        return config
@@ -0,0 +1,24 @@
+"""
+Controlador de Caché - Tier 2: Lógica de Negocio (MVC)
+Expone los contadores de la caché de catálogos para poder dimensionarla
+"""
+from flask import Blueprint, jsonify
+from app.repositories.cache import get_catalog_cache
+
+cache_bp = Blueprint('cache', __name__, url_prefix='/api/cache')
+
+@cache_bp.route('/stats', methods=['GET'])
+def get_cache_stats():
+    """Obtiene aciertos, fallos y ocupación de la caché de catálogos"""
+    cache = get_catalog_cache()
+    if cache is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify(dict(cache.to_dict(), enabled=True)), 200
+
+@cache_bp.route('', methods=['DELETE'])
+def clear_cache():
+    """Vacía la caché de catálogos"""
+    cache = get_catalog_cache()
+    if cache is not None:
+        cache.clear()
+    return jsonify({'message': 'Caché vaciada correctamente'}), 200
@@ -0,0 +1,124 @@
+"""
+Controlador del registro de cambios - Tier 2: Lógica de Negocio (MVC)
+Expone los cambios confirmados para que el frontend aplique deltas en lugar de
+volver a pedir los listados:
+- GET /api/changes?since=N devuelve los cambios posteriores a N con las filas actuales.
+- GET /api/changes/stream envía los mismos lotes como Server-Sent Events. Cada
+  stream ocupa un hilo del servidor mientras está abierto, así que se limitan a
+  CHANGE_FEED_MAX_STREAMS por proceso y se cierran tras
+  CHANGE_FEED_STREAM_TIMEOUT segundos; EventSource reconecta solo con
+  Last-Event-ID y continúa donde lo dejó.
+"""
+import threading
+import time
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from app.config.database import db
+from app.controllers.serialization import dumps, json_response
+from app.repositories.change_log_repository import get_change_feed
+from app.services.change_service import ChangeService, ChangesExpired
+
+change_bp = Blueprint('change', __name__, url_prefix='/api/changes')
+
+HEARTBEAT_SECONDS = 15
+
+_streams_lock = threading.Lock()
+_streams = {}
+
+
+def _desactivado():
+    return jsonify({'error': 'El registro de cambios está desactivado'}), 404
+
+
+@change_bp.route('', methods=['GET'])
+def get_changes():
+    """Obtiene los cambios posteriores a ?since= (sin since, solo la última secuencia) con ?limit="""
+    if get_change_feed() is None:
+        return _desactivado()
+    try:
+        since = ChangeService.parse_since(request.args)
+        limit = ChangeService.parse_limit(request.args)
+        cambios, floats_ok = ChangeService.get_changes(since, limit)
+        response = json_response(cambios, floats_ok)
+        response.headers['Cache-Control'] = 'no-store'
+        return response, 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except ChangesExpired as e:
+        return jsonify({'error': str(e), 'reset': True}), 410
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def _evento(nombre, datos, evento_id=None):
+    cabecera = f'id: {evento_id}\n' if evento_id is not None else ''
+    return f'{cabecera}event: {nombre}\ndata: '.encode() + datos + b'\n\n'
+
+
+def _reservar_stream(app):
+    with _streams_lock:
+        abiertos = _streams.get(app, 0)
+        if abiertos >= app.config.get('CHANGE_FEED_MAX_STREAMS', 2):
+            return False
+        _streams[app] = abiertos + 1
+        return True
+
+
+def _liberar_stream(app):
+    with _streams_lock:
+        _streams[app] -= 1
+
+
+@change_bp.route('/stream', methods=['GET'])
+def stream_changes():
+    """Stream SSE de cambios desde ?since= o desde la cabecera Last-Event-ID al reconectar"""
+    feed = get_change_feed()
+    if feed is None:
+        return _desactivado()
+    try:
+        since = ChangeService.parse_since(request.args, request.headers.get('Last-Event-ID'))
+        limit = ChangeService.parse_limit(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    app = current_app._get_current_object()
+    if not _reservar_stream(app):
+        response = jsonify({'error': 'Demasiados streams de cambios abiertos; use /api/changes?since='})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+
+    intervalo = app.config.get('CHANGE_FEED_POLL_INTERVAL', 1.0)
+    duracion = app.config.get('CHANGE_FEED_STREAM_TIMEOUT', 60)
+
+    def generar():
+        cursor = since
+        yield b'retry: 3000\n\n'
+        fin = time.monotonic() + duracion
+        ultimo_envio = time.monotonic()
+        while time.monotonic() < fin:
+            generacion = feed.generation
+            try:
+                cambios, floats_ok = ChangeService.get_changes(cursor, limit)
+            except ChangesExpired as e:
+                yield _evento('reset', dumps({'error': str(e), 'reset': True}))
+                return
+            finally:
+                # No retener una conexión del pool mientras se espera
+                db.session.close()
+            if cursor is None or cambios['changes']:
+                yield _evento('changes', dumps(cambios, floats_ok), cambios['last_seq'])
+                cursor = cambios['last_seq']
+                ultimo_envio = time.monotonic()
+                if cambios['more']:
+                    continue
+            elif time.monotonic() - ultimo_envio >= HEARTBEAT_SECONDS:
+                yield b': ping\n\n'
+                ultimo_envio = time.monotonic()
+            # Los cambios de este proceso despiertan el stream al instante; los de otros procesos, al vencer el intervalo
+            feed.wait(generacion, min(intervalo, max(0.0, fin - time.monotonic())))
+
+    response = Response(stream_with_context(generar()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    # Se libera al cerrar la respuesta aunque el cliente se desconecte antes de empezar a leerla
+    response.call_on_close(lambda: _liberar_stream(app))
+    return response
@@ -0,0 +1,81 @@
+"""
+Peticiones condicionales - Tier 2: Lógica de Negocio (MVC)
+ETag fuertes y Last-Modified a partir de las versiones de colección y fila;
+un If-None-Match que coincide se responde con 304 sin consultar la base de datos,
+y una respuesta ya comprimida para el mismo ETag se sirve desde la caché
+"""
+import hashlib
+from functools import wraps
+from flask import request, make_response
+from werkzeug.http import http_date
+from app.compression import get_compressor
+from app.repositories.versioning import get_version_store
+
+
+def collection_etag(store, colecciones, query_string):
+    """ETag de un listado: versiones de las colecciones y hash de los parámetros de la URL"""
+    partes = [f'{coleccion}-{store.collection_version(coleccion)}' for coleccion in colecciones]
+    # La representación depende de los filtros y la paginación de la URL
+    consulta = hashlib.sha1(query_string).hexdigest()[:12]
+    return '.'.join(partes) + '.' + consulta
+
+
+def row_etag(store, coleccion, fila_id, dependencias):
+    """ETag de un detalle: versión de la fila y de las colecciones embebidas"""
+    partes = [f'{coleccion}:{fila_id}-{store.row_version(coleccion, fila_id)}']
+    partes += [f'{dependencia}-{store.collection_version(dependencia)}' for dependencia in dependencias]
+    return '.'.join(partes)
+
+
+def validator_headers(etag, store, colecciones, weak=False):
+    """Cabeceras ETag, Last-Modified y Cache-Control de una respuesta condicional"""
+    headers = {'ETag': f'W/"{etag}"' if weak else f'"{etag}"', 'Cache-Control': 'no-cache'}
+    fechas = [store.last_modified(coleccion) for coleccion in colecciones]
+    fechas = [fecha for fecha in fechas if fecha is not None]
+    if fechas:
+        headers['Last-Modified'] = http_date(max(fechas))
+    return headers
+
+
+def _set_validators(response, etag, store, colecciones, weak=False):
+    # Cache-Control: no-cache obliga a revalidar siempre, de modo que el navegador nunca sirva una copia obsoleta
+    response.headers.update(validator_headers(etag, store, colecciones, weak))
+    return response
+
+
+def _conditional(calcular_etag, colecciones):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            store = get_version_store()
+            if store is None:
+                return view(*args, **kwargs)
+            # El ETag se calcula antes de leer: si hay una escritura concurrente el cliente
+            # recibe datos nuevos con un ETag antiguo, que en la siguiente petición no coincide
+            etag = calcular_etag(store, kwargs)
+            # Comparación débil: la representación comprimida lleva el mismo ETag marcado como débil
+            if request.if_none_match.contains_weak(etag):
+                return _set_validators(make_response('', 304), etag, store, colecciones)
+            compressor = get_compressor()
+            cached = compressor.cached(etag) if compressor is not None else None
+            if cached is not None:
+                return _set_validators(cached, etag, store, colecciones, weak=True)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                _set_validators(response, etag, store, colecciones)
+            return response
+        return wrapper
+    return decorator
+
+
+def etag_collection(*colecciones):
+    """Decorador para listados: el ETag depende de las versiones de las colecciones indicadas"""
+    return _conditional(lambda store, kwargs: collection_etag(store, colecciones, request.query_string), colecciones)
+
+
+def etag_row(coleccion, id_arg, *dependencias):
+    """Decorador para detalles: el ETag depende de la versión de la fila y de las colecciones embebidas"""
+    return _conditional(
+        lambda store, kwargs: row_etag(store, coleccion, kwargs[id_arg], dependencias),
+        (coleccion,) + dependencias
+    )
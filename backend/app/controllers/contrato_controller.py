@@ -2,32 +2,95 @@
 Controlador de Contrato - Tier 2: Lógica de Negocio (MVC)
 Maneja las peticiones HTTP relacionadas con Contrato
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.services.contrato_service import ContratoService
+from app.services.bulk_service import BulkService
+from app.services.pagination import parse_page_args, page_response
+from app.controllers.export import parse_export_format, export_response
+from app.controllers.conditional import etag_collection, etag_row
+from app.controllers.idempotency import idempotent
+from app.controllers.serialization import json_response, rows_payload, dicts_floats_ok
 
 contrato_bp = Blueprint('contrato', __name__, url_prefix='/api/contratos')
 
+def _vista_payload(rows, vista, cuerpo):
+    """
+    Serializa las filas según la vista y completa el cuerpo de la respuesta.
+    
+    `cuerpo(items)` construye el objeto a devolver; con sideload se le añade
+    `included` con cada empresa y servicio una sola vez.
+    """
+    items, floats_ok = rows_payload(ContratoService.get_serializer(vista), rows)
+    respuesta = cuerpo(items)
+    if vista and vista['sideload']:
+        included = ContratoService.get_included(rows, vista)
+        floats_ok = floats_ok and all(dicts_floats_ok(datos.values()) for datos in included.values())
+        respuesta['included'] = included
+    return json_response(respuesta, floats_ok)
+
 @contrato_bp.route('', methods=['GET'])
+@etag_collection('contratos', 'empresas', 'servicios')
 def get_all_contratos():
-    """Obtiene todos los contratos"""
+    """Obtiene todos los contratos (paginado con ?limit=&cursor=; vista con ?fields=&include=&sideload=)"""
     try:
-        contratos = ContratoService.get_all_contratos()
-        return jsonify([contrato.to_dict() for contrato in contratos]), 200
+        filtros = ContratoService.parse_filtros(request.args)
+        vista = ContratoService.parse_vista(request.args)
+        page = parse_page_args(request.args, current_app.config.get('API_PAGINATION_REQUIRED', False))
+        if page is None:
+            rows = ContratoService.get_contratos_rows(filtros, vista)
+            if vista and vista['sideload']:
+                return _vista_payload(rows, vista, lambda items: {'items': items}), 200
+            items, floats_ok = rows_payload(ContratoService.get_serializer(vista), rows)
+            return json_response(items, floats_ok), 200
+        
+        limit, cursor = page
+        rows, next_cursor = ContratoService.get_contratos_page(filtros, limit, cursor, vista)
+        return _vista_payload(rows, vista, lambda items: page_response(items, next_cursor, limit)), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@contrato_bp.route('/export', methods=['GET'])
+@etag_collection('contratos', 'empresas', 'servicios')
+def export_contratos():
+    """Exporta todos los contratos en streaming (?format=ndjson|json)"""
+    try:
+        formato = parse_export_format(request.args)
+        filtros = ContratoService.parse_filtros(request.args)
+        vista = ContratoService.parse_vista(request.args)
+        rows = ContratoService.iter_contratos(filtros, vista)
+        return export_response(rows, ContratoService.get_serializer(vista), formato, 'contratos')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @contrato_bp.route('/<int:contrato_id>', methods=['GET'])
+@etag_row('contratos', 'contrato_id', 'empresas', 'servicios')
 def get_contrato(contrato_id):
-    """Obtiene un contrato por ID"""
+    """Obtiene un contrato por ID (vista con ?fields=&include=&sideload=)"""
     try:
+        vista = ContratoService.parse_vista(request.args)
+        if vista:
+            row = ContratoService.get_contrato_row(contrato_id, vista)
+            if not row:
+                return jsonify({'error': 'Contrato no encontrado'}), 404
+            if vista['sideload']:
+                return _vista_payload([row], vista, lambda items: {'item': items[0]}), 200
+            return _vista_payload([row], vista, lambda items: items[0]), 200
+        
         contrato = ContratoService.get_contrato_by_id(contrato_id)
         if not contrato:
             return jsonify({'error': 'Contrato no encontrado'}), 404
         return jsonify(contrato.to_dict()), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @contrato_bp.route('', methods=['POST'])
+@idempotent
 def create_contrato():
     """Crea un nuevo contrato"""
     try:
@@ -40,6 +103,7 @@ def create_contrato():
         return jsonify({'error': str(e)}), 500
 
 @contrato_bp.route('/<int:contrato_id>', methods=['PUT'])
+@idempotent
 def update_contrato(contrato_id):
     """Actualiza un contrato"""
     try:
@@ -66,5 +130,20 @@ def delete_contrato(contrato_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-
-
+@contrato_bp.route('/bulk', methods=['POST'])
+@idempotent
+def bulk_contratos():
+    """Crea, actualiza o elimina contratos en lote"""
+    try:
+        items, modo, chunk_size = BulkService.parse_request(
+            request.get_json(),
+            current_app.config['BULK_CHUNK_SIZE'],
+            current_app.config['BULK_MAX_ITEMS']
+        )
+        ok, resultados = ContratoService.bulk_contratos(items, modo, chunk_size)
+        status = 200 if ok else (400 if modo == 'all_or_nothing' else 207)
+        return jsonify(BulkService.summary(modo, resultados)), status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -2,21 +2,53 @@
 Controlador de Empresa - Tier 2: Lógica de Negocio (MVC)
 Maneja las peticiones HTTP relacionadas con Empresa
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.services.empresa_service import EmpresaService
+from app.services.bulk_service import BulkService
+from app.services.pagination import parse_page_args, page_response, parse_delete_mode
+from app.controllers.export import parse_export_format, export_response
+from app.controllers.conditional import etag_collection, etag_row
+from app.controllers.idempotency import idempotent
+from app.controllers.serialization import json_response, rows_payload
+from app.models.serialization import empresa_rows
 
 empresa_bp = Blueprint('empresa', __name__, url_prefix='/api/empresas')
 
 @empresa_bp.route('', methods=['GET'])
+@etag_collection('empresas')
 def get_all_empresas():
-    """Obtiene todas las empresas"""
+    """Obtiene todas las empresas (paginado con ?limit=&cursor=)"""
     try:
-        empresas = EmpresaService.get_all_empresas()
-        return jsonify([empresa.to_dict() for empresa in empresas]), 200
+        filtros = EmpresaService.parse_filtros(request.args)
+        page = parse_page_args(request.args, current_app.config.get('API_PAGINATION_REQUIRED', False))
+        if page is None:
+            items, floats_ok = rows_payload(empresa_rows, EmpresaService.get_empresas_rows(filtros))
+            return json_response(items, floats_ok), 200
+        
+        limit, cursor = page
+        rows, next_cursor = EmpresaService.get_empresas_page(filtros, limit, cursor)
+        items, floats_ok = rows_payload(empresa_rows, rows)
+        return json_response(page_response(items, next_cursor, limit), floats_ok), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@empresa_bp.route('/export', methods=['GET'])
+@etag_collection('empresas')
+def export_empresas():
+    """Exporta todas las empresas en streaming (?format=ndjson|json)"""
+    try:
+        formato = parse_export_format(request.args)
+        filtros = EmpresaService.parse_filtros(request.args)
+        return export_response(EmpresaService.iter_empresas(filtros), empresa_rows, formato, 'empresas')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @empresa_bp.route('/<int:empresa_id>', methods=['GET'])
+@etag_row('empresas', 'empresa_id')
 def get_empresa(empresa_id):
     """Obtiene una empresa por ID"""
     try:
@@ -27,7 +59,20 @@ def get_empresa(empresa_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@empresa_bp.route('/<int:empresa_id>/resumen', methods=['GET'])
+@etag_row('empresas', 'empresa_id', 'contratos')
+def get_resumen_empresa(empresa_id):
+    """Obtiene los totales de contratos de una empresa (resumen mantenido en cada escritura)"""
+    try:
+        resumen = EmpresaService.get_resumen(empresa_id)
+        if resumen is None:
+            return jsonify({'error': 'Empresa no encontrada'}), 404
+        return jsonify(resumen), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @empresa_bp.route('', methods=['POST'])
+@idempotent
 def create_empresa():
     """Crea una nueva empresa"""
     try:
@@ -40,6 +85,7 @@ def create_empresa():
         return jsonify({'error': str(e)}), 500
 
 @empresa_bp.route('/<int:empresa_id>', methods=['PUT'])
+@idempotent
 def update_empresa(empresa_id):
     """Actualiza una empresa"""
     try:
@@ -55,9 +101,10 @@ def update_empresa(empresa_id):
 
 @empresa_bp.route('/<int:empresa_id>', methods=['DELETE'])
 def delete_empresa(empresa_id):
-    """Elimina una empresa"""
+    """Elimina una empresa y sus contratos (?mode=cascade|orm)"""
     try:
-        result = EmpresaService.delete_empresa(empresa_id)
+        modo = parse_delete_mode(request.args)
+        result = EmpresaService.delete_empresa(empresa_id, modo)
         if not result:
             return jsonify({'error': 'Empresa no encontrada'}), 404
         return jsonify({'message': 'Empresa eliminada correctamente'}), 200
@@ -66,5 +113,20 @@ def delete_empresa(empresa_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-
-
+@empresa_bp.route('/bulk', methods=['POST'])
+@idempotent
+def bulk_empresas():
+    """Crea, actualiza o elimina empresas en lote"""
+    try:
+        items, modo, chunk_size = BulkService.parse_request(
+            request.get_json(),
+            current_app.config['BULK_CHUNK_SIZE'],
+            current_app.config['BULK_MAX_ITEMS']
+        )
+        ok, resultados = EmpresaService.bulk_empresas(items, modo, chunk_size)
+        status = 200 if ok else (400 if modo == 'all_or_nothing' else 207)
+        return jsonify(BulkService.summary(modo, resultados)), status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,50 @@
+"""
+Exportación en streaming - Tier 2: Lógica de Negocio (MVC)
+Envía colecciones completas fila a fila sin construir la lista en memoria
+"""
+from flask import Response, stream_with_context
+from app.controllers.serialization import dumps
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json'
+}
+
+
+def parse_export_format(args):
+    """Obtiene el formato de exportación solicitado (ndjson por defecto)"""
+    formato = args.get('format', 'ndjson')
+    if formato not in EXPORT_FORMATS:
+        raise ValueError(f"El formato debe ser uno de: {', '.join(EXPORT_FORMATS)}")
+    return formato
+
+
+def _ndjson(rows, serializer):
+    for row in rows:
+        yield dumps(serializer.to_dict(row), serializer.floats_ok(row)) + b'\n'
+
+
+def _json_array(rows, serializer):
+    yield b'['
+    separador = b''
+    for row in rows:
+        yield separador + dumps(serializer.to_dict(row), serializer.floats_ok(row))
+        separador = b','
+    yield b']\n'
+
+
+def export_response(rows, serializer, formato, nombre):
+    """
+    Construye una respuesta que serializa cada fila a medida que llega de la BD.
+
+    `rows` debe ser un iterador perezoso de tuplas (p. ej. un SELECT con yield_per) para
+    que la memoria quede acotada al tamaño del lote y el primer byte salga enseguida;
+    `serializer` es el RowSerializer del modelo.
+    """
+    generador = _ndjson(rows, serializer) if formato == 'ndjson' else _json_array(rows, serializer)
+    extension = 'ndjson' if formato == 'ndjson' else 'json'
+    return Response(
+        stream_with_context(generador),
+        mimetype=EXPORT_FORMATS[formato],
+        headers={'Content-Disposition': f'attachment; filename={nombre}.{extension}'}
+    )
@@ -0,0 +1,66 @@
+"""
+Escrituras idempotentes - Tier 2: Lógica de Negocio (MVC)
+Con la cabecera Idempotency-Key, la primera petición se ejecuta y su respuesta
+se guarda; los reintentos con la misma clave (y el mismo cuerpo) reciben esa
+respuesta sin volver a validar ni escribir
+"""
+import hashlib
+from functools import wraps
+from flask import Response, jsonify, make_response, request
+from app.repositories.idempotency_repository import get_idempotency_store
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint():
+    """sha256 del método, la ruta, los parámetros y el cuerpo de la petición"""
+    huella = hashlib.sha256()
+    for parte in (request.method.encode(), request.path.encode(), request.query_string, request.get_data()):
+        huella.update(parte)
+        huella.update(b'\0')
+    return huella.hexdigest()
+
+
+def _error(mensaje, status, **headers):
+    response = make_response(jsonify({'error': mensaje}), status)
+    response.headers.update(headers)
+    return response
+
+
+def idempotent(view):
+    """Responde los reintentos con la misma Idempotency-Key desde el almacén de respuestas"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        clave_cliente = request.headers.get(IDEMPOTENCY_HEADER)
+        store = get_idempotency_store()
+        if not clave_cliente or store is None:
+            return view(*args, **kwargs)
+        if len(clave_cliente) > MAX_KEY_LENGTH:
+            return _error(f'La {IDEMPOTENCY_HEADER} no puede superar {MAX_KEY_LENGTH} caracteres', 400)
+
+        # La clave se limita a la operación: la misma clave en otra ruta es otra petición
+        clave = f'{request.method} {request.path} {clave_cliente}'
+        huella = request_fingerprint()
+        registrada = store.reserve(clave, huella)
+        if registrada is not None:
+            if registrada.huella != huella:
+                return _error(f'La {IDEMPOTENCY_HEADER} ya se usó con una petición distinta', 422)
+            if registrada.estado_http is None:
+                return _error(f'Hay una petición con la misma {IDEMPOTENCY_HEADER} en curso', 409, **{'Retry-After': '1'})
+            response = Response(registrada.cuerpo, status=registrada.estado_http, content_type=registrada.content_type)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            store.release(clave)
+            raise
+        if response.status_code >= 500:
+            # Los errores del servidor no se guardan: el reintento vuelve a ejecutar la operación
+            store.release(clave)
+        else:
+            store.complete(clave, response.status_code, response.get_data(), response.content_type)
+        return response
+    return wrapper
@@ -0,0 +1,91 @@
+"""
+Controlador de Trabajos - Tier 2: Lógica de Negocio (MVC)
+Maneja las peticiones HTTP de los trabajos en segundo plano: envío, consulta
+del estado y el progreso, resultado y cancelación
+"""
+from flask import Blueprint, Response, jsonify, request
+from app.controllers.idempotency import idempotent
+from app.jobs import get_job_runner
+from app.services.job_service import JobService, JobQueueFull
+
+job_bp = Blueprint('job', __name__, url_prefix='/api/jobs')
+
+
+@job_bp.before_request
+def _comprobar_activado():
+    if get_job_runner() is None:
+        return jsonify({'error': 'Los trabajos en segundo plano están desactivados'}), 404
+    return None
+
+
+@job_bp.route('', methods=['POST'])
+@idempotent
+def create_job():
+    """Encola un trabajo {"tipo": ..., "parametros": ...}; responde 202 con su estado"""
+    try:
+        tipo, parametros = JobService.parse_submit(request.get_json())
+        job = JobService.submit(tipo, parametros)
+        response = jsonify(job)
+        response.headers['Location'] = f"/api/jobs/{job['id']}"
+        return response, 202
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except JobQueueFull as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@job_bp.route('', methods=['GET'])
+def get_jobs():
+    """Obtiene los trabajos recientes con ?estado= y ?limit="""
+    try:
+        return jsonify(JobService.get_jobs(request.args)), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@job_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Obtiene el estado y el progreso de un trabajo"""
+    try:
+        job = JobService.get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@job_bp.route('/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Obtiene el resultado de un trabajo terminado; 409 mientras no haya terminado correctamente"""
+    try:
+        encontrado = JobService.get_result(job_id)
+        if encontrado is None:
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
+        job, resultado = encontrado
+        if resultado is None:
+            return jsonify({'error': 'El trabajo no tiene resultado', 'estado': job['estado'], 'detalle': job['error']}), 409
+        return Response(resultado, mimetype='application/json'), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@job_bp.route('/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancela un trabajo pendiente o detiene uno en curso en el siguiente lote"""
+    try:
+        cancelado = JobService.cancel_job(job_id)
+        if cancelado is None:
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
+        ok, job = cancelado
+        if not ok:
+            return jsonify({'error': 'El trabajo ya terminó', 'estado': job['estado']}), 409
+        return jsonify(job), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,16 @@
+"""
+Controlador de Métricas - Tier 2: Lógica de Negocio (MVC)
+Expone los histogramas de latencia por ruta en formato Prometheus
+"""
+from flask import Blueprint, Response, abort
+from app.instrumentation import get_metrics_registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Latencia, tiempo SQL, tiempo de serialización y consultas por ruta (formato de texto de Prometheus)"""
+    registry = get_metrics_registry()
+    if registry is None:
+        abort(404)
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4', status=200)
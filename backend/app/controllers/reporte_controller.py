@@ -0,0 +1,34 @@
+"""
+Controlador de Reportes - Tier 2: Lógica de Negocio (MVC)
+Maneja las peticiones HTTP de los reportes agregados de contratos
+"""
+from flask import Blueprint, request, jsonify
+from app.services.reporte_service import ReporteService
+from app.controllers.conditional import etag_collection
+from app.controllers.serialization import json_response, dicts_floats_ok
+
+reporte_bp = Blueprint('reporte', __name__, url_prefix='/api/reportes')
+
+@reporte_bp.route('/resumen', methods=['GET'])
+@etag_collection('contratos')
+def get_resumen_empresas():
+    """Obtiene los totales de contratos por empresa desde el resumen materializado"""
+    try:
+        return jsonify(ReporteService.get_resumen_empresas()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reporte_bp.route('/<nombre>', methods=['GET'])
+@etag_collection(*ReporteService.COLECCIONES)
+def get_reporte(nombre):
+    """Obtiene un reporte (empresas, servicios, meses o estados) con ?fecha_inicio_desde=&fecha_inicio_hasta="""
+    if nombre not in ReporteService.REPORTES:
+        return jsonify({'error': 'Reporte no encontrado'}), 404
+    try:
+        filtros = ReporteService.parse_filtros(request.args)
+        reporte = ReporteService.get_reporte(nombre, filtros)
+        return json_response(reporte, dicts_floats_ok(reporte['items'] + [reporte])), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,65 @@
+"""
+Codificación JSON de respuestas - Tier 2: Lógica de Negocio (MVC)
+Codifica las filas serializadas con orjson si está instalado y con el
+codificador C de la biblioteca estándar en caso contrario. La salida es
+idéntica byte a byte a la de jsonify (claves ordenadas, separadores
+compactos, ASCII).
+"""
+import json
+from flask import Response, current_app
+from app.instrumentation import serialization_timer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+_STDLIB = json.JSONEncoder(sort_keys=True, separators=(',', ':'), ensure_ascii=True)
+
+
+def backend_name():
+    """Backend JSON activo según JSON_BACKEND (auto, orjson o stdlib)"""
+    preferido = current_app.config.get('JSON_BACKEND', 'auto')
+    if preferido == 'stdlib' or orjson is None:
+        return 'stdlib'
+    return 'orjson'
+
+
+def dumps(obj, floats_ok=True):
+    """
+    Codifica `obj` a bytes con el mismo formato que jsonify.
+
+    `floats_ok` indica que todos los float se representan igual en orjson y en la
+    biblioteca estándar; si no, se usa siempre la biblioteca estándar.
+    """
+    with serialization_timer():
+        if floats_ok and backend_name() == 'orjson':
+            salida = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+            if salida.isascii() and b'\x7f' not in salida:
+                return salida
+            # orjson emite UTF-8 y jsonify escapa como \uXXXX todo lo que no es ASCII; reescapar en
+            # Python es más lento que el codificador C de la biblioteca estándar, así que se usa este
+        return _STDLIB.encode(obj).encode('ascii')
+
+
+def rows_payload(serializer, rows):
+    """Convierte filas en diccionarios e indica si sus float son seguros para el backend rápido"""
+    with serialization_timer():
+        floats_ok = all(serializer.floats_ok(row) for row in rows)
+        return [serializer.to_dict(row) for row in rows], floats_ok
+
+
+def dicts_floats_ok(dicts):
+    """Indica si los float de varios diccionarios planos son seguros para el backend rápido"""
+    return all(
+        not isinstance(valor, float) or valor == 0 or 1e-4 <= abs(valor) < 1e16
+        for datos in dicts for valor in datos.values()
+    )
+
+
+def json_response(obj, floats_ok=True):
+    """Respuesta JSON equivalente a jsonify(obj) usando el backend rápido"""
+    if current_app.debug:
+        # En modo debug jsonify indenta la salida; se delega para mantenerla idéntica
+        return current_app.json.response(obj)
+    return Response(dumps(obj, floats_ok) + b'\n', mimetype=current_app.json.mimetype)
@@ -2,21 +2,53 @@
 Controlador de Servicio - Tier 2: Lógica de Negocio (MVC)
 Maneja las peticiones HTTP relacionadas con Servicio
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.services.servicio_service import ServicioService
+from app.services.bulk_service import BulkService
+from app.services.pagination import parse_page_args, page_response, parse_delete_mode
+from app.controllers.export import parse_export_format, export_response
+from app.controllers.conditional import etag_collection, etag_row
+from app.controllers.idempotency import idempotent
+from app.controllers.serialization import json_response, rows_payload
+from app.models.serialization import servicio_rows
 
 servicio_bp = Blueprint('servicio', __name__, url_prefix='/api/servicios')
 
 @servicio_bp.route('', methods=['GET'])
+@etag_collection('servicios')
 def get_all_servicios():
-    """Obtiene todos los servicios"""
+    """Obtiene todos los servicios (paginado con ?limit=&cursor=)"""
     try:
-        servicios = ServicioService.get_all_servicios()
-        return jsonify([servicio.to_dict() for servicio in servicios]), 200
+        filtros = ServicioService.parse_filtros(request.args)
+        page = parse_page_args(request.args, current_app.config.get('API_PAGINATION_REQUIRED', False))
+        if page is None:
+            items, floats_ok = rows_payload(servicio_rows, ServicioService.get_servicios_rows(filtros))
+            return json_response(items, floats_ok), 200
+        
+        limit, cursor = page
+        rows, next_cursor = ServicioService.get_servicios_page(filtros, limit, cursor)
+        items, floats_ok = rows_payload(servicio_rows, rows)
+        return json_response(page_response(items, next_cursor, limit), floats_ok), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@servicio_bp.route('/export', methods=['GET'])
+@etag_collection('servicios')
+def export_servicios():
+    """Exporta todos los servicios en streaming (?format=ndjson|json)"""
+    try:
+        formato = parse_export_format(request.args)
+        filtros = ServicioService.parse_filtros(request.args)
+        return export_response(ServicioService.iter_servicios(filtros), servicio_rows, formato, 'servicios')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @servicio_bp.route('/<int:servicio_id>', methods=['GET'])
+@etag_row('servicios', 'servicio_id')
 def get_servicio(servicio_id):
     """Obtiene un servicio por ID"""
     try:
@@ -28,6 +60,7 @@ def get_servicio(servicio_id):
         return jsonify({'error': str(e)}), 500
 
 @servicio_bp.route('', methods=['POST'])
+@idempotent
 def create_servicio():
     """Crea un nuevo servicio"""
     try:
@@ -40,6 +73,7 @@ def create_servicio():
         return jsonify({'error': str(e)}), 500
 
 @servicio_bp.route('/<int:servicio_id>', methods=['PUT'])
+@idempotent
 def update_servicio(servicio_id):
     """Actualiza un servicio"""
     try:
@@ -55,9 +89,10 @@ def update_servicio(servicio_id):
 
 @servicio_bp.route('/<int:servicio_id>', methods=['DELETE'])
 def delete_servicio(servicio_id):
-    """Elimina un servicio"""
+    """Elimina un servicio y sus contratos (?mode=cascade|orm)"""
     try:
-        result = ServicioService.delete_servicio(servicio_id)
+        modo = parse_delete_mode(request.args)
+        result = ServicioService.delete_servicio(servicio_id, modo)
         if not result:
             return jsonify({'error': 'Servicio no encontrado'}), 404
         return jsonify({'message': 'Servicio eliminado correctamente'}), 200
@@ -66,5 +101,20 @@ def delete_servicio(servicio_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-
-
+@servicio_bp.route('/bulk', methods=['POST'])
+@idempotent
+def bulk_servicios():
+    """Crea, actualiza o elimina servicios en lote"""
+    try:
+        items, modo, chunk_size = BulkService.parse_request(
+            request.get_json(),
+            current_app.config['BULK_CHUNK_SIZE'],
+            current_app.config['BULK_MAX_ITEMS']
+        )
+        ok, resultados = ServicioService.bulk_servicios(items, modo, chunk_size)
+        status = 200 if ok else (400 if modo == 'all_or_nothing' else 207)
+        return jsonify(BulkService.summary(modo, resultados)), status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
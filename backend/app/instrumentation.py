@@ -0,0 +1,247 @@
+"""
+Instrumentación de peticiones - Tier 2: Lógica de Negocio
+Mide por petición la latencia total, el número y tiempo de las consultas SQL
+(eventos before/after_cursor_execute del motor) y el tiempo de serialización
+(filas a diccionarios y codificación JSON). Los valores se devuelven en la
+cabecera Server-Timing y se acumulan en histogramas por ruta que /metrics
+expone en formato Prometheus.
+
+Los histogramas son del proceso: con varios workers cada uno publica los suyos.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+# Límites superiores (segundos) de los histogramas de latencia
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Límites superiores del histograma de consultas por petición
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+_ACTUAL = ContextVar('medicion_peticion', default=None)
+
+
+class RequestTiming:
+    """Tiempos acumulados de la petición en curso"""
+
+    __slots__ = ('inicio', 'sql', 'consultas', 'serializacion')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.sql = 0.0
+        self.consultas = 0
+        self.serializacion = 0.0
+
+    def total(self):
+        return time.perf_counter() - self.inicio
+
+    def server_timing(self, total):
+        """Valor de la cabecera Server-Timing (duraciones en milisegundos)"""
+        app = max(total - self.sql - self.serializacion, 0.0)
+        return (
+            f'db;dur={self.sql * 1000:.2f};desc="{self.consultas} queries", '
+            f'serialize;dur={self.serializacion * 1000:.2f}, '
+            f'app;dur={app * 1000:.2f}, '
+            f'total;dur={total * 1000:.2f}'
+        )
+
+
+def start_timing():
+    """Empieza a medir una petición en el contexto actual (hilo o tarea asyncio)"""
+    medicion = RequestTiming()
+    _ACTUAL.set(medicion)
+    return medicion
+
+
+def stop_timing():
+    _ACTUAL.set(None)
+
+
+def current_timing():
+    return _ACTUAL.get()
+
+
+@contextmanager
+def serialization_timer():
+    """Suma al tiempo de serialización de la petición en curso lo que tarde el bloque"""
+    medicion = _ACTUAL.get()
+    if medicion is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.serializacion += time.perf_counter() - inicio
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask que cuenta la codificación de jsonify como serialización"""
+
+    def dumps(self, obj, **kwargs):
+        with serialization_timer():
+            return super().dumps(obj, **kwargs)
+
+
+def _antes_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('inicio_consulta', []).append(time.perf_counter())
+
+
+def _despues_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info['inicio_consulta'].pop()
+    medicion = _ACTUAL.get()
+    if medicion is not None:
+        medicion.sql += time.perf_counter() - inicio
+        medicion.consultas += 1
+
+
+def instrument_engine(engine):
+    """Registra los eventos de cursor que miden las consultas (motor síncrono o sync_engine de uno asíncrono)"""
+    if not event.contains(engine, 'before_cursor_execute', _antes_de_consulta):
+        event.listen(engine, 'before_cursor_execute', _antes_de_consulta)
+        event.listen(engine, 'after_cursor_execute', _despues_de_consulta)
+
+
+class Histogram:
+    """Histograma acumulativo con límites fijos"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, valor):
+        self.counts[bisect_left(self.buckets, valor)] += 1
+        self.sum += valor
+        self.count += 1
+
+    def cumulative(self):
+        """Pares (le, cuenta acumulada) incluido +Inf"""
+        acumulado = 0
+        for limite, cuenta in zip(self.buckets + (float('inf'),), self.counts):
+            acumulado += cuenta
+            yield limite, acumulado
+
+
+def _etiquetas(valores):
+    escapar = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{clave}="{escapar(valor)}"' for clave, valor in valores)
+
+
+def _numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class MetricsRegistry:
+    """Histogramas de latencia, SQL y serialización y contador de respuestas por ruta"""
+
+    HISTOGRAMAS = (
+        ('http_request_duration_seconds', 'Latencia total de la petición', LATENCY_BUCKETS),
+        ('http_request_sql_duration_seconds', 'Tiempo en consultas SQL por petición', LATENCY_BUCKETS),
+        ('http_request_serialization_duration_seconds', 'Tiempo de serialización por petición', LATENCY_BUCKETS),
+        ('http_request_sql_queries', 'Consultas SQL por petición', QUERY_BUCKETS),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rutas = {}
+        self._respuestas = {}
+        self._collectors = []
+
+    def add_collector(self, collector):
+        """Añade una función que devuelve líneas adicionales para /metrics (p. ej. el control de admisión)"""
+        self._collectors.append(collector)
+
+    def observe(self, metodo, ruta, blueprint, estado, medicion, total):
+        clave = (metodo, ruta, blueprint)
+        with self._lock:
+            histogramas = self._rutas.get(clave)
+            if histogramas is None:
+                histogramas = self._rutas[clave] = [Histogram(buckets) for _, _, buckets in self.HISTOGRAMAS]
+            for histograma, valor in zip(histogramas, (total, medicion.sql, medicion.serializacion, medicion.consultas)):
+                histograma.observe(valor)
+            clave_respuesta = clave + (estado,)
+            self._respuestas[clave_respuesta] = self._respuestas.get(clave_respuesta, 0) + 1
+
+    def render(self):
+        """Texto en formato de exposición de Prometheus"""
+        with self._lock:
+            rutas = {clave: [(list(h.cumulative()), h.sum, h.count) for h in hs] for clave, hs in self._rutas.items()}
+            respuestas = dict(self._respuestas)
+
+        lineas = [
+            '# HELP http_requests_total Peticiones atendidas por ruta y código de estado',
+            '# TYPE http_requests_total counter'
+        ]
+        for (metodo, ruta, blueprint, estado), cuenta in sorted(respuestas.items()):
+            etiquetas = _etiquetas((('method', metodo), ('route', ruta), ('blueprint', blueprint), ('status', estado)))
+            lineas.append(f'http_requests_total{{{etiquetas}}} {cuenta}')
+        for indice, (nombre, ayuda, _) in enumerate(self.HISTOGRAMAS):
+            lineas.append(f'# HELP {nombre} {ayuda}')
+            lineas.append(f'# TYPE {nombre} histogram')
+            for (metodo, ruta, blueprint), datos in sorted(rutas.items()):
+                acumulados, suma, cuenta = datos[indice]
+                base = (('method', metodo), ('route', ruta), ('blueprint', blueprint))
+                for limite, acumulado in acumulados:
+                    lineas.append(f'{nombre}_bucket{{{_etiquetas(base + (("le", _numero(limite)),))}}} {acumulado}')
+                lineas.append(f'{nombre}_sum{{{_etiquetas(base)}}} {_numero(suma)}')
+                lineas.append(f'{nombre}_count{{{_etiquetas(base)}}} {cuenta}')
+        for collector in self._collectors:
+            lineas.extend(collector())
+        return '\n'.join(lineas) + '\n'
+
+
+def get_metrics_registry():
+    """Devuelve el registro de métricas de la aplicación actual (None si está desactivado)"""
+    return current_app.extensions.get('metrics')
+
+
+def record(app, medicion, metodo, ruta, blueprint, estado, headers):
+    """Registra la petición en los histogramas y añade Server-Timing a las cabeceras de respuesta"""
+    total = medicion.total()
+    registry = app.extensions.get('metrics')
+    if registry is not None:
+        registry.observe(metodo, ruta, blueprint or '', estado, medicion, total)
+    if app.config.get('SERVER_TIMING_ENABLED', True):
+        headers['Server-Timing'] = medicion.server_timing(total)
+
+
+def init_instrumentation(app):
+    """Activa la medición de peticiones según METRICS_ENABLED y SERVER_TIMING_ENABLED"""
+    from app.config.database import db
+
+    metricas = app.config.get('METRICS_ENABLED', True)
+    app.extensions['metrics'] = MetricsRegistry() if metricas else None
+    if not metricas and not app.config.get('SERVER_TIMING_ENABLED', True):
+        return None
+
+    with app.app_context():
+        instrument_engine(db.engine)
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def _iniciar_medicion():
+        start_timing()
+
+    @app.after_request
+    def _registrar_medicion(response):
+        medicion = current_timing()
+        if medicion is not None:
+            ruta = request.url_rule.rule if request.url_rule else '<unmatched>'
+            record(app, medicion, request.method, ruta, request.blueprint, response.status_code, response.headers)
+        return response
+
+    @app.teardown_request
+    def _terminar_medicion(exc):
+        stop_timing()
+
+    return app.extensions['metrics']
@@ -0,0 +1,236 @@
+"""
+Trabajos en segundo plano - Tier 2: Lógica de Negocio
+Ejecuta fuera de las peticiones las importaciones masivas y los reportes
+pesados. Cada proceso arranca JOBS_WORKERS hilos que toman trabajos de la
+tabla jobs (la cola es compartida por todos los procesos), de modo que la
+concurrencia está acotada: como máximo JOBS_WORKERS trabajos por proceso, cada
+uno con una conexión del pool.
+
+- Los hilos se arrancan con la primera petición del proceso (también tras el
+  fork de gunicorn), no al importar la aplicación ni en los comandos de flask.
+  Con SQLite en memoria arrancan con el primer trabajo enviado.
+- Un envío en este proceso despierta a un hilo libre al instante; los de otros
+  procesos se ven en el siguiente sondeo (JOBS_POLL_INTERVAL).
+- El progreso se guarda como mucho cada JOBS_PROGRESS_INTERVAL segundos y
+  nunca con una transacción del trabajo abierta (importaciones all_or_nothing):
+  entonces solo se ve en el proceso que lo ejecuta.
+- La cancelación se comprueba en cada lote; una importación all_or_nothing
+  cancelada no escribe nada y de una best_effort se mantienen los lotes ya
+  confirmados.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from flask import current_app, request
+from sqlalchemy.pool import StaticPool
+from app.config.database import db
+from app.repositories.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_SECONDS = 60
+
+
+class JobCancelled(Exception):
+    """Se pidió cancelar el trabajo en curso"""
+
+
+class JobContext:
+    """Progreso y cancelación de un trabajo en ejecución"""
+
+    def __init__(self, job_id, progress_interval=1.0, clock=time.monotonic):
+        self.job_id = job_id
+        self.procesados = 0
+        self.total = None
+        self.progress_interval = progress_interval
+        self._clock = clock
+        self._guardado = None
+        self._cancelar = threading.Event()
+
+    def cancel(self):
+        self._cancelar.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelar.is_set()
+
+    def progress(self, procesados, total=None):
+        """Actualiza el progreso; lanza JobCancelled si se pidió cancelar"""
+        self.procesados = procesados
+        if total is not None:
+            self.total = total
+        ahora = self._clock()
+        guardar = self._guardado is None or ahora - self._guardado >= self.progress_interval
+        if guardar:
+            self._guardado = ahora
+            # Con la transacción del trabajo abierta no se confirma nada: solo se lee (en otra conexión) si se pidió cancelar
+            if db.session().in_transaction():
+                cancelar = JobRepository.cancel_requested(self.job_id)
+            else:
+                cancelar = JobRepository.save_progress(self.job_id, self.procesados, self.total)
+            if cancelar:
+                self._cancelar.set()
+        if self._cancelar.is_set():
+            raise JobCancelled()
+
+
+def _proceso_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobRunner:
+    """Hilos que ejecutan los trabajos de la cola con `ejecutar(tipo, parametros, contexto)`"""
+
+    def __init__(self, app, ejecutar, workers=2, poll_interval=2.0, progress_interval=1.0, result_ttl=86400):
+        self.app = app
+        self.ejecutar = ejecutar
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.progress_interval = progress_interval
+        self.result_ttl = result_ttl
+        self.host = socket.gethostname()
+        self._condicion = threading.Condition()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._hilos = []
+        self._activos = {}
+        self._mantenimiento = 0.0
+        self.terminados = {'succeeded': 0, 'failed': 0, 'cancelled': 0}
+
+    @property
+    def worker_id(self):
+        return f'{self.host}:{os.getpid()}'
+
+    def ensure_started(self):
+        """Arranca los hilos en este proceso si aún no lo están (tras un fork hay que volver a arrancarlos)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._activos = {}
+            self._mantenimiento = 0.0
+            self._hilos = [
+                threading.Thread(target=self._bucle, name=f'job-worker-{n}', daemon=True)
+                for n in range(self.workers)
+            ]
+            for hilo in self._hilos:
+                hilo.start()
+
+    def wake(self):
+        """Avisa a un hilo libre de que hay un trabajo nuevo"""
+        with self._condicion:
+            self._condicion.notify()
+
+    def active(self, job_id):
+        """Contexto del trabajo si se está ejecutando en este proceso"""
+        return self._activos.get(job_id)
+
+    def _bucle(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    self._mantener()
+                    tomado = JobRepository.claim_next(self.worker_id)
+                if tomado is not None:
+                    self._ejecutar(*tomado)
+                    continue
+            except Exception:
+                logger.exception('Error en el worker de trabajos')
+            with self._condicion:
+                self._condicion.wait(self.poll_interval)
+
+    def _mantener(self):
+        """Cada MAINTENANCE_SECONDS, purga los trabajos caducados y cierra los huérfanos de procesos muertos"""
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora - self._mantenimiento < MAINTENANCE_SECONDS:
+                return
+            self._mantenimiento = ahora
+        JobRepository.fail_orphans(self.host, _proceso_vivo, self.result_ttl)
+        JobRepository.purge()
+
+    def _ejecutar(self, job_id, tipo, parametros):
+        contexto = JobContext(job_id, self.progress_interval)
+        self._activos[job_id] = contexto
+        resultado = error = None
+        try:
+            with self.app.app_context():
+                try:
+                    resultado = json.dumps(self.ejecutar(tipo, json.loads(parametros), contexto), default=str)
+                    estado = 'succeeded'
+                except JobCancelled:
+                    db.session.rollback()
+                    estado, error = 'cancelled', 'Cancelado durante la ejecución'
+                except Exception as e:
+                    db.session.rollback()
+                    logger.exception('El trabajo %s (%s) falló', job_id, tipo)
+                    estado, error = 'failed', str(e) or e.__class__.__name__
+                JobRepository.finish(job_id, estado, resultado, error, contexto.procesados, contexto.total,
+                                     self.result_ttl)
+            with self._lock:
+                self.terminados[estado] += 1
+        finally:
+            self._activos.pop(job_id, None)
+
+    def render(self):
+        """Líneas en formato de exposición de Prometheus"""
+        lineas = [
+            '# HELP jobs_workers Hilos que ejecutan trabajos en este proceso',
+            '# TYPE jobs_workers gauge',
+            f'jobs_workers {self.workers if self._pid == os.getpid() else 0}',
+            '# HELP jobs_running Trabajos en ejecución en este proceso',
+            '# TYPE jobs_running gauge',
+            f'jobs_running {len(self._activos)}',
+            '# HELP jobs_finished_total Trabajos terminados en este proceso por estado final',
+            '# TYPE jobs_finished_total counter',
+        ]
+        lineas += [f'jobs_finished_total{{estado="{estado}"}} {n}' for estado, n in self.terminados.items()]
+        return lineas
+
+
+def get_job_runner():
+    """Devuelve el ejecutor de trabajos de la aplicación actual (None si está desactivado)"""
+    return current_app.extensions.get('jobs')
+
+
+def init_jobs(app):
+    """Crea el ejecutor de trabajos según JOBS_*; los hilos arrancan con la primera petición"""
+    workers = app.config.get('JOBS_WORKERS', 2)
+    if not app.config.get('JOBS_ENABLED', True) or workers <= 0:
+        app.extensions['jobs'] = None
+        return None
+
+    from app.services.job_service import JobService
+    runner = JobRunner(
+        app, JobService.run, workers=workers,
+        poll_interval=app.config.get('JOBS_POLL_INTERVAL', 2.0),
+        progress_interval=app.config.get('JOBS_PROGRESS_INTERVAL', 1.0),
+        result_ttl=app.config.get('JOBS_RESULT_TTL', 86400)
+    )
+    app.extensions['jobs'] = runner
+    registry = app.extensions.get('metrics')
+    if registry is not None:
+        registry.add_collector(runner.render)
+
+    # Con SQLite en memoria (benchmarks) todos los hilos comparten una única conexión (StaticPool) y un
+    # worker sondeando la cola se mezclaría con las transacciones de las peticiones: arrancan al enviar un trabajo
+    with app.app_context():
+        conexion_compartida = isinstance(db.engine.pool, StaticPool)
+    if not conexion_compartida:
+        @app.before_request
+        def _arrancar_workers():
+            if request.method != 'OPTIONS':
+                runner.ensure_started()
+
+    return runner
@@ -2,6 +2,10 @@
 from app.models.empresa import Empresa
 from app.models.servicio import Servicio
 from app.models.contrato import Contrato
+from app.models.resumen_empresa import ResumenEmpresa
+from app.models.idempotency_key import IdempotencyKey
+from app.models.change_log import ChangeLog
+from app.models.job import Job
 
 
 
@@ -0,0 +1,26 @@
+"""
+Modelo ChangeLog - Tier 3: Acceso a Datos
+Registro de cambios de empresas, servicios y contratos, escrito en la misma
+transacción que cada escritura; los clientes lo leen con /api/changes?since=
+para aplicar solo las diferencias en lugar de volver a pedir los listados
+"""
+from app.config.database import db
+
+class ChangeLog(db.Model):
+    """Cambio de una fila: secuencia monótona, entidad, id y operación"""
+    __tablename__ = 'change_log'
+    # AUTOINCREMENT en SQLite: una secuencia nunca se reutiliza aunque se purguen las últimas filas
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    entidad = db.Column(db.String(20), nullable=False)  # empresas, servicios o contratos
+    entidad_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # create, update o delete
+    creado_en = db.Column(db.Float, nullable=False)
+    
+    def to_dict(self):
+        """Convierte el modelo a diccionario"""
+        return {'seq': self.seq, 'entidad': self.entidad, 'id': self.entidad_id, 'op': self.op}
+    
+    def __repr__(self):
+        return f'<ChangeLog {self.seq} {self.op} {self.entidad}:{self.entidad_id}>'
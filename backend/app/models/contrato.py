@@ -7,13 +7,17 @@ from datetime import datetime
 class Contrato(db.Model):
     """Modelo que representa un contrato entre empresa y servicio"""
     __tablename__ = 'contratos'
+    __table_args__ = (
+        # Cubre también las búsquedas solo por empresa_id (borrados en cascada, filtros por empresa)
+        db.Index('ix_contratos_empresa_estado_fecha', 'empresa_id', 'estado', 'fecha_inicio'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    empresa_id = db.Column(db.Integer, db.ForeignKey('empresas.id'), nullable=False)
-    servicio_id = db.Column(db.Integer, db.ForeignKey('servicios.id'), nullable=False)
+    empresa_id = db.Column(db.Integer, db.ForeignKey('empresas.id', ondelete='CASCADE'), nullable=False)
+    servicio_id = db.Column(db.Integer, db.ForeignKey('servicios.id', ondelete='CASCADE'), nullable=False, index=True)
     fecha_inicio = db.Column(db.Date, nullable=False)
     fecha_fin = db.Column(db.Date, nullable=True)
-    estado = db.Column(db.String(20), nullable=False, default='activo')  # activo, finalizado, cancelado
+    estado = db.Column(db.String(20), nullable=False, default='activo', index=True)  # activo, finalizado, cancelado
     precio_final = db.Column(db.Float, nullable=False)
     
     def to_dict(self):
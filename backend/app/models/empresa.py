@@ -13,8 +13,9 @@ class Empresa(db.Model):
     telefono = db.Column(db.String(20), nullable=False)
     email = db.Column(db.String(100), nullable=False)
     
-    # Relación con contratos
-    contratos = db.relationship('Contrato', backref='empresa', lazy=True, cascade='all, delete-orphan')
+    # Relación con contratos: la base de datos los elimina en cascada (ON DELETE CASCADE) sin cargarlos
+    contratos = db.relationship('Contrato', backref='empresa', lazy=True, cascade='all, delete-orphan',
+                                passive_deletes=True)
     
     def to_dict(self):
         """Convierte el modelo a diccionario"""
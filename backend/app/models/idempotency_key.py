@@ -0,0 +1,21 @@
+"""
+Modelo IdempotencyKey - Tier 3: Acceso a Datos
+Respuesta guardada de una escritura con cabecera Idempotency-Key, para responder
+los reintentos del cliente sin volver a ejecutar la operación
+"""
+from app.config.database import db
+
+class IdempotencyKey(db.Model):
+    """Clave de idempotencia con la huella de la petición y la respuesta producida"""
+    __tablename__ = 'idempotency_keys'
+    
+    clave = db.Column(db.String(400), primary_key=True)  # "MÉTODO ruta clave-del-cliente"
+    huella = db.Column(db.String(64), nullable=False)  # sha256 del método, la ruta y el cuerpo
+    estado_http = db.Column(db.Integer, nullable=True)  # NULL mientras la petición original está en curso
+    cuerpo = db.Column(db.LargeBinary, nullable=True)
+    content_type = db.Column(db.String(100), nullable=True)
+    creada_en = db.Column(db.Float, nullable=False, index=True)
+    expira_en = db.Column(db.Float, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<IdempotencyKey {self.clave} - {self.estado_http}>'
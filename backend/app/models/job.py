@@ -0,0 +1,60 @@
+"""
+Modelo Job - Tier 3: Acceso a Datos
+Trabajo en segundo plano (importación o reporte) encolado en la base de datos.
+La tabla hace de cola local compartida por todos los procesos: un worker toma
+un trabajo pendiente cambiando su estado con un UPDATE condicional.
+"""
+from datetime import datetime, timezone
+from app.config.database import db
+
+ESTADOS = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+ESTADOS_FINALES = ('succeeded', 'failed', 'cancelled')
+
+
+def _iso(instante):
+    return datetime.fromtimestamp(instante, timezone.utc).isoformat() if instante is not None else None
+
+
+class Job(db.Model):
+    """Trabajo con sus parámetros, progreso y resultado"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # claim_next: pendientes por orden de llegada (estado = 'queued' ORDER BY creado_en); sirve también para
+        # contar los pendientes por estado
+        db.Index('ix_jobs_estado_creado_en', 'estado', 'creado_en'),
+    )
+    
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 en hexadecimal
+    tipo = db.Column(db.String(30), nullable=False)
+    estado = db.Column(db.String(12), nullable=False, default='queued')
+    parametros = db.Column(db.Text, nullable=False)  # JSON
+    procesados = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    resultado = db.Column(db.Text, nullable=True)  # JSON, solo si terminó correctamente
+    error = db.Column(db.Text, nullable=True)
+    cancelar = db.Column(db.Boolean, nullable=False, default=False)  # cancelación pedida mientras se ejecuta
+    worker = db.Column(db.String(100), nullable=True)  # "host:pid" del proceso que lo ejecuta
+    creado_en = db.Column(db.Float, nullable=False, index=True)
+    iniciado_en = db.Column(db.Float, nullable=True)
+    terminado_en = db.Column(db.Float, nullable=True)
+    expira_en = db.Column(db.Float, nullable=True, index=True)  # se purga con su resultado a partir de este instante
+    
+    def to_dict(self):
+        """Convierte el modelo a diccionario (sin el resultado, que se obtiene aparte)"""
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'estado': self.estado,
+            'procesados': self.procesados,
+            'total': self.total,
+            'progreso': round(100 * self.procesados / self.total, 1) if self.total else None,
+            'error': self.error,
+            'cancelacion_solicitada': self.cancelar,
+            'creado_en': _iso(self.creado_en),
+            'iniciado_en': _iso(self.iniciado_en),
+            'terminado_en': _iso(self.terminado_en),
+            'expira_en': _iso(self.expira_en)
+        }
+    
+    def __repr__(self):
+        return f'<Job {self.id} - {self.tipo} {self.estado}>'
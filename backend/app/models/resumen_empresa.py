@@ -0,0 +1,31 @@
+"""
+Modelo de dominio ResumenEmpresa - Tier 3: Acceso a Datos
+Totales de contratos por empresa, mantenidos de forma incremental en la misma
+transacción que cada escritura de contratos
+"""
+from app.config.database import db
+
+class ResumenEmpresa(db.Model):
+    """Resumen materializado de los contratos de una empresa"""
+    __tablename__ = 'resumen_empresas'
+    
+    empresa_id = db.Column(db.Integer, db.ForeignKey('empresas.id', ondelete='CASCADE'), primary_key=True)
+    contratos = db.Column(db.Integer, nullable=False, default=0)
+    contratos_activos = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0.0)  # suma de precio_final de todos los contratos
+    total_activos = db.Column(db.Float, nullable=False, default=0.0)
+    proxima_fecha_fin = db.Column(db.Date, nullable=True)  # fecha_fin más próxima entre los contratos activos
+    
+    def to_dict(self):
+        """Convierte el modelo a diccionario"""
+        return {
+            'empresa_id': self.empresa_id,
+            'contratos': self.contratos,
+            'contratos_activos': self.contratos_activos,
+            'total': round(self.total, 2),
+            'total_activos': round(self.total_activos, 2),
+            'proxima_fecha_fin': self.proxima_fecha_fin.isoformat() if self.proxima_fecha_fin else None
+        }
+    
+    def __repr__(self):
+        return f'<ResumenEmpresa {self.empresa_id} - Contratos: {self.contratos}>'
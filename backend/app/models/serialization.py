@@ -0,0 +1,180 @@
+"""
+Serialización por filas - Tier 3: Acceso a Datos
+Construye los diccionarios de respuesta directamente desde las tuplas de un
+SELECT de columnas, sin instanciar objetos ORM. Para cada modelo se prepara
+(una sola vez) una función equivalente a su to_dict(): un itemgetter con las
+posiciones de sus columnas y un conversor solo para las que lo necesitan.
+"""
+from functools import lru_cache
+from operator import itemgetter
+from sqlalchemy import Float, Date, select
+from app.models.empresa import Empresa
+from app.models.servicio import Servicio
+from app.models.contrato import Contrato
+
+
+def _isoformat(valor):
+    return valor.isoformat() if valor is not None else None
+
+
+def _convertidor(columna):
+    """Conversión a JSON del valor de la columna; None si se copia tal cual"""
+    return _isoformat if isinstance(columna.type, Date) else None
+
+
+def _valores(indices):
+    """Función que devuelve la tupla de valores de la fila en las posiciones indicadas"""
+    indices = tuple(indices)
+    if len(indices) == 1:
+        # itemgetter con un solo índice devuelve el valor en lugar de una tupla
+        indice, = indices
+        return lambda r: (r[indice],)
+    return itemgetter(*indices)
+
+
+class RowSerializer:
+    """
+    Serializador compilado de filas para un modelo.
+
+    `campos` es una lista de (clave, columna) en el mismo orden que to_dict();
+    `anidados` es una lista de (clave, modelo, campos, condicion) para las
+    relaciones embebidas, que se leen con LEFT OUTER JOIN.
+    """
+
+    def __init__(self, model, campos, anidados=()):
+        self.model = model
+        self.anidados = anidados
+        self.columns = [columna.label(clave) for clave, columna in campos]
+        tipos = [columna.type for _, columna in campos]
+        for clave_rel, _, campos_rel, _ in anidados:
+            self.columns += [columna.label(f'{clave_rel}__{clave}') for clave, columna in campos_rel]
+            tipos += [columna.type for _, columna in campos_rel]
+
+        self._float_indices = [i for i, tipo in enumerate(tipos) if isinstance(tipo, Float)]
+        self.to_dict = self._compile(campos, anidados)
+        self.floats_ok = self._compile_float_check()
+
+    @staticmethod
+    def _constructor(campos, inicio):
+        """Función que arma el diccionario de `campos`, leídos de la fila a partir de la posición `inicio`"""
+        claves = tuple(clave for clave, _ in campos)
+        obtener = _valores(range(inicio, inicio + len(campos)))
+        conversiones = tuple(
+            (clave, convertir) for clave, columna in campos if (convertir := _convertidor(columna)) is not None
+        )
+        if not conversiones:
+            return lambda r: dict(zip(claves, obtener(r)))
+
+        def construir(r):
+            datos = dict(zip(claves, obtener(r)))
+            for clave, convertir in conversiones:
+                datos[clave] = convertir(datos[clave])
+            return datos
+        return construir
+
+    def _compile(self, campos, anidados):
+        principal = self._constructor(campos, 0)
+        relaciones = []
+        indice = len(campos)
+        for clave_rel, _, campos_rel, _ in anidados:
+            relaciones.append((clave_rel, indice, self._constructor(campos_rel, indice)))
+            indice += len(campos_rel)
+        if not relaciones:
+            return principal
+
+        def to_dict(r):
+            datos = principal(r)
+            for clave_rel, inicio, construir in relaciones:
+                # El primer campo de la relación es su id: None significa que no hay fila relacionada
+                datos[clave_rel] = construir(r) if r[inicio] is not None else None
+            return datos
+        return to_dict
+
+    def _compile_float_check(self):
+        """
+        Función que indica si los float de la fila se representan igual en todos los backends JSON.
+
+        Los valores muy grandes, muy pequeños o no finitos tienen representaciones distintas
+        entre json (stdlib) y orjson; en ese caso se usa el backend estándar.
+        """
+        if not self._float_indices:
+            return lambda r: True
+        obtener = _valores(self._float_indices)
+        return lambda r: all(x is None or x == 0 or 1e-4 <= abs(x) < 1e16 for x in obtener(r))
+
+    def select(self):
+        """SELECT de las columnas serializadas (con los JOIN de las relaciones embebidas)"""
+        stmt = select(*self.columns).select_from(self.model)
+        for _, modelo, _, condicion in self.anidados:
+            stmt = stmt.outerjoin(modelo, condicion)
+        return stmt
+
+
+EMPRESA_CAMPOS = [
+    ('id', Empresa.id),
+    ('nombre', Empresa.nombre),
+    ('direccion', Empresa.direccion),
+    ('telefono', Empresa.telefono),
+    ('email', Empresa.email)
+]
+
+SERVICIO_CAMPOS = [
+    ('id', Servicio.id),
+    ('nombre', Servicio.nombre),
+    ('descripcion', Servicio.descripcion),
+    ('precio_base', Servicio.precio_base),
+    ('duracion_horas', Servicio.duracion_horas)
+]
+
+CONTRATO_CAMPOS = [
+    ('id', Contrato.id),
+    ('empresa_id', Contrato.empresa_id),
+    ('servicio_id', Contrato.servicio_id),
+    ('fecha_inicio', Contrato.fecha_inicio),
+    ('fecha_fin', Contrato.fecha_fin),
+    ('estado', Contrato.estado),
+    ('precio_final', Contrato.precio_final)
+]
+
+empresa_rows = RowSerializer(Empresa, EMPRESA_CAMPOS)
+servicio_rows = RowSerializer(Servicio, SERVICIO_CAMPOS)
+
+# Relaciones embebibles de un contrato: clave -> (modelo, campos, condición de JOIN, columna FK)
+CONTRATO_RELACIONES = {
+    'empresa': (Empresa, EMPRESA_CAMPOS, Contrato.empresa_id == Empresa.id, 'empresa_id'),
+    'servicio': (Servicio, SERVICIO_CAMPOS, Contrato.servicio_id == Servicio.id, 'servicio_id')
+}
+
+
+def subset_campos(campos, nombres):
+    """Campos cuyo nombre está en `nombres` (todos si es None); el id se conserva siempre"""
+    if nombres is None:
+        return campos
+    return [(clave, columna) for clave, columna in campos if clave == 'id' or clave in nombres]
+
+
+@lru_cache(maxsize=128)
+def contrato_serializer(fields=None, include=('empresa', 'servicio'), include_fields=(), sideload=False):
+    """
+    Serializador de contratos para una vista (?fields=, ?include=, ?sideload=).
+
+    Solo se seleccionan las columnas pedidas y solo se hace JOIN con las relaciones
+    incluidas. Con `sideload` no se embeben relaciones: se añade su clave foránea
+    para que las entidades relacionadas se entreguen aparte, una sola vez.
+    Los argumentos son tuplas para poder reutilizar el serializador compilado.
+    """
+    campos = subset_campos(CONTRATO_CAMPOS, fields)
+    campos_rel = dict(include_fields)
+    if sideload:
+        claves = {clave for clave, _ in campos}
+        fks = {CONTRATO_RELACIONES[rel][3] for rel in include}
+        campos = [(clave, columna) for clave, columna in CONTRATO_CAMPOS if clave in claves or clave in fks]
+        return RowSerializer(Contrato, campos)
+    anidados = [
+        (rel, modelo, subset_campos(campos_modelo, campos_rel.get(rel)), condicion)
+        for rel, (modelo, campos_modelo, condicion, _) in CONTRATO_RELACIONES.items() if rel in include
+    ]
+    return RowSerializer(Contrato, campos, anidados)
+
+
+contrato_rows = contrato_serializer()
@@ -13,8 +13,9 @@ class Servicio(db.Model):
     precio_base = db.Column(db.Float, nullable=False)
     duracion_horas = db.Column(db.Float, nullable=False)
     
-    # Relación con contratos
-    contratos = db.relationship('Contrato', backref='servicio', lazy=True, cascade='all, delete-orphan')
+    # Relación con contratos: la base de datos los elimina en cascada (ON DELETE CASCADE) sin cargarlos
+    contratos = db.relationship('Contrato', backref='servicio', lazy=True, cascade='all, delete-orphan',
+                                passive_deletes=True)
     
     def to_dict(self):
         """Convierte el modelo a diccionario"""
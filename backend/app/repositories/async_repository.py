@@ -0,0 +1,122 @@
+"""
+Repositorios asíncronos - Tier 3: Acceso a Datos
+Variante asyncio de las lecturas y altas de empresas, servicios y contratos
+para el modo ASGI. Reutiliza las consultas de los repositorios síncronos
+(filtros, SELECT de columnas, paginación por cursor) y ejecuta sobre una
+AsyncSession; las versiones de ETag y el resumen por empresa se mantienen igual.
+"""
+from sqlalchemy import insert
+from app.models.empresa import Empresa
+from app.models.servicio import Servicio
+from app.models.contrato import Contrato
+from app.models.serialization import empresa_rows, servicio_rows, contrato_rows
+from app.repositories.empresa_repository import EmpresaRepository
+from app.repositories.servicio_repository import ServicioRepository
+from app.repositories.contrato_repository import ContratoRepository
+from app.repositories.resumen_repository import ResumenRepository
+from app.repositories.pagination import keyset_stmt, split_page
+from app.repositories.versioning import mark_changed
+from app.repositories.change_log_repository import record_changes
+from app.repositories import cache
+
+
+class _AsyncCatalogRepository:
+    """Operaciones comunes de empresas y servicios sobre una AsyncSession"""
+
+    model = None
+    rows = None
+    repository = None
+    coleccion = None
+    namespace = None
+
+    @classmethod
+    async def get_rows(cls, session, filtros=None):
+        stmt = cls.repository._filtrar(filtros, cls.rows.select()).order_by(cls.model.id)
+        return (await session.execute(stmt)).all()
+
+    @classmethod
+    async def get_page(cls, session, filtros=None, limit=100, cursor=None):
+        stmt = keyset_stmt(cls.repository._filtrar(filtros, cls.rows.select()), cls.model.id, limit, cursor)
+        return split_page((await session.execute(stmt)).all(), limit)
+
+    @classmethod
+    async def get_row_by_id(cls, session, entidad_id):
+        return (await session.execute(cls.rows.select().where(cls.model.id == entidad_id))).first()
+
+    @classmethod
+    async def create(cls, session, data):
+        """Inserta una fila con los CAMPOS del repositorio síncrono, confirma y devuelve su id"""
+        valores = {campo: data.get(campo) for campo in cls.repository.CAMPOS}
+        nuevo_id = (await session.execute(insert(cls.model).returning(cls.model.id), [valores])).scalar_one()
+        mark_changed(session.sync_session, cls.coleccion)
+        record_changes(session.sync_session, cls.coleccion, 'create', [nuevo_id])
+        await session.commit()
+        return nuevo_id
+
+    @classmethod
+    async def get_cached(cls, session, ids):
+        """{id: datos} de las entidades existentes, leyendo primero de la caché de catálogos"""
+        async def cargar(faltantes):
+            stmt = cls.rows.select().where(cls.model.id.in_(faltantes))
+            return {row.id: cls.rows.to_dict(row) for row in (await session.execute(stmt)).all()}
+        return await cache.cached_lookup_async(cls.namespace, ids, cargar)
+
+
+class AsyncEmpresaRepository(_AsyncCatalogRepository):
+    """Repositorio asíncrono de Empresa"""
+    model = Empresa
+    rows = empresa_rows
+    repository = EmpresaRepository
+    coleccion = 'empresas'
+    namespace = 'empresa'
+
+
+class AsyncServicioRepository(_AsyncCatalogRepository):
+    """Repositorio asíncrono de Servicio"""
+    model = Servicio
+    rows = servicio_rows
+    repository = ServicioRepository
+    coleccion = 'servicios'
+    namespace = 'servicio'
+
+
+class AsyncContratoRepository:
+    """Repositorio asíncrono de Contrato"""
+
+    @staticmethod
+    async def get_rows(session, filtros=None, serializer=contrato_rows):
+        stmt = ContratoRepository._filtrar(filtros, serializer.select()).order_by(Contrato.id)
+        return (await session.execute(stmt)).all()
+
+    @staticmethod
+    async def get_page(session, filtros=None, limit=100, cursor=None, serializer=contrato_rows):
+        stmt = keyset_stmt(ContratoRepository._filtrar(filtros, serializer.select()), Contrato.id, limit, cursor)
+        return split_page((await session.execute(stmt)).all(), limit)
+
+    @staticmethod
+    async def get_row_by_id(session, contrato_id, serializer=contrato_rows):
+        return (await session.execute(serializer.select().where(Contrato.id == contrato_id))).first()
+
+    @staticmethod
+    async def load_referencias(session, empresa_ids, servicio_ids, hoy):
+        """Referencias para ContratoService.validate_create, con el mismo formato que la versión síncrona"""
+        empresas = await AsyncEmpresaRepository.get_cached(session, empresa_ids)
+        servicios = await AsyncServicioRepository.get_cached(session, servicio_ids)
+        return {
+            'empresas': set(empresas),
+            'servicios': {servicio_id: datos['precio_base'] for servicio_id, datos in servicios.items()},
+            'hoy': hoy
+        }
+
+    @staticmethod
+    async def create(session, contrato_data):
+        """Inserta un contrato ya validado y actualiza el resumen de su empresa en la misma transacción"""
+        row = ContratoRepository._to_row(contrato_data)
+        nuevo_id = (await session.execute(insert(Contrato).returning(Contrato.id), [row])).scalar_one()
+        dialecto = session.bind.dialect.name
+        for stmt, params in ResumenRepository.sentencias((), [ResumenRepository.fila(row)], dialecto):
+            await session.execute(stmt, params)
+        mark_changed(session.sync_session, 'contratos')
+        record_changes(session.sync_session, 'contratos', 'create', [nuevo_id])
+        await session.commit()
+        return nuevo_id
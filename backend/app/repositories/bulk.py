@@ -0,0 +1,97 @@
+"""
+Escritura en lote - Tier 3: Acceso a Datos
+Aplica operaciones de creación, actualización y eliminación por lotes,
+con una transacción por lote en lugar de un commit por fila
+"""
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app.config.database import db
+
+
+def chunked(items, size):
+    """Divide una secuencia en lotes de tamaño `size`"""
+    for inicio in range(0, len(items), size):
+        yield items[inicio:inicio + size]
+
+
+def insert_returning_ids(model, registros):
+    """
+    Inserta las filas en una sola sentencia y devuelve sus ids en el orden de `registros` (sin commit).
+
+    Fuera de SQLite el orden lo garantiza RETURNING con sort_by_parameter_order. En SQLite esa
+    opción obliga a un INSERT por fila; allí los ids autoincrementales se asignan en el orden
+    de las filas, así que basta con ordenarlos.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        return sorted(db.session.execute(insert(model).returning(model.id), registros).scalars())
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(db.session.execute(stmt, registros).scalars())
+
+
+def _apply_chunk(repository, chunk):
+    """
+    Ejecuta las operaciones de un lote y devuelve {indice: id}.
+
+    Dentro de un lote se aplican primero las creaciones, luego las
+    actualizaciones y por último las eliminaciones.
+    """
+    ids = {}
+    creates = [op for op in chunk if op['op'] == 'create']
+    updates = [op for op in chunk if op['op'] == 'update']
+    deletes = [op for op in chunk if op['op'] == 'delete']
+
+    if creates:
+        nuevos = repository.bulk_insert([op['data'] for op in creates])
+        for op, nuevo_id in zip(creates, nuevos):
+            ids[op['index']] = nuevo_id
+    if updates:
+        repository.bulk_update([(op['id'], op['data']) for op in updates])
+    if deletes:
+        repository.bulk_delete([op['id'] for op in deletes])
+
+    for op in updates + deletes:
+        ids[op['index']] = op['id']
+    return ids
+
+
+def write_in_chunks(repository, operaciones, chunk_size, atomic, on_chunk=None):
+    """
+    Escribe las operaciones validadas en lotes de `chunk_size`.
+
+    - atomic=True: todos los lotes comparten una transacción; si uno falla no se escribe nada.
+    - atomic=False: cada lote se confirma por separado; un lote fallido no afecta a los demás.
+
+    `on_chunk(procesadas, total)` se llama después de cada lote (trabajos en segundo plano);
+    si lanza una excepción la escritura se interrumpe y quien llama debe deshacer la transacción.
+
+    Devuelve (escritos, errores): {indice: id} y {indice: mensaje}.
+    """
+    escritos = {}
+    errores = {}
+    procesadas = 0
+    for chunk in chunked(operaciones, chunk_size):
+        try:
+            ids = _apply_chunk(repository, chunk)
+            if atomic:
+                db.session.flush()
+            else:
+                db.session.commit()
+            escritos.update(ids)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            mensaje = f'Error de base de datos: {e.__class__.__name__}'
+            if atomic:
+                return {}, {op['index']: mensaje for op in operaciones}
+            errores.update({op['index']: mensaje for op in chunk})
+        procesadas += len(chunk)
+        if on_chunk is not None:
+            on_chunk(procesadas, len(operaciones))
+
+    if atomic and operaciones:
+        try:
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            mensaje = f'Error de base de datos: {e.__class__.__name__}'
+            return {}, {op['index']: mensaje for op in operaciones}
+    return escritos, errores
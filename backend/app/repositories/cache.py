@@ -0,0 +1,337 @@
+"""
+Caché de catálogos - Tier 3: Acceso a Datos
+Caché de lectura (read-through) para empresas y servicios, que cambian poco
+pero se consultan en cada alta o modificación de contratos. También guarda los
+reportes agregados, con claves que incluyen las versiones de las colecciones.
+
+Backends disponibles:
+- MemoryCacheBackend: en proceso, con expiración (TTL) y desalojo LRU.
+- SharedCacheBackend: sobre un almacén clave-valor compartido con interfaz tipo
+  Redis (get/set con ex/delete). LocalKeyValueStore es un sustituto local para
+  pruebas, que se inyecta explícitamente: no se comparte entre procesos.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_MISS = object()
+_PENDIENTES = 'invalidaciones_pendientes'
+
+
+class CacheStats:
+    """Contadores de uso de la caché"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.invalidations = 0
+
+    def incr(self, campo, cantidad=1):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + cantidad)
+
+    def to_dict(self):
+        consultas = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'sets': self.sets,
+            'invalidations': self.invalidations,
+            'hit_ratio': round(self.hits / consultas, 4) if consultas else None
+        }
+
+
+class MemoryCacheBackend:
+    """Caché en memoria del proceso con TTL y desalojo del elemento menos usado"""
+
+    def __init__(self, max_entries=10000, ttl=300, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entrada = self._data.get(key)
+            if entrada is None:
+                return _MISS
+            expira, valor = entrada
+            if expira <= self._clock():
+                del self._data[key]
+                return _MISS
+            self._data.move_to_end(key)
+            return valor
+
+    def set(self, key, valor):
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, valor)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def info(self):
+        return {'backend': 'memory', 'entries': len(self._data), 'max_entries': self.max_entries,
+                'ttl': self.ttl, 'evictions': self.evictions}
+
+
+class LocalKeyValueStore:
+    """Sustituto local de un almacén clave-valor compartido (subconjunto de la API de Redis)"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entrada = self._data.get(key)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira is not None and expira <= self._clock():
+                del self._data[key]
+                return None
+            return valor
+
+    def set(self, key, valor, ex=None):
+        with self._lock:
+            self._data[key] = (self._clock() + ex if ex else None, valor)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            expira, valor = self._data.get(key, (None, 0))
+            nuevo = int(valor) + amount
+            self._data[key] = (expira, nuevo)
+            return nuevo
+
+    def scan_iter(self, match='*'):
+        prefijo = match.rstrip('*')
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefijo)]
+        return iter(keys)
+
+    def dbsize(self):
+        return len(self._data)
+
+
+def redis_client(url):
+    """Cliente Redis para la URL indicada (dependencia opcional: requirements-shared.txt)"""
+    try:
+        import redis
+    except ImportError as e:
+        raise RuntimeError('Los almacenes compartidos con URL requieren el paquete redis '
+                           '(pip install -r requirements-shared.txt)') from e
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+def shared_client(app, prefijo):
+    """
+    Cliente del almacén compartido configurado con el prefijo indicado (p. ej. VERSION_STORE).
+
+    Usa el cliente inyectado en app.config[f'{prefijo}_CLIENT'] o crea uno con la URL de
+    f'{prefijo}_URL'. Sin ninguno de los dos lanza ValueError: un almacén en memoria del
+    proceso no es compartido y daría resultados distintos en cada worker.
+    """
+    client = app.config.get(f'{prefijo}_CLIENT')
+    if client is not None:
+        return client
+    url = app.config.get(f'{prefijo}_URL')
+    if not url:
+        raise ValueError(f'{prefijo}_BACKEND=shared requiere {prefijo}_URL (p. ej. redis://localhost:6379/0)')
+    return redis_client(url)
+
+
+class SharedCacheBackend:
+    """Caché sobre un almacén clave-valor compartido entre procesos (valores en JSON)"""
+
+    def __init__(self, client, ttl=300, prefix='catalog:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return _MISS if raw is None else json.loads(raw)
+
+    def set(self, key, valor):
+        self.client.set(self.prefix + key, json.dumps(valor), ex=self.ttl)
+
+    def delete(self, keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def info(self):
+        return {'backend': 'shared', 'ttl': self.ttl, 'prefix': self.prefix}
+
+
+class CatalogCache:
+    """Caché de entidades de catálogo por espacio de nombres (empresa, servicio)"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = CacheStats()
+
+    @staticmethod
+    def _key(namespace, entidad_id):
+        return f'{namespace}:{entidad_id}'
+
+    def get_many(self, namespace, ids):
+        """Devuelve ({id: valor} encontrados, [ids no encontrados])"""
+        encontrados = {}
+        faltantes = []
+        for entidad_id in ids:
+            valor = self.backend.get(self._key(namespace, entidad_id))
+            if valor is _MISS:
+                faltantes.append(entidad_id)
+            else:
+                encontrados[entidad_id] = valor
+        self.stats.incr('hits', len(encontrados))
+        self.stats.incr('misses', len(faltantes))
+        return encontrados, faltantes
+
+    def set_many(self, namespace, valores):
+        for entidad_id, valor in valores.items():
+            self.backend.set(self._key(namespace, entidad_id), valor)
+        self.stats.incr('sets', len(valores))
+
+    def invalidate(self, namespace, ids):
+        self.backend.delete([self._key(namespace, entidad_id) for entidad_id in ids])
+        self.stats.incr('invalidations', len(ids))
+
+    def clear(self):
+        self.backend.clear()
+
+    def to_dict(self):
+        return dict(self.backend.info(), **self.stats.to_dict())
+
+
+def init_cache(app):
+    """
+    Crea la caché de catálogos según CATALOG_CACHE_BACKEND (memory, shared o none).
+
+    shared usa el cliente de app.config['CATALOG_CACHE_CLIENT'] o un cliente Redis creado
+    con CATALOG_CACHE_URL; si no hay ninguno, la aplicación no arranca.
+    """
+    tipo = app.config.get('CATALOG_CACHE_BACKEND', 'memory')
+    ttl = app.config.get('CATALOG_CACHE_TTL', 300)
+    if tipo == 'none':
+        app.extensions['catalog_cache'] = None
+        return None
+    if tipo == 'shared':
+        backend = SharedCacheBackend(shared_client(app, 'CATALOG_CACHE'), ttl=ttl)
+    elif tipo == 'memory':
+        backend = MemoryCacheBackend(max_entries=app.config.get('CATALOG_CACHE_MAX_ENTRIES', 10000), ttl=ttl)
+    else:
+        raise ValueError(f'Backend de caché desconocido: {tipo}')
+    cache = CatalogCache(backend)
+    app.extensions['catalog_cache'] = cache
+    return cache
+
+
+def get_catalog_cache():
+    """Devuelve la caché de la aplicación actual (None si está desactivada)"""
+    return current_app.extensions.get('catalog_cache')
+
+
+def cached_lookup(namespace, ids, cargar):
+    """
+    Lectura read-through: devuelve {id: valor} para los ids existentes.
+
+    `cargar(ids)` consulta la base de datos para los ids que no están en caché y
+    devuelve {id: valor}; los resultados se guardan en la caché.
+    """
+    ids = list(set(ids))
+    cache = get_catalog_cache()
+    if cache is None:
+        return cargar(ids)
+    encontrados, faltantes = cache.get_many(namespace, ids)
+    if faltantes:
+        cargados = cargar(faltantes)
+        cache.set_many(namespace, cargados)
+        encontrados.update(cargados)
+    return encontrados
+
+
+async def cached_lookup_async(namespace, ids, cargar):
+    """Igual que cached_lookup, con `cargar` asíncrona (capa de datos ASGI)"""
+    ids = list(set(ids))
+    cache = get_catalog_cache()
+    if cache is None:
+        return await cargar(ids)
+    encontrados, faltantes = cache.get_many(namespace, ids)
+    if faltantes:
+        cargados = await cargar(faltantes)
+        cache.set_many(namespace, cargados)
+        encontrados.update(cargados)
+    return encontrados
+
+
+def cached_value(namespace, clave, cargar):
+    """
+    Lectura read-through de un único valor: devuelve el guardado en `clave` o el de `cargar()`.
+
+    La clave debe incluir todo aquello de lo que depende el valor (por ejemplo las
+    versiones de las colecciones), de modo que un cambio produzca una clave nueva.
+    """
+    cache = get_catalog_cache()
+    if cache is None:
+        return cargar()
+    encontrados, _ = cache.get_many(namespace, [clave])
+    if clave in encontrados:
+        return encontrados[clave]
+    valor = cargar()
+    cache.set_many(namespace, {clave: valor})
+    return valor
+
+
+def invalidate_on_commit(session, namespace, ids):
+    """
+    Registra la invalidación de los ids indicados; se aplica cuando la sesión confirma la transacción.
+
+    Invalidar antes del commit dejaría un hueco en el que otra petición vuelve a guardar en
+    la caché la fila anterior, que seguiría ahí hasta el TTL. Si la transacción se deshace,
+    los datos no cambiaron y la invalidación se descarta.
+    """
+    cache = get_catalog_cache()
+    if cache is not None and ids:
+        session.info.setdefault(_PENDIENTES, []).append((cache, namespace, list(ids)))
+
+
+@event.listens_for(Session, 'after_commit')
+def _aplicar_invalidaciones(session):
+    for cache, namespace, ids in session.info.pop(_PENDIENTES, []):
+        cache.invalidate(namespace, ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _descartar_invalidaciones(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDIENTES, None)
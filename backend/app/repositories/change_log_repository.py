@@ -0,0 +1,157 @@
+"""
+Registro de cambios - Tier 3: Acceso a Datos
+Los repositorios anotan en la sesión cada fila creada, modificada o eliminada
+y las entradas se insertan en change_log justo antes de confirmar, dentro de la
+misma transacción que los datos: un cambio confirmado siempre tiene su entrada
+y uno deshecho nunca la tiene.
+
+En PostgreSQL las transacciones que escriben en el registro se serializan con
+un bloqueo consultivo desde la inserción hasta el commit, de modo que las
+secuencias se hacen visibles en orden y un lector que avanza su cursor no se
+salta una secuencia menor confirmada después. Se conservan las últimas
+CHANGE_LOG_MAX_ENTRIES entradas.
+"""
+import threading
+import time
+from flask import current_app
+from sqlalchemy import delete, event, func, insert, select, text
+from sqlalchemy.orm import Session
+from app.config.database import db
+from app.models.change_log import ChangeLog
+from app.models.contrato import Contrato
+from app.models.serialization import empresa_rows, servicio_rows, contrato_rows
+from app.repositories.bulk import chunked
+
+_PENDIENTES = 'cambios_pendientes'
+_NOTIFICAR = 'cambios_notificar'
+
+SERIALIZERS = {'empresas': empresa_rows, 'servicios': servicio_rows, 'contratos': contrato_rows}
+
+
+class ChangeFeed:
+    """Configuración del registro y aviso a los streams del proceso cuando se confirman cambios"""
+
+    def __init__(self, max_entries=100000, purge_every=1000):
+        self.max_entries = max_entries
+        self.purge_every = purge_every
+        self._condicion = threading.Condition()
+        self._generacion = 0
+        self._escritas = 0
+
+    @property
+    def generation(self):
+        return self._generacion
+
+    def notify(self):
+        with self._condicion:
+            self._generacion += 1
+            self._condicion.notify_all()
+
+    def wait(self, generacion, timeout):
+        """Espera hasta que haya cambios confirmados en este proceso o venza el plazo; devuelve la generación"""
+        with self._condicion:
+            self._condicion.wait_for(lambda: self._generacion != generacion, timeout)
+            return self._generacion
+
+    def should_purge(self, escritas):
+        with self._condicion:
+            antes = self._escritas
+            self._escritas += escritas
+            return antes // self.purge_every != self._escritas // self.purge_every
+
+
+def init_change_log(app):
+    """Activa el registro de cambios según CHANGE_LOG_ENABLED"""
+    feed = ChangeFeed(max_entries=app.config.get('CHANGE_LOG_MAX_ENTRIES', 100000)) \
+        if app.config.get('CHANGE_LOG_ENABLED', True) else None
+    app.extensions['change_feed'] = feed
+    return feed
+
+
+def get_change_feed():
+    """Devuelve el registro de cambios de la aplicación actual (None si está desactivado)"""
+    return current_app.extensions.get('change_feed')
+
+
+def record_changes(session, entidad, op, ids):
+    """Anota cambios de filas; se insertan en change_log al confirmar la transacción de la sesión"""
+    feed = get_change_feed()
+    if feed is None or not ids:
+        return
+    session.info.setdefault(_PENDIENTES, []).append((feed, entidad, op, list(ids)))
+
+
+def record_cascade_deletes(session, columna, ids):
+    """Anota el borrado de los contratos que eliminará en cascada el borrado de las empresas o servicios indicados"""
+    if get_change_feed() is None:
+        return
+    contrato_ids = []
+    for lote in chunked(list(ids), 500):
+        contrato_ids += session.scalars(select(Contrato.id).where(columna.in_(lote))).all()
+    record_changes(session, 'contratos', 'delete', contrato_ids)
+
+
+@event.listens_for(Session, 'before_commit')
+def _escribir_cambios(session):
+    pendientes = session.info.pop(_PENDIENTES, None)
+    if not pendientes:
+        return
+    feed = pendientes[0][0]
+    conexion = session.connection()
+    if conexion.dialect.name == 'postgresql':
+        conexion.execute(text('SELECT pg_advisory_xact_lock(7247)'))
+    ahora = time.time()
+    filas = [
+        {'entidad': entidad, 'entidad_id': fila_id, 'op': op, 'creado_en': ahora}
+        for _, entidad, op, ids in pendientes for fila_id in ids
+    ]
+    conexion.execute(insert(ChangeLog), filas)
+    if feed.should_purge(len(filas)):
+        ChangeLogRepository.purge(conexion, feed.max_entries)
+    session.info[_NOTIFICAR] = feed
+
+
+@event.listens_for(Session, 'after_commit')
+def _notificar_cambios(session):
+    feed = session.info.pop(_NOTIFICAR, None)
+    if feed is not None:
+        feed.notify()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _descartar_cambios(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDIENTES, None)
+        session.info.pop(_NOTIFICAR, None)
+
+
+class ChangeLogRepository:
+    """Lectura y purga del registro de cambios"""
+
+    @staticmethod
+    def bounds():
+        """(primera, última) secuencia conservada; (None, 0) si el registro está vacío"""
+        primera, ultima = db.session.execute(select(func.min(ChangeLog.seq), func.max(ChangeLog.seq))).one()
+        return primera, ultima or 0
+
+    @staticmethod
+    def since(seq, limit):
+        """Entradas con secuencia mayor que `seq`, en orden, hasta `limit`"""
+        stmt = select(ChangeLog.seq, ChangeLog.entidad, ChangeLog.entidad_id, ChangeLog.op) \
+            .where(ChangeLog.seq > seq).order_by(ChangeLog.seq).limit(limit)
+        return db.session.execute(stmt).all()
+
+    @staticmethod
+    def current_rows(entidad, ids):
+        """Filas actuales (tuplas de columnas) de la entidad para los ids que siguen existiendo"""
+        serializer = SERIALIZERS[entidad]
+        rows = []
+        for lote in chunked(sorted(ids), 500):
+            rows += db.session.execute(serializer.select().where(serializer.model.id.in_(lote))).all()
+        return serializer, rows
+
+    @staticmethod
+    def purge(conexion, max_entries):
+        """Elimina las entradas anteriores a las últimas `max_entries`"""
+        ultima = conexion.execute(select(func.max(ChangeLog.seq))).scalar() or 0
+        conexion.execute(delete(ChangeLog).where(ChangeLog.seq <= ultima - max_entries))
@@ -2,40 +2,119 @@
 Repositorio de Contrato - Tier 3: Acceso a Datos
 Encapsula todas las operaciones de acceso a datos para Contrato
 """
+from sqlalchemy import update, delete
 from app.config.database import db
 from app.models.contrato import Contrato
-from datetime import datetime
+from app.repositories.pagination import paginate_keyset
+from app.models.serialization import contrato_rows, contrato_serializer
+from app.repositories.bulk import chunked, insert_returning_ids
+from app.repositories.versioning import mark_changed
+from app.repositories.change_log_repository import record_changes
+from app.repositories.resumen_repository import ResumenRepository
+from sqlalchemy.orm import joinedload
+from datetime import date, datetime
 
 class ContratoRepository:
     """Repositorio para operaciones CRUD de Contrato"""
     
+    CAMPOS = ('empresa_id', 'servicio_id', 'fecha_inicio', 'fecha_fin', 'estado', 'precio_final')
+    
+    @staticmethod
+    def _parse_fecha(valor):
+        """Convierte una fecha YYYY-MM-DD a date (None si está vacía; las ya convertidas se conservan)"""
+        if not valor:
+            return None
+        if isinstance(valor, date):
+            return valor
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    
+    @staticmethod
+    def _to_row(contrato_data, parcial=False):
+        """Convierte los datos de entrada en valores de columna (solo los presentes si parcial)"""
+        campos = [c for c in ContratoRepository.CAMPOS if c in contrato_data] if parcial else ContratoRepository.CAMPOS
+        row = {campo: contrato_data.get(campo) for campo in campos}
+        for campo in ('fecha_inicio', 'fecha_fin'):
+            if campo in row:
+                row[campo] = ContratoRepository._parse_fecha(row[campo])
+        if not parcial and not row['estado']:
+            row['estado'] = 'activo'
+        return row
+    
+    @staticmethod
+    def _query():
+        """Consulta base con empresa y servicio cargados en el mismo SELECT (evita N+1 en to_dict)"""
+        return Contrato.query.options(
+            joinedload(Contrato.empresa),
+            joinedload(Contrato.servicio)
+        )
+    
     @staticmethod
-    def get_all():
+    def _filtrar(filtros, query=None):
+        """Aplica en SQL los filtros de estado, empresa, servicio y rango de fecha de inicio"""
+        query = ContratoRepository._query() if query is None else query
+        if not filtros:
+            return query
+        if filtros.get('estado'):
+            query = query.filter(Contrato.estado == filtros['estado'])
+        if filtros.get('empresa_id'):
+            query = query.filter(Contrato.empresa_id == filtros['empresa_id'])
+        if filtros.get('servicio_id'):
+            query = query.filter(Contrato.servicio_id == filtros['servicio_id'])
+        if filtros.get('fecha_inicio_desde'):
+            query = query.filter(Contrato.fecha_inicio >= filtros['fecha_inicio_desde'])
+        if filtros.get('fecha_inicio_hasta'):
+            query = query.filter(Contrato.fecha_inicio <= filtros['fecha_inicio_hasta'])
+        return query
+    
+    @staticmethod
+    def get_all(filtros=None):
         """Obtiene todos los contratos"""
-        return Contrato.query.all()
+        return ContratoRepository._filtrar(filtros).order_by(Contrato.id).all()
+    
+    @staticmethod
+    def serializer(vista=None):
+        """Serializador de filas para la vista pedida (todas las columnas y relaciones si no hay vista)"""
+        if not vista:
+            return contrato_rows
+        return contrato_serializer(vista['fields'], vista['include'], vista['include_fields'], vista['sideload'])
+    
+    @staticmethod
+    def get_rows(filtros=None, serializer=contrato_rows):
+        """Obtiene todos los contratos como tuplas de columnas (sin instanciar objetos ORM)"""
+        stmt = ContratoRepository._filtrar(filtros, serializer.select()).order_by(Contrato.id)
+        return db.session.execute(stmt).all()
+    
+    @staticmethod
+    def get_page(filtros=None, limit=100, cursor=None, serializer=contrato_rows):
+        """Obtiene una página de contratos (tuplas de columnas) ordenados por id y el cursor siguiente"""
+        return paginate_keyset(ContratoRepository._filtrar(filtros, serializer.select()), Contrato.id, limit, cursor)
+    
+    @staticmethod
+    def iter_all(filtros=None, batch_size=1000, serializer=contrato_rows):
+        """Itera todos los contratos (tuplas de columnas) por lotes sin cargar la tabla en memoria"""
+        stmt = ContratoRepository._filtrar(filtros, serializer.select()).order_by(Contrato.id)
+        return db.session.execute(stmt.execution_options(yield_per=batch_size))
+    
+    @staticmethod
+    def get_row_by_id(contrato_id, serializer=contrato_rows):
+        """Obtiene un contrato como tupla de columnas (None si no existe)"""
+        return db.session.execute(serializer.select().where(Contrato.id == contrato_id)).first()
     
     @staticmethod
     def get_by_id(contrato_id):
         """Obtiene un contrato por su ID"""
-        return Contrato.query.get(contrato_id)
+        return ContratoRepository._query().filter(Contrato.id == contrato_id).first()
     
     @staticmethod
     def create(contrato_data):
-        """Crea un nuevo contrato"""
-        fecha_inicio = datetime.strptime(contrato_data['fecha_inicio'], '%Y-%m-%d').date()
-        fecha_fin = None
-        if contrato_data.get('fecha_fin'):
-            fecha_fin = datetime.strptime(contrato_data['fecha_fin'], '%Y-%m-%d').date()
-        
-        contrato = Contrato(
-            empresa_id=contrato_data['empresa_id'],
-            servicio_id=contrato_data['servicio_id'],
-            fecha_inicio=fecha_inicio,
-            fecha_fin=fecha_fin,
-            estado=contrato_data.get('estado', 'activo'),
-            precio_final=contrato_data['precio_final']
-        )
+        """Crea un nuevo contrato (las fechas pueden llegar ya convertidas desde el servicio)"""
+        row = ContratoRepository._to_row(contrato_data)
+        contrato = Contrato(**row)
         db.session.add(contrato)
+        db.session.flush()
+        ResumenRepository.aplicar(agregar=[ResumenRepository.fila(row)])
+        mark_changed(db.session, 'contratos')
+        record_changes(db.session, 'contratos', 'create', [contrato.id])
         db.session.commit()
         return contrato
     
@@ -46,22 +125,14 @@ class ContratoRepository:
         if not contrato:
             return None
         
-        if 'empresa_id' in contrato_data:
-            contrato.empresa_id = contrato_data['empresa_id']
-        if 'servicio_id' in contrato_data:
-            contrato.servicio_id = contrato_data['servicio_id']
-        if 'fecha_inicio' in contrato_data:
-            contrato.fecha_inicio = datetime.strptime(contrato_data['fecha_inicio'], '%Y-%m-%d').date()
-        if 'fecha_fin' in contrato_data:
-            if contrato_data['fecha_fin']:
-                contrato.fecha_fin = datetime.strptime(contrato_data['fecha_fin'], '%Y-%m-%d').date()
-            else:
-                contrato.fecha_fin = None
-        if 'estado' in contrato_data:
-            contrato.estado = contrato_data['estado']
-        if 'precio_final' in contrato_data:
-            contrato.precio_final = contrato_data['precio_final']
+        anterior = ResumenRepository.fila(contrato)
+        for campo, valor in ContratoRepository._to_row(contrato_data, parcial=True).items():
+            setattr(contrato, campo, valor)
+        db.session.flush()
+        ResumenRepository.aplicar(quitar=[anterior], agregar=[ResumenRepository.fila(contrato)])
         
+        mark_changed(db.session, 'contratos', [contrato_id])
+        record_changes(db.session, 'contratos', 'update', [contrato_id])
         db.session.commit()
         return contrato
     
@@ -72,9 +143,56 @@ class ContratoRepository:
         if not contrato:
             return False
         
+        anterior = ResumenRepository.fila(contrato)
         db.session.delete(contrato)
+        db.session.flush()
+        ResumenRepository.aplicar(quitar=[anterior])
+        mark_changed(db.session, 'contratos', [contrato_id])
+        record_changes(db.session, 'contratos', 'delete', [contrato_id])
         db.session.commit()
         return True
-
-
-
+    
+    @staticmethod
+    def get_existing_ids(ids):
+        """Devuelve el subconjunto de ids que existen, con consultas IN por lotes"""
+        existentes = set()
+        for lote in chunked(list(set(ids)), 500):
+            existentes.update(db.session.scalars(db.select(Contrato.id).where(Contrato.id.in_(lote))))
+        return existentes
+    
+    @staticmethod
+    def bulk_insert(rows):
+        """Inserta varios contratos en una sola sentencia y devuelve sus ids en el mismo orden (sin commit)"""
+        registros = [ContratoRepository._to_row(row) for row in rows]
+        ids = insert_returning_ids(Contrato, registros)
+        ResumenRepository.aplicar(agregar=[ResumenRepository.fila(registro) for registro in registros])
+        mark_changed(db.session, 'contratos', ids)
+        record_changes(db.session, 'contratos', 'create', ids)
+        return ids
+    
+    @staticmethod
+    def bulk_update(rows):
+        """Actualiza varios contratos por id a partir de pares (id, datos) (sin commit)"""
+        registros = [
+            dict(ContratoRepository._to_row(data, parcial=True), id=contrato_id)
+            for contrato_id, data in rows
+        ]
+        registros = [registro for registro in registros if len(registro) > 1]
+        if registros:
+            ids = [registro['id'] for registro in registros]
+            anteriores = ResumenRepository.filas_de_contratos(ids)
+            db.session.execute(update(Contrato), registros)
+            ResumenRepository.aplicar(quitar=anteriores, agregar=ResumenRepository.filas_de_contratos(ids))
+        mark_changed(db.session, 'contratos', [contrato_id for contrato_id, _ in rows])
+        record_changes(db.session, 'contratos', 'update', [contrato_id for contrato_id, _ in rows])
+    
+    @staticmethod
+    def bulk_delete(ids):
+        """Elimina varios contratos con una sola sentencia DELETE (sin commit)"""
+        anteriores = ResumenRepository.filas_de_contratos(ids)
+        db.session.execute(
+            delete(Contrato).where(Contrato.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        ResumenRepository.aplicar(quitar=anteriores)
+        mark_changed(db.session, 'contratos', ids)
+        record_changes(db.session, 'contratos', 'delete', ids)
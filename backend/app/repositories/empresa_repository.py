@@ -2,16 +2,52 @@
 Repositorio de Empresa - Tier 3: Acceso a Datos
 Encapsula todas las operaciones de acceso a datos para Empresa
 """
+from sqlalchemy import update, delete
 from app.config.database import db
 from app.models.empresa import Empresa
+from app.models.contrato import Contrato
+from app.repositories.pagination import paginate_keyset
+from app.models.serialization import empresa_rows
+from app.repositories.bulk import chunked, insert_returning_ids
+from app.repositories import cache
+from app.repositories.versioning import mark_changed
+from app.repositories.change_log_repository import record_changes, record_cascade_deletes
+from app.repositories.resumen_repository import ResumenRepository
 
 class EmpresaRepository:
     """Repositorio para operaciones CRUD de Empresa"""
     
+    CAMPOS = ('nombre', 'direccion', 'telefono', 'email')
+    
+    @staticmethod
+    def _filtrar(filtros, query=None):
+        """Aplica los filtros en SQL sobre la consulta ORM o el SELECT de columnas indicado"""
+        query = Empresa.query if query is None else query
+        if filtros and filtros.get('nombre'):
+            query = query.filter(Empresa.nombre.startswith(filtros['nombre'], autoescape=True))
+        return query
+    
     @staticmethod
-    def get_all():
+    def get_all(filtros=None):
         """Obtiene todas las empresas"""
-        return Empresa.query.all()
+        return EmpresaRepository._filtrar(filtros).order_by(Empresa.id).all()
+    
+    @staticmethod
+    def get_rows(filtros=None):
+        """Obtiene todas las empresas como tuplas de columnas (sin instanciar objetos ORM)"""
+        stmt = EmpresaRepository._filtrar(filtros, empresa_rows.select()).order_by(Empresa.id)
+        return db.session.execute(stmt).all()
+    
+    @staticmethod
+    def get_page(filtros=None, limit=100, cursor=None):
+        """Obtiene una página de empresas (tuplas de columnas) ordenadas por id y el cursor siguiente"""
+        return paginate_keyset(EmpresaRepository._filtrar(filtros, empresa_rows.select()), Empresa.id, limit, cursor)
+    
+    @staticmethod
+    def iter_all(filtros=None, batch_size=1000):
+        """Itera todas las empresas (tuplas de columnas) por lotes sin cargar la tabla en memoria"""
+        stmt = EmpresaRepository._filtrar(filtros, empresa_rows.select()).order_by(Empresa.id)
+        return db.session.execute(stmt.execution_options(yield_per=batch_size))
     
     @staticmethod
     def get_by_id(empresa_id):
@@ -28,6 +64,9 @@ class EmpresaRepository:
             email=empresa_data['email']
         )
         db.session.add(empresa)
+        db.session.flush()
+        mark_changed(db.session, 'empresas')
+        record_changes(db.session, 'empresas', 'create', [empresa.id])
         db.session.commit()
         return empresa
     
@@ -43,19 +82,90 @@ class EmpresaRepository:
         empresa.telefono = empresa_data.get('telefono', empresa.telefono)
         empresa.email = empresa_data.get('email', empresa.email)
         
+        mark_changed(db.session, 'empresas', [empresa_id])
+        record_changes(db.session, 'empresas', 'update', [empresa_id])
+        cache.invalidate_on_commit(db.session, 'empresa', [empresa_id])
         db.session.commit()
         return empresa
     
     @staticmethod
-    def delete(empresa_id):
-        """Elimina una empresa"""
-        empresa = EmpresaRepository.get_by_id(empresa_id)
-        if not empresa:
-            return False
+    def delete(empresa_id, modo='cascade'):
+        """
+        Elimina una empresa y sus contratos.
         
-        db.session.delete(empresa)
+        - cascade: una sola sentencia DELETE; la base de datos elimina los contratos (ON DELETE CASCADE)
+        - orm: carga los contratos en la sesión y los elimina uno a uno (no requiere claves foráneas activas)
+        """
+        record_cascade_deletes(db.session, Contrato.empresa_id, [empresa_id])
+        if modo == 'orm':
+            empresa = EmpresaRepository.get_by_id(empresa_id)
+            if not empresa:
+                return False
+            for contrato in Contrato.query.filter(Contrato.empresa_id == empresa_id):
+                db.session.delete(contrato)
+            db.session.delete(empresa)
+            ResumenRepository.eliminar_empresas([empresa_id])
+        else:
+            resultado = db.session.execute(delete(Empresa).where(Empresa.id == empresa_id))
+            if resultado.rowcount == 0:
+                db.session.rollback()
+                return False
+        
+        mark_changed(db.session, 'empresas', [empresa_id])
+        mark_changed(db.session, 'contratos')
+        record_changes(db.session, 'empresas', 'delete', [empresa_id])
+        cache.invalidate_on_commit(db.session, 'empresa', [empresa_id])
         db.session.commit()
         return True
-
-
-
+    
+    @staticmethod
+    def _load_dicts(ids):
+        """Consulta en la BD los ids indicados y devuelve {id: to_dict()}"""
+        datos = {}
+        for lote in chunked(ids, 500):
+            for empresa in Empresa.query.filter(Empresa.id.in_(lote)):
+                datos[empresa.id] = empresa.to_dict()
+        return datos
+    
+    @staticmethod
+    def get_cached(ids):
+        """Devuelve {id: datos} de los empresas existentes, leyendo primero de la caché de catálogos"""
+        return cache.cached_lookup('empresa', ids, EmpresaRepository._load_dicts)
+    
+    @staticmethod
+    def get_existing_ids(ids):
+        """Devuelve el subconjunto de ids que existen"""
+        return set(EmpresaRepository.get_cached(ids))
+    
+    @staticmethod
+    def bulk_insert(rows):
+        """Inserta varias empresas en una sola sentencia y devuelve sus ids en el mismo orden (sin commit)"""
+        registros = [{campo: row.get(campo) for campo in EmpresaRepository.CAMPOS} for row in rows]
+        ids = insert_returning_ids(Empresa, registros)
+        mark_changed(db.session, 'empresas', ids)
+        record_changes(db.session, 'empresas', 'create', ids)
+        return ids
+    
+    @staticmethod
+    def bulk_update(rows):
+        """Actualiza varias empresas por id a partir de pares (id, datos) (sin commit)"""
+        registros = [
+            dict({campo: data[campo] for campo in EmpresaRepository.CAMPOS if campo in data}, id=empresa_id)
+            for empresa_id, data in rows
+        ]
+        registros = [registro for registro in registros if len(registro) > 1]
+        if registros:
+            db.session.execute(update(Empresa), registros)
+        mark_changed(db.session, 'empresas', [empresa_id for empresa_id, _ in rows])
+        record_changes(db.session, 'empresas', 'update', [empresa_id for empresa_id, _ in rows])
+        cache.invalidate_on_commit(db.session, 'empresa', [empresa_id for empresa_id, _ in rows])
+    
+    @staticmethod
+    def bulk_delete(ids):
+        """Elimina varias empresas con una sola sentencia DELETE; sus contratos se eliminan en cascada (sin commit)"""
+        record_cascade_deletes(db.session, Contrato.empresa_id, ids)
+        db.session.execute(delete(Empresa).where(Empresa.id.in_(ids)).execution_options(synchronize_session=False))
+        mark_changed(db.session, 'empresas', ids)
+        mark_changed(db.session, 'contratos')
+        record_changes(db.session, 'empresas', 'delete', ids)
+        cache.invalidate_on_commit(db.session, 'empresa', ids)
@@ -0,0 +1,169 @@
+"""
+Almacén de claves de idempotencia - Tier 3: Acceso a Datos
+Guarda, por clave, la huella de la petición original y la respuesta que produjo.
+Una clave se reserva antes de ejecutar la escritura (con un plazo corto, por si
+el proceso muere a mitad) y al terminar se completa con la respuesta y el TTL
+definitivo. Los registros caducados se purgan y el total está acotado.
+
+Backends (IDEMPOTENCY_STORE):
+- database: tabla idempotency_keys, compartida por todos los workers
+- memory: diccionario del proceso con TTL y límite de entradas
+- none: sin soporte de Idempotency-Key
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.config.database import db
+from app.models.idempotency_key import IdempotencyKey
+
+_TABLA = IdempotencyKey.__table__
+
+
+@dataclass(frozen=True)
+class StoredRequest:
+    """Petición registrada con una clave; estado_http es None mientras está en curso"""
+    huella: str
+    estado_http: Optional[int] = None
+    cuerpo: Optional[bytes] = None
+    content_type: Optional[str] = None
+
+
+class MemoryIdempotencyStore:
+    """Claves de idempotencia en memoria del proceso (no se comparten entre workers)"""
+
+    def __init__(self, max_keys=10000, ttl=86400, lock_timeout=60, clock=time.time):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def reserve(self, clave, huella):
+        """Reserva la clave; si ya existe y no caducó devuelve la petición registrada"""
+        ahora = self._clock()
+        with self._lock:
+            entrada = self._data.get(clave)
+            if entrada is not None and entrada[0] > ahora:
+                return entrada[1]
+            self._data[clave] = (ahora + self.lock_timeout, StoredRequest(huella))
+            self._data.move_to_end(clave)
+            while len(self._data) > self.max_keys:
+                self._data.popitem(last=False)
+        return None
+
+    def complete(self, clave, estado_http, cuerpo, content_type):
+        with self._lock:
+            entrada = self._data.get(clave)
+            if entrada is not None:
+                registro = StoredRequest(entrada[1].huella, estado_http, cuerpo, content_type)
+                self._data[clave] = (self._clock() + self.ttl, registro)
+
+    def release(self, clave):
+        with self._lock:
+            entrada = self._data.get(clave)
+            if entrada is not None and entrada[1].estado_http is None:
+                del self._data[clave]
+
+    def info(self):
+        return {'backend': 'memory', 'keys': len(self._data), 'max_keys': self.max_keys, 'ttl': self.ttl}
+
+
+class DatabaseIdempotencyStore:
+    """Claves de idempotencia en la tabla idempotency_keys, en transacciones propias"""
+
+    def __init__(self, max_keys=100000, ttl=86400, lock_timeout=60, purge_every=100, clock=time.time):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.purge_every = purge_every
+        self._clock = clock
+        self._reservas = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, clave, huella):
+        """
+        Reserva la clave con un INSERT; si ya existe y no caducó devuelve la petición registrada.
+
+        Se usa una conexión propia y no la sesión de la petición: la reserva debe confirmarse
+        antes de ejecutar la escritura y no deshacerse si esta falla.
+        """
+        ahora = self._clock()
+        fila = {'clave': clave, 'huella': huella, 'creada_en': ahora, 'expira_en': ahora + self.lock_timeout}
+        for _ in range(3):
+            try:
+                with db.engine.begin() as conexion:
+                    conexion.execute(insert(_TABLA).values(**fila))
+                self._purgar_periodicamente()
+                return None
+            except IntegrityError:
+                with db.engine.begin() as conexion:
+                    existente = conexion.execute(select(_TABLA).where(_TABLA.c.clave == clave)).first()
+                    if existente is not None and existente.expira_en > ahora:
+                        return StoredRequest(existente.huella, existente.estado_http,
+                                             existente.cuerpo, existente.content_type)
+                    # Caducada: se elimina y se vuelve a intentar la reserva
+                    conexion.execute(delete(_TABLA).where(_TABLA.c.clave == clave, _TABLA.c.expira_en <= ahora))
+        raise RuntimeError('No se pudo reservar la Idempotency-Key')
+
+    def complete(self, clave, estado_http, cuerpo, content_type):
+        with db.engine.begin() as conexion:
+            conexion.execute(update(_TABLA).where(_TABLA.c.clave == clave).values(
+                estado_http=estado_http, cuerpo=cuerpo, content_type=content_type,
+                expira_en=self._clock() + self.ttl
+            ))
+
+    def release(self, clave):
+        with db.engine.begin() as conexion:
+            conexion.execute(delete(_TABLA).where(_TABLA.c.clave == clave, _TABLA.c.estado_http.is_(None)))
+
+    def _purgar_periodicamente(self):
+        with self._lock:
+            self._reservas += 1
+            if self._reservas % self.purge_every:
+                return
+        self.purge()
+
+    def purge(self):
+        """Elimina las claves caducadas y, si se supera max_keys, las más antiguas"""
+        with db.engine.begin() as conexion:
+            conexion.execute(delete(_TABLA).where(_TABLA.c.expira_en <= self._clock()))
+            sobrantes = conexion.execute(select(func.count()).select_from(_TABLA)).scalar() - self.max_keys
+            if sobrantes > 0:
+                antiguas = select(_TABLA.c.clave).order_by(_TABLA.c.creada_en).limit(sobrantes).scalar_subquery()
+                conexion.execute(delete(_TABLA).where(_TABLA.c.clave.in_(antiguas)))
+
+    def info(self):
+        with db.engine.connect() as conexion:
+            claves = conexion.execute(select(func.count()).select_from(_TABLA)).scalar()
+        return {'backend': 'database', 'keys': claves, 'max_keys': self.max_keys, 'ttl': self.ttl}
+
+
+def init_idempotency(app):
+    """Crea el almacén de claves de idempotencia según IDEMPOTENCY_STORE (database, memory o none)"""
+    tipo = app.config.get('IDEMPOTENCY_STORE', 'database')
+    opciones = {
+        'max_keys': app.config.get('IDEMPOTENCY_MAX_KEYS', 100000),
+        'ttl': app.config.get('IDEMPOTENCY_TTL', 86400),
+        'lock_timeout': app.config.get('IDEMPOTENCY_LOCK_TIMEOUT', 60),
+    }
+    if tipo == 'none':
+        store = None
+    elif tipo == 'database':
+        store = DatabaseIdempotencyStore(**opciones)
+    elif tipo == 'memory':
+        store = MemoryIdempotencyStore(**opciones)
+    else:
+        raise ValueError(f'Almacén de idempotencia desconocido: {tipo}')
+    app.extensions['idempotency_store'] = store
+    return store
+
+
+def get_idempotency_store():
+    """Devuelve el almacén de la aplicación actual (None si está desactivado)"""
+    return current_app.extensions.get('idempotency_store')
@@ -0,0 +1,145 @@
+"""
+Cola de trabajos - Tier 3: Acceso a Datos
+La tabla jobs sustituye a un broker: los trabajos se insertan como 'queued' y
+un worker de cualquier proceso los toma con un UPDATE condicional sobre el
+estado (solo uno de los procesos que compiten consigue cambiar la fila).
+"""
+import time
+import uuid
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.pool import StaticPool
+from app.config.database import db
+from app.models.job import Job, ESTADOS_FINALES
+
+
+class JobRepository:
+    """Operaciones sobre la tabla de trabajos"""
+
+    @staticmethod
+    def create(tipo, parametros):
+        """Encola un trabajo con sus parámetros ya serializados a JSON"""
+        job = Job(id=uuid.uuid4().hex, tipo=tipo, estado='queued', parametros=parametros,
+                  procesados=0, cancelar=False, creado_en=time.time())
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    @staticmethod
+    def get_by_id(job_id):
+        """Obtiene un trabajo que no haya caducado"""
+        job = db.session.get(Job, job_id)
+        if job is None or (job.expira_en is not None and job.expira_en <= time.time()):
+            return None
+        return job
+
+    @staticmethod
+    def get_all(estado=None, limit=50):
+        """Trabajos no caducados, los más recientes primero"""
+        stmt = select(Job).where((Job.expira_en.is_(None)) | (Job.expira_en > time.time()))
+        if estado:
+            stmt = stmt.where(Job.estado == estado)
+        return db.session.scalars(stmt.order_by(Job.creado_en.desc()).limit(limit)).all()
+
+    @staticmethod
+    def count_queued():
+        return db.session.scalar(select(func.count()).select_from(Job).where(Job.estado == 'queued'))
+
+    @staticmethod
+    def claim_next(worker, candidatos=5):
+        """
+        Toma el trabajo pendiente más antiguo y lo marca como 'running'.
+
+        Devuelve (id, tipo, parametros) o None si no queda ninguno libre.
+        """
+        ids = db.session.scalars(
+            select(Job.id).where(Job.estado == 'queued').order_by(Job.creado_en).limit(candidatos)
+        ).all()
+        for job_id in ids:
+            tomado = db.session.execute(
+                update(Job).where(Job.id == job_id, Job.estado == 'queued')
+                .values(estado='running', worker=worker, iniciado_en=time.time())
+            ).rowcount == 1
+            db.session.commit()
+            if tomado:
+                return db.session.execute(select(Job.id, Job.tipo, Job.parametros).where(Job.id == job_id)).one()
+        return None
+
+    @staticmethod
+    def save_progress(job_id, procesados, total):
+        """Guarda el progreso y devuelve si se pidió cancelar el trabajo desde otro proceso"""
+        db.session.execute(update(Job).where(Job.id == job_id).values(procesados=procesados, total=total))
+        cancelar = db.session.scalar(select(Job.cancelar).where(Job.id == job_id))
+        db.session.commit()
+        return bool(cancelar)
+
+    @staticmethod
+    def cancel_requested(job_id):
+        """
+        Indica si se pidió cancelar el trabajo sin confirmar la transacción en curso.
+
+        Se lee en una conexión propia: dentro de la transacción del trabajo se vería la
+        instantánea de su inicio (SQLite en WAL) y no la marca puesta después por otro
+        proceso. Con una única conexión compartida (StaticPool) no hay otra; devolverla al
+        pool desharía la transacción del trabajo, así que se lee en la sesión.
+        """
+        consulta = select(Job.cancelar).where(Job.id == job_id)
+        if isinstance(db.engine.pool, StaticPool):
+            return bool(db.session.scalar(consulta))
+        with db.engine.connect() as conexion:
+            return bool(conexion.scalar(consulta))
+
+    @staticmethod
+    def finish(job_id, estado, resultado, error, procesados, total, ttl):
+        """Cierra el trabajo con su estado final; se conserva `ttl` segundos"""
+        ahora = time.time()
+        db.session.execute(update(Job).where(Job.id == job_id).values(
+            estado=estado, resultado=resultado, error=error, procesados=procesados, total=total,
+            terminado_en=ahora, expira_en=ahora + ttl
+        ))
+        db.session.commit()
+
+    @staticmethod
+    def request_cancel(job_id, ttl):
+        """
+        Cancela un trabajo pendiente o marca uno en curso para que se detenga.
+
+        Devuelve False si el trabajo ya había terminado.
+        """
+        ahora = time.time()
+        cancelado = db.session.execute(
+            update(Job).where(Job.id == job_id, Job.estado == 'queued')
+            .values(estado='cancelled', error='Cancelado antes de empezar', terminado_en=ahora, expira_en=ahora + ttl)
+        ).rowcount == 1
+        if not cancelado:
+            cancelado = db.session.execute(
+                update(Job).where(Job.id == job_id, Job.estado == 'running').values(cancelar=True)
+            ).rowcount == 1
+        db.session.commit()
+        return cancelado
+
+    @staticmethod
+    def fail_orphans(host, proceso_vivo, ttl):
+        """Da por fallidos los trabajos en curso de procesos de este host que ya no existen"""
+        huerfanos = []
+        for job_id, worker in db.session.execute(select(Job.id, Job.worker).where(Job.estado == 'running')):
+            worker_host, _, pid = (worker or '').rpartition(':')
+            if worker_host == host and pid.isdigit() and not proceso_vivo(int(pid)):
+                huerfanos.append(job_id)
+        if huerfanos:
+            ahora = time.time()
+            db.session.execute(
+                update(Job).where(Job.id.in_(huerfanos), Job.estado == 'running')
+                .values(estado='failed', error='El proceso que ejecutaba el trabajo terminó',
+                        terminado_en=ahora, expira_en=ahora + ttl)
+            )
+        db.session.commit()
+        return len(huerfanos)
+
+    @staticmethod
+    def purge():
+        """Elimina los trabajos terminados cuyo plazo de conservación venció"""
+        borrados = db.session.execute(
+            delete(Job).where(Job.estado.in_(ESTADOS_FINALES), Job.expira_en <= time.time())
+        ).rowcount
+        db.session.commit()
+        return borrados
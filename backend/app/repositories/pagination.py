@@ -0,0 +1,31 @@
+"""
+Paginación por cursor (keyset) - Tier 3: Acceso a Datos
+Pagina sobre la clave primaria para que el coste por página sea constante
+"""
+from app.config.database import db
+
+
+def keyset_stmt(stmt, id_column, limit, cursor=None):
+    """
+    SELECT de una página: filas con id > cursor ordenadas por id.
+
+    Se pide una fila extra para saber si hay más páginas sin hacer COUNT(*).
+    """
+    if cursor is not None:
+        stmt = stmt.where(id_column > cursor)
+    return stmt.order_by(id_column).limit(limit + 1)
+
+
+def split_page(rows, limit):
+    """Recorta la fila extra y devuelve (filas, cursor siguiente); el cursor es el último id entregado"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+    return rows, next_cursor
+
+
+def paginate_keyset(stmt, id_column, limit, cursor=None):
+    """Devuelve una página de filas de un SELECT ordenadas por id y el cursor siguiente"""
+    rows = db.session.execute(keyset_stmt(stmt, id_column, limit, cursor)).all()
+    return split_page(rows, limit)
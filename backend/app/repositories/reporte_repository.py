@@ -0,0 +1,62 @@
+"""
+Repositorio de Reportes - Tier 3: Acceso a Datos
+Agregados de contratos (cantidad y suma de precio_final) calculados en la base
+de datos con GROUP BY, sin cargar los contratos en la aplicación
+"""
+from sqlalchemy import func, literal_column, select
+from app.config.database import db
+from app.models.contrato import Contrato
+from app.models.empresa import Empresa
+from app.models.servicio import Servicio
+from app.repositories.contrato_repository import ContratoRepository
+
+
+class ReporteRepository:
+    """Repositorio de consultas agregadas sobre contratos"""
+
+    @staticmethod
+    def _mes(columna):
+        """Expresión YYYY-MM de una fecha según el dialecto de la base de datos"""
+        # El formato va como literal: con un parámetro, PostgreSQL no reconoce la misma expresión en GROUP BY
+        if db.engine.dialect.name == 'postgresql':
+            return func.to_char(columna, literal_column("'YYYY-MM'"))
+        return func.strftime(literal_column("'%Y-%m'"), columna)
+
+    @staticmethod
+    def _agregar(claves, filtros, joins=()):
+        """SELECT claves, COUNT(*), SUM(precio_final) agrupado por las claves y con los filtros de contratos"""
+        stmt = select(
+            *claves,
+            func.count(Contrato.id).label('contratos'),
+            func.coalesce(func.sum(Contrato.precio_final), 0.0).label('total')
+        ).select_from(Contrato)
+        for modelo, condicion in joins:
+            stmt = stmt.join(modelo, condicion)
+        stmt = ContratoRepository._filtrar(filtros, stmt)
+        return db.session.execute(stmt.group_by(*claves).order_by(*claves)).all()
+
+    @staticmethod
+    def por_empresa(filtros=None):
+        """Cantidad y total de contratos por empresa"""
+        return ReporteRepository._agregar(
+            [Contrato.empresa_id.label('empresa_id'), Empresa.nombre.label('nombre')],
+            filtros, [(Empresa, Contrato.empresa_id == Empresa.id)]
+        )
+
+    @staticmethod
+    def por_servicio(filtros=None):
+        """Cantidad y total de contratos por servicio"""
+        return ReporteRepository._agregar(
+            [Contrato.servicio_id.label('servicio_id'), Servicio.nombre.label('nombre')],
+            filtros, [(Servicio, Contrato.servicio_id == Servicio.id)]
+        )
+
+    @staticmethod
+    def por_mes(filtros=None):
+        """Cantidad y total de contratos por mes de inicio (YYYY-MM)"""
+        return ReporteRepository._agregar([ReporteRepository._mes(Contrato.fecha_inicio).label('mes')], filtros)
+
+    @staticmethod
+    def por_estado(filtros=None):
+        """Cantidad y total de contratos por estado"""
+        return ReporteRepository._agregar([Contrato.estado.label('estado')], filtros)
@@ -0,0 +1,152 @@
+"""
+Repositorio de ResumenEmpresa - Tier 3: Acceso a Datos
+Mantiene los totales de contratos por empresa con deltas: cada escritura de
+contratos resta la contribución de las filas anteriores y suma la de las nuevas
+dentro de la misma transacción. Una empresa sin contratos no tiene fila, igual
+que tras rebuild(), que recalcula la tabla completa.
+"""
+from sqlalchemy import case, delete, func, insert, select, update
+from app.config.database import db
+from app.models.contrato import Contrato
+from app.models.resumen_empresa import ResumenEmpresa
+
+_TABLA = ResumenEmpresa.__table__
+
+
+class ResumenRepository:
+    """Repositorio del resumen de contratos por empresa"""
+
+    @staticmethod
+    def _filas(condicion):
+        """Contribución de los contratos que cumplen la condición: (empresa_id, estado, precio_final, fecha_fin)"""
+        stmt = select(Contrato.empresa_id, Contrato.estado, Contrato.precio_final, Contrato.fecha_fin).where(condicion)
+        return db.session.execute(stmt).all()
+
+    @staticmethod
+    def filas_de_contratos(ids):
+        """Contribución actual de los contratos indicados"""
+        return ResumenRepository._filas(Contrato.id.in_(ids)) if ids else []
+
+    @staticmethod
+    def filas_de_servicios(servicio_ids):
+        """Contribución actual de los contratos de los servicios indicados"""
+        return ResumenRepository._filas(Contrato.servicio_id.in_(servicio_ids)) if servicio_ids else []
+
+    @staticmethod
+    def fila(contrato):
+        """Contribución de un contrato ORM o de un diccionario de columnas"""
+        if isinstance(contrato, dict):
+            return (contrato['empresa_id'], contrato['estado'], contrato['precio_final'], contrato.get('fecha_fin'))
+        return (contrato.empresa_id, contrato.estado, contrato.precio_final, contrato.fecha_fin)
+
+    @staticmethod
+    def _upsert(dialecto):
+        """INSERT ... ON CONFLICT que suma los deltas a la fila existente"""
+        # Importación diferida: el dialecto de PostgreSQL (y su variante asyncpg) no se carga al arrancar con SQLite
+        if dialecto == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as insert_dialecto
+        else:
+            from sqlalchemy.dialects.sqlite import insert as insert_dialecto
+        stmt = insert_dialecto(_TABLA)
+        nueva = stmt.excluded.proxima_fecha_fin
+        actual = _TABLA.c.proxima_fecha_fin
+        return stmt.on_conflict_do_update(index_elements=[_TABLA.c.empresa_id], set_={
+            'contratos': _TABLA.c.contratos + stmt.excluded.contratos,
+            'contratos_activos': _TABLA.c.contratos_activos + stmt.excluded.contratos_activos,
+            'total': _TABLA.c.total + stmt.excluded.total,
+            'total_activos': _TABLA.c.total_activos + stmt.excluded.total_activos,
+            'proxima_fecha_fin': case(
+                (nueva.is_(None), actual),
+                (actual.is_(None), nueva),
+                (nueva < actual, nueva),
+                else_=actual
+            )
+        })
+
+    @staticmethod
+    def aplicar(quitar=(), agregar=()):
+        """
+        Aplica al resumen la diferencia entre las filas anteriores y las nuevas (sin commit).
+
+        Debe llamarse después de escribir los contratos en la sesión: si se quita un contrato
+        activo con fecha_fin, la próxima fecha de su empresa se recalcula con MIN() sobre los
+        contratos actuales (una consulta por índice, solo para esas empresas).
+        """
+        for stmt, params in ResumenRepository.sentencias(quitar, agregar, db.engine.dialect.name):
+            db.session.execute(stmt, params)
+
+    @staticmethod
+    def sentencias(quitar, agregar, dialecto):
+        """Sentencias (stmt, parámetros) que aplican los deltas; las comparten la sesión síncrona y la asíncrona"""
+        deltas = {}
+        recalcular = set()
+        for signo, filas in ((-1, quitar), (1, agregar)):
+            for empresa_id, estado, precio_final, fecha_fin in filas:
+                activo = estado == 'activo'
+                delta = deltas.setdefault(empresa_id, {
+                    'empresa_id': empresa_id, 'contratos': 0, 'contratos_activos': 0,
+                    'total': 0.0, 'total_activos': 0.0, 'proxima_fecha_fin': None
+                })
+                delta['contratos'] += signo
+                delta['total'] += signo * (precio_final or 0.0)
+                if activo:
+                    delta['contratos_activos'] += signo
+                    delta['total_activos'] += signo * (precio_final or 0.0)
+                if activo and fecha_fin is not None:
+                    if signo < 0:
+                        recalcular.add(empresa_id)
+                    elif delta['proxima_fecha_fin'] is None or fecha_fin < delta['proxima_fecha_fin']:
+                        delta['proxima_fecha_fin'] = fecha_fin
+
+        sentencias = []
+        if deltas:
+            sentencias.append((ResumenRepository._upsert(dialecto), list(deltas.values())))
+        if recalcular:
+            minimo = select(func.min(Contrato.fecha_fin)).where(
+                Contrato.empresa_id == _TABLA.c.empresa_id, Contrato.estado == 'activo'
+            ).scalar_subquery()
+            stmt = update(_TABLA).where(_TABLA.c.empresa_id.in_(recalcular)).values(proxima_fecha_fin=minimo)
+            sentencias.append((stmt, None))
+        # Solo una empresa que pierde contratos en total puede quedarse sin ninguno
+        vaciables = [empresa_id for empresa_id, delta in deltas.items() if delta['contratos'] < 0]
+        if vaciables:
+            stmt = delete(_TABLA).where(_TABLA.c.empresa_id.in_(vaciables), _TABLA.c.contratos <= 0)
+            sentencias.append((stmt, None))
+        return sentencias
+
+    @staticmethod
+    def eliminar_empresas(empresa_ids):
+        """Elimina el resumen de las empresas indicadas (sin commit)"""
+        db.session.execute(delete(_TABLA).where(_TABLA.c.empresa_id.in_(empresa_ids)))
+
+    @staticmethod
+    def rebuild(conexion=None):
+        """
+        Recalcula el resumen completo desde contratos con un único INSERT ... SELECT (sin commit).
+
+        Sirve para reparar el resumen; `conexion` permite ejecutarlo desde una migración.
+        """
+        ejecutar = (conexion or db.session).execute
+        activo = Contrato.estado == 'activo'
+        origen = select(
+            Contrato.empresa_id,
+            func.count(Contrato.id),
+            func.coalesce(func.sum(case((activo, 1), else_=0)), 0),
+            func.coalesce(func.sum(Contrato.precio_final), 0.0),
+            func.coalesce(func.sum(case((activo, Contrato.precio_final), else_=0.0)), 0.0),
+            func.min(case((activo, Contrato.fecha_fin)))
+        ).group_by(Contrato.empresa_id)
+        ejecutar(delete(_TABLA))
+        ejecutar(insert(_TABLA).from_select(
+            ['empresa_id', 'contratos', 'contratos_activos', 'total', 'total_activos', 'proxima_fecha_fin'], origen
+        ))
+
+    @staticmethod
+    def get_by_empresa(empresa_id):
+        """Obtiene el resumen de una empresa por clave primaria (None si no tiene contratos registrados)"""
+        return db.session.get(ResumenEmpresa, empresa_id)
+
+    @staticmethod
+    def get_all():
+        """Obtiene el resumen de todas las empresas"""
+        return ResumenEmpresa.query.order_by(ResumenEmpresa.empresa_id).all()
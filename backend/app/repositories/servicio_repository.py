@@ -2,16 +2,52 @@
 Repositorio de Servicio - Tier 3: Acceso a Datos
 Encapsula todas las operaciones de acceso a datos para Servicio
 """
+from sqlalchemy import update, delete
 from app.config.database import db
 from app.models.servicio import Servicio
+from app.models.contrato import Contrato
+from app.repositories.pagination import paginate_keyset
+from app.models.serialization import servicio_rows
+from app.repositories.bulk import chunked, insert_returning_ids
+from app.repositories import cache
+from app.repositories.versioning import mark_changed
+from app.repositories.change_log_repository import record_changes, record_cascade_deletes
+from app.repositories.resumen_repository import ResumenRepository
 
 class ServicioRepository:
     """Repositorio para operaciones CRUD de Servicio"""
     
+    CAMPOS = ('nombre', 'descripcion', 'precio_base', 'duracion_horas')
+    
+    @staticmethod
+    def _filtrar(filtros, query=None):
+        """Aplica los filtros en SQL sobre la consulta ORM o el SELECT de columnas indicado"""
+        query = Servicio.query if query is None else query
+        if filtros and filtros.get('nombre'):
+            query = query.filter(Servicio.nombre.startswith(filtros['nombre'], autoescape=True))
+        return query
+    
     @staticmethod
-    def get_all():
+    def get_all(filtros=None):
         """Obtiene todos los servicios"""
-        return Servicio.query.all()
+        return ServicioRepository._filtrar(filtros).order_by(Servicio.id).all()
+    
+    @staticmethod
+    def get_rows(filtros=None):
+        """Obtiene todos los servicios como tuplas de columnas (sin instanciar objetos ORM)"""
+        stmt = ServicioRepository._filtrar(filtros, servicio_rows.select()).order_by(Servicio.id)
+        return db.session.execute(stmt).all()
+    
+    @staticmethod
+    def get_page(filtros=None, limit=100, cursor=None):
+        """Obtiene una página de servicios (tuplas de columnas) ordenados por id y el cursor siguiente"""
+        return paginate_keyset(ServicioRepository._filtrar(filtros, servicio_rows.select()), Servicio.id, limit, cursor)
+    
+    @staticmethod
+    def iter_all(filtros=None, batch_size=1000):
+        """Itera todos los servicios (tuplas de columnas) por lotes sin cargar la tabla en memoria"""
+        stmt = ServicioRepository._filtrar(filtros, servicio_rows.select()).order_by(Servicio.id)
+        return db.session.execute(stmt.execution_options(yield_per=batch_size))
     
     @staticmethod
     def get_by_id(servicio_id):
@@ -28,6 +64,9 @@ class ServicioRepository:
             duracion_horas=servicio_data['duracion_horas']
         )
         db.session.add(servicio)
+        db.session.flush()
+        mark_changed(db.session, 'servicios')
+        record_changes(db.session, 'servicios', 'create', [servicio.id])
         db.session.commit()
         return servicio
     
@@ -43,19 +82,99 @@ class ServicioRepository:
         servicio.precio_base = servicio_data.get('precio_base', servicio.precio_base)
         servicio.duracion_horas = servicio_data.get('duracion_horas', servicio.duracion_horas)
         
+        mark_changed(db.session, 'servicios', [servicio_id])
+        record_changes(db.session, 'servicios', 'update', [servicio_id])
+        cache.invalidate_on_commit(db.session, 'servicio', [servicio_id])
         db.session.commit()
         return servicio
     
     @staticmethod
-    def delete(servicio_id):
-        """Elimina un servicio"""
-        servicio = ServicioRepository.get_by_id(servicio_id)
-        if not servicio:
-            return False
+    def delete(servicio_id, modo='cascade'):
+        """
+        Elimina un servicio y sus contratos.
+        
+        - cascade: una sola sentencia DELETE; la base de datos elimina los contratos (ON DELETE CASCADE)
+        - orm: carga los contratos en la sesión y los elimina uno a uno (no requiere claves foráneas activas)
+        """
+        anteriores = ResumenRepository.filas_de_servicios([servicio_id])
+        record_cascade_deletes(db.session, Contrato.servicio_id, [servicio_id])
+        if modo == 'orm':
+            servicio = ServicioRepository.get_by_id(servicio_id)
+            if not servicio:
+                return False
+            for contrato in Contrato.query.filter(Contrato.servicio_id == servicio_id):
+                db.session.delete(contrato)
+            db.session.delete(servicio)
+            db.session.flush()
+        else:
+            resultado = db.session.execute(delete(Servicio).where(Servicio.id == servicio_id))
+            if resultado.rowcount == 0:
+                db.session.rollback()
+                return False
+        ResumenRepository.aplicar(quitar=anteriores)
         
-        db.session.delete(servicio)
+        mark_changed(db.session, 'servicios', [servicio_id])
+        mark_changed(db.session, 'contratos')
+        record_changes(db.session, 'servicios', 'delete', [servicio_id])
+        cache.invalidate_on_commit(db.session, 'servicio', [servicio_id])
         db.session.commit()
         return True
-
-
-
+    
+    @staticmethod
+    def _load_dicts(ids):
+        """Consulta en la BD los ids indicados y devuelve {id: to_dict()}"""
+        datos = {}
+        for lote in chunked(ids, 500):
+            for servicio in Servicio.query.filter(Servicio.id.in_(lote)):
+                datos[servicio.id] = servicio.to_dict()
+        return datos
+    
+    @staticmethod
+    def get_cached(ids):
+        """Devuelve {id: datos} de los servicios existentes, leyendo primero de la caché de catálogos"""
+        return cache.cached_lookup('servicio', ids, ServicioRepository._load_dicts)
+    
+    @staticmethod
+    def get_existing_ids(ids):
+        """Devuelve el subconjunto de ids que existen"""
+        return set(ServicioRepository.get_cached(ids))
+    
+    @staticmethod
+    def get_precios(ids):
+        """Devuelve {id: precio_base} de los servicios existentes"""
+        return {servicio_id: datos['precio_base'] for servicio_id, datos in ServicioRepository.get_cached(ids).items()}
+    
+    @staticmethod
+    def bulk_insert(rows):
+        """Inserta varios servicios en una sola sentencia y devuelve sus ids en el mismo orden (sin commit)"""
+        registros = [{campo: row.get(campo) for campo in ServicioRepository.CAMPOS} for row in rows]
+        ids = insert_returning_ids(Servicio, registros)
+        mark_changed(db.session, 'servicios', ids)
+        record_changes(db.session, 'servicios', 'create', ids)
+        return ids
+    
+    @staticmethod
+    def bulk_update(rows):
+        """Actualiza varios servicios por id a partir de pares (id, datos) (sin commit)"""
+        registros = [
+            dict({campo: data[campo] for campo in ServicioRepository.CAMPOS if campo in data}, id=servicio_id)
+            for servicio_id, data in rows
+        ]
+        registros = [registro for registro in registros if len(registro) > 1]
+        if registros:
+            db.session.execute(update(Servicio), registros)
+        mark_changed(db.session, 'servicios', [servicio_id for servicio_id, _ in rows])
+        record_changes(db.session, 'servicios', 'update', [servicio_id for servicio_id, _ in rows])
+        cache.invalidate_on_commit(db.session, 'servicio', [servicio_id for servicio_id, _ in rows])
+    
+    @staticmethod
+    def bulk_delete(ids):
+        """Elimina varios servicios con una sola sentencia DELETE; sus contratos se eliminan en cascada (sin commit)"""
+        record_cascade_deletes(db.session, Contrato.servicio_id, ids)
+        anteriores = ResumenRepository.filas_de_servicios(ids)
+        db.session.execute(delete(Servicio).where(Servicio.id.in_(ids)).execution_options(synchronize_session=False))
+        ResumenRepository.aplicar(quitar=anteriores)
+        mark_changed(db.session, 'servicios', ids)
+        mark_changed(db.session, 'contratos')
+        record_changes(db.session, 'servicios', 'delete', ids)
+        cache.invalidate_on_commit(db.session, 'servicio', ids)
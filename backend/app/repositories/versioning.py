@@ -0,0 +1,133 @@
+"""
+Versionado de colecciones y filas - Tier 3: Acceso a Datos
+Cada escritura de los repositorios incrementa la versión de su colección y de
+las filas afectadas. Los controladores construyen ETags a partir de estas
+versiones y responden 304 sin consultar la base de datos.
+
+Las versiones se aplican en el evento after_commit de la sesión, de modo que
+nunca se publica una versión nueva antes de que los datos estén confirmados.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_PENDIENTES = 'versiones_pendientes'
+
+
+class MemoryVersionStore:
+    """Versiones en memoria del proceso; las filas se guardan con límite LRU"""
+
+    def __init__(self, max_rows=100000):
+        # La época distingue reinicios del proceso para que un ETag antiguo nunca coincida
+        self.epoch = uuid.uuid4().hex[:8]
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._colecciones = {}
+        self._modificado = {}
+        self._filas = OrderedDict()
+        self._piso = {}
+
+    def bump(self, coleccion, ids=None):
+        """Incrementa la versión de la colección y la asigna a las filas indicadas"""
+        with self._lock:
+            version = self._colecciones.get(coleccion, 0) + 1
+            self._colecciones[coleccion] = version
+            self._modificado[coleccion] = time.time()
+            for fila_id in ids or ():
+                key = (coleccion, fila_id)
+                self._filas[key] = version
+                self._filas.move_to_end(key)
+            while len(self._filas) > self.max_rows:
+                (col, _), desalojada = self._filas.popitem(last=False)
+                # Las filas sin entrada usan el piso: nunca menor que la última versión desalojada
+                self._piso[col] = max(self._piso.get(col, 0), desalojada)
+            return version
+
+    def renew_epoch(self):
+        """Asigna una época nueva (p. ej. en cada worker creado por fork)"""
+        self.epoch = uuid.uuid4().hex[:8]
+
+    def collection_version(self, coleccion):
+        return f'{self.epoch}.{self._colecciones.get(coleccion, 0)}'
+
+    def row_version(self, coleccion, fila_id):
+        version = self._filas.get((coleccion, fila_id), self._piso.get(coleccion, 0))
+        return f'{self.epoch}.{version}'
+
+    def last_modified(self, coleccion):
+        return self._modificado.get(coleccion)
+
+
+class SharedVersionStore:
+    """Versiones en un almacén clave-valor compartido entre procesos (requiere incr/get/set)"""
+
+    def __init__(self, client, prefix='version:'):
+        self.client = client
+        self.prefix = prefix
+
+    def bump(self, coleccion, ids=None):
+        version = self.client.incr(f'{self.prefix}{coleccion}')
+        self.client.set(f'{self.prefix}{coleccion}:modificado', str(time.time()))
+        for fila_id in ids or ():
+            self.client.set(f'{self.prefix}{coleccion}:{fila_id}', str(version))
+        return version
+
+    def collection_version(self, coleccion):
+        return str(self.client.get(f'{self.prefix}{coleccion}') or 0)
+
+    def row_version(self, coleccion, fila_id):
+        return str(self.client.get(f'{self.prefix}{coleccion}:{fila_id}') or 0)
+
+    def last_modified(self, coleccion):
+        valor = self.client.get(f'{self.prefix}{coleccion}:modificado')
+        return float(valor) if valor else None
+
+
+def init_versioning(app):
+    """
+    Crea el almacén de versiones según VERSION_STORE_BACKEND (memory, shared o none).
+
+    none desactiva los ETags y las respuestas 304. shared usa el cliente de app.config['VERSION_STORE_CLIENT'] o un cliente Redis creado
+    con VERSION_STORE_URL; si no hay ninguno, la aplicación no arranca.
+    """
+    tipo = app.config.get('VERSION_STORE_BACKEND', 'memory')
+    if tipo == 'none':
+        store = None
+    elif tipo == 'shared':
+        from app.repositories.cache import shared_client
+        store = SharedVersionStore(shared_client(app, 'VERSION_STORE'))
+    elif tipo == 'memory':
+        store = MemoryVersionStore(max_rows=app.config.get('VERSION_STORE_MAX_ROWS', 100000))
+    else:
+        raise ValueError(f'Almacén de versiones desconocido: {tipo}')
+    app.extensions['version_store'] = store
+    return store
+
+
+def get_version_store():
+    """Devuelve el almacén de versiones de la aplicación actual"""
+    return current_app.extensions.get('version_store')
+
+
+def mark_changed(session, coleccion, ids=None):
+    """Registra un cambio pendiente; se aplica cuando la sesión confirma la transacción"""
+    store = get_version_store()
+    if store is None:
+        return
+    session.info.setdefault(_PENDIENTES, []).append((store, coleccion, list(ids or ())))
+
+
+@event.listens_for(Session, 'after_commit')
+def _aplicar_versiones(session):
+    for store, coleccion, ids in session.info.pop(_PENDIENTES, []):
+        store.bump(coleccion, ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _descartar_versiones(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDIENTES, None)
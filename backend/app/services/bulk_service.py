@@ -0,0 +1,141 @@
+"""
+Servicio de operaciones en lote - Tier 2: Lógica de Negocio
+Valida cada elemento con las reglas del servicio de la entidad y delega la
+escritura por lotes en el repositorio
+"""
+from app.repositories.bulk import write_in_chunks
+
+MODOS = ('all_or_nothing', 'best_effort')
+OPERACIONES = ('create', 'update', 'delete')
+MAX_CHUNK_SIZE = 5000
+
+
+class BulkService:
+    """Orquesta la validación y escritura de peticiones en lote"""
+
+    @staticmethod
+    def parse_request(payload, chunk_size_defecto, max_items):
+        """
+        Obtiene (items, modo, chunk_size) del cuerpo de la petición.
+
+        Acepta una lista de elementos o un objeto {"items": [...], "mode": ..., "chunk_size": ...}.
+        """
+        if isinstance(payload, list):
+            payload = {'items': payload}
+        if not isinstance(payload, dict) or not isinstance(payload.get('items'), list):
+            raise ValueError('El cuerpo debe ser una lista de elementos o un objeto con "items"')
+
+        items = payload['items']
+        if not items:
+            raise ValueError('La lista de elementos no puede estar vacía')
+        if len(items) > max_items:
+            raise ValueError(f'No se pueden procesar más de {max_items} elementos por petición')
+
+        modo = payload.get('mode', 'all_or_nothing')
+        if modo not in MODOS:
+            raise ValueError(f"El modo debe ser uno de: {', '.join(MODOS)}")
+
+        chunk_size = payload.get('chunk_size', chunk_size_defecto)
+        if not isinstance(chunk_size, int) or isinstance(chunk_size, bool) or chunk_size < 1:
+            raise ValueError('El chunk_size debe ser un entero mayor a 0')
+        return items, modo, min(chunk_size, MAX_CHUNK_SIZE)
+
+    @staticmethod
+    def _parse_item(item):
+        """Normaliza un elemento a (op, id, data). Sin "op" se interpreta como creación"""
+        if not isinstance(item, dict):
+            raise ValueError('Cada elemento debe ser un objeto')
+        if 'op' not in item:
+            return 'create', None, item
+
+        op = item['op']
+        if op not in OPERACIONES:
+            raise ValueError(f"La operación debe ser una de: {', '.join(OPERACIONES)}")
+        data = item.get('data', {})
+        if not isinstance(data, dict):
+            raise ValueError('El campo data debe ser un objeto')
+        if op == 'create':
+            return op, None, data
+
+        entidad_id = item.get('id')
+        if not isinstance(entidad_id, int) or isinstance(entidad_id, bool) or entidad_id < 1:
+            raise ValueError('El id es requerido para actualizar o eliminar')
+        return op, entidad_id, data
+
+    @staticmethod
+    def _validate(service, op, entidad_id, data, existentes, extra):
+        """
+        Aplica las reglas de negocio del servicio a un elemento.
+        
+        Devuelve los datos a escribir: los convertidos por el validador si los devuelve.
+        """
+        if op == 'delete' or op == 'update':
+            if entidad_id not in existentes:
+                raise ValueError('El registro especificado no existe')
+        if op == 'delete':
+            return data
+        validar = service.validate_create if op == 'create' else service.validate_update
+        row = validar(data, *extra)
+        return data if row is None else row
+
+    @staticmethod
+    def execute(service, repository, items, modo, chunk_size, on_chunk=None):
+        """
+        Valida y escribe los elementos. Devuelve (ok, resultados por elemento).
+
+        En modo all_or_nothing no se escribe nada si algún elemento es inválido.
+        `on_chunk` recibe el progreso de la escritura (ver write_in_chunks).
+        """
+        resultados = [None] * len(items)
+        parseados = []
+        for index, item in enumerate(items):
+            try:
+                parseados.append((index,) + BulkService._parse_item(item))
+            except ValueError as e:
+                resultados[index] = {'index': index, 'status': 'error', 'error': str(e)}
+
+        existentes = repository.get_existing_ids([entidad_id for _, op, entidad_id, _ in parseados if op != 'create'])
+        # Servicios con referencias a otras entidades las resuelven una sola vez para todo el lote
+        load_referencias = getattr(service, 'load_referencias', None)
+        extra = ()
+        if load_referencias:
+            extra = (load_referencias([data for _, op, _, data in parseados if op != 'delete']),)
+
+        operaciones = []
+        for index, op, entidad_id, data in parseados:
+            try:
+                data = BulkService._validate(service, op, entidad_id, data, existentes, extra)
+                operaciones.append({'index': index, 'op': op, 'id': entidad_id, 'data': data})
+            except ValueError as e:
+                resultados[index] = {'index': index, 'status': 'error', 'error': str(e)}
+            except (TypeError, AttributeError) as e:
+                resultados[index] = {'index': index, 'status': 'error', 'error': f'Datos inválidos: {e}'}
+
+        hay_errores = len(operaciones) < len(items)
+        if modo == 'all_or_nothing' and hay_errores:
+            for op in operaciones:
+                resultados[op['index']] = {'index': op['index'], 'status': 'skipped'}
+            return False, resultados
+
+        escritos, errores = write_in_chunks(
+            repository, operaciones, chunk_size, atomic=(modo == 'all_or_nothing'), on_chunk=on_chunk
+        )
+        estados = {'create': 'created', 'update': 'updated', 'delete': 'deleted'}
+        for op in operaciones:
+            index = op['index']
+            if index in errores:
+                resultados[index] = {'index': index, 'status': 'error', 'error': errores[index]}
+            else:
+                resultados[index] = {'index': index, 'status': estados[op['op']], 'id': escritos[index]}
+        return not (hay_errores or errores), resultados
+
+    @staticmethod
+    def summary(modo, resultados):
+        """Construye el cuerpo de respuesta con el resumen y el detalle por elemento"""
+        errores = sum(1 for r in resultados if r['status'] == 'error')
+        return {
+            'mode': modo,
+            'total': len(resultados),
+            'errors': errores,
+            'results': resultados
+        }
@@ -0,0 +1,72 @@
+"""
+Servicio del registro de cambios - Tier 2: Lógica de Negocio
+Devuelve los cambios posteriores a una secuencia junto con la representación
+actual de las filas afectadas, para que el cliente las aplique sobre sus
+listados sin volver a pedirlos completos
+"""
+from app.repositories.change_log_repository import ChangeLogRepository
+from app.services.pagination import parse_int
+
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 10000
+
+
+class ChangesExpired(Exception):
+    """La secuencia pedida ya no está en el registro (purgada o de otra base de datos): hay que recargar"""
+
+
+class ChangeService:
+    """Servicio para leer el registro de cambios"""
+
+    @staticmethod
+    def parse_since(args, last_event_id=None):
+        """Secuencia de ?since= (o de la cabecera Last-Event-ID al reconectar un stream); None si no se indica"""
+        if last_event_id:
+            return parse_int({'Last-Event-ID': last_event_id}, 'Last-Event-ID', 0)
+        return parse_int(args, 'since', 0)
+
+    @staticmethod
+    def parse_limit(args):
+        limit = parse_int(args, 'limit', 1) or DEFAULT_LIMIT
+        if limit > MAX_LIMIT:
+            raise ValueError(f'El parámetro limit no puede ser mayor que {MAX_LIMIT}')
+        return limit
+
+    @staticmethod
+    def get_changes(since, limit=DEFAULT_LIMIT):
+        """
+        Cambios con secuencia mayor que `since` y filas actuales de las entidades afectadas.
+
+        Devuelve (respuesta, floats_ok). En `rows` cada entidad tiene {id: fila} de las filas que
+        siguen existiendo; un id cambiado que no aparece en `rows` fue eliminado. Sin `since`
+        se devuelve solo la última secuencia, para empezar a seguir el registro desde ahí.
+        """
+        primera, ultima = ChangeLogRepository.bounds()
+        if since is None:
+            return {'changes': [], 'rows': {}, 'last_seq': ultima, 'more': False}, True
+        if since > ultima or (primera is not None and since < primera - 1):
+            raise ChangesExpired(f'La secuencia {since} ya no está en el registro de cambios')
+
+        entradas = ChangeLogRepository.since(since, limit + 1)
+        mas = len(entradas) > limit
+        entradas = entradas[:limit]
+        cambiados = {}
+        for entrada in entradas:
+            cambiados.setdefault(entrada.entidad, set()).add(entrada.entidad_id)
+
+        rows = {}
+        floats_ok = True
+        for entidad, ids in cambiados.items():
+            serializer, filas = ChangeLogRepository.current_rows(entidad, ids)
+            floats_ok = floats_ok and all(serializer.floats_ok(fila) for fila in filas)
+            rows[entidad] = {str(fila.id): serializer.to_dict(fila) for fila in filas}
+
+        return {
+            'changes': [
+                {'seq': entrada.seq, 'entidad': entrada.entidad, 'id': entrada.entidad_id, 'op': entrada.op}
+                for entrada in entradas
+            ],
+            'rows': rows,
+            'last_seq': entradas[-1].seq if entradas else since,
+            'more': mas
+        }, floats_ok
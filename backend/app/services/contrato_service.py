@@ -3,17 +3,153 @@ Servicio de Contrato - Tier 2: Lógica de Negocio
 Contiene la lógica de negocio y validaciones para Contrato
 """
 from app.repositories.contrato_repository import ContratoRepository
+from app.services.bulk_service import BulkService
 from app.repositories.empresa_repository import EmpresaRepository
 from app.repositories.servicio_repository import ServicioRepository
-from datetime import datetime
+from app.services.pagination import parse_id, parse_fecha
+from datetime import date, datetime
 
 class ContratoService:
     """Servicio que contiene la lógica de negocio para Contrato"""
     
+    ESTADOS = ('activo', 'finalizado', 'cancelado')
+    
+    # Relaciones que se pueden embeber o entregar aparte con ?include=
+    RELACIONES = {'empresa': EmpresaRepository, 'servicio': ServicioRepository}
+    
+    @staticmethod
+    def parse_filtros(args):
+        """Obtiene y valida los filtros de listado a partir de los parámetros de consulta"""
+        estado = args.get('estado') or None
+        if estado and estado not in ContratoService.ESTADOS:
+            raise ValueError(f"El estado debe ser uno de: {', '.join(ContratoService.ESTADOS)}")
+        
+        filtros = {
+            'estado': estado,
+            'empresa_id': parse_id(args, 'empresa_id'),
+            'servicio_id': parse_id(args, 'servicio_id'),
+            'fecha_inicio_desde': parse_fecha(args, 'fecha_inicio_desde'),
+            'fecha_inicio_hasta': parse_fecha(args, 'fecha_inicio_hasta')
+        }
+        if (filtros['fecha_inicio_desde'] and filtros['fecha_inicio_hasta']
+                and filtros['fecha_inicio_hasta'] < filtros['fecha_inicio_desde']):
+            raise ValueError('El parámetro fecha_inicio_hasta debe ser posterior a fecha_inicio_desde')
+        return filtros
+    
     @staticmethod
-    def get_all_contratos():
+    def get_all_contratos(filtros=None):
         """Obtiene todos los contratos"""
-        return ContratoRepository.get_all()
+        return ContratoRepository.get_all(filtros)
+    
+    @staticmethod
+    def _parse_lista(args, nombre, permitidos):
+        """Obtiene un parámetro de consulta con nombres separados por comas (None si no se envía)"""
+        valor = args.get(nombre)
+        if valor is None:
+            return None
+        nombres = tuple(sorted({n.strip() for n in valor.split(',') if n.strip()}))
+        invalidos = [n for n in nombres if n not in permitidos]
+        if invalidos:
+            raise ValueError(f"Valores no válidos en {nombre}: {', '.join(invalidos)}. "
+                             f"Permitidos: {', '.join(permitidos)}")
+        return nombres
+    
+    @staticmethod
+    def parse_vista(args):
+        """
+        Obtiene la forma de la respuesta a partir de los parámetros de consulta.
+        
+        - fields: campos del contrato (el id se incluye siempre)
+        - include: relaciones a incluir (por defecto empresa y servicio; vacío para ninguna)
+        - fields[empresa], fields[servicio]: campos de cada relación
+        - sideload: si es true, las relaciones se entregan una sola vez en `included`
+        
+        Devuelve None si no se indica ninguno (respuesta completa, igual que to_dict()).
+        """
+        parametros = ['fields', 'include', 'sideload'] + [f'fields[{rel}]' for rel in ContratoService.RELACIONES]
+        if not any(parametro in args for parametro in parametros):
+            return None
+        
+        fields = ContratoService._parse_lista(args, 'fields', ('id',) + ContratoRepository.CAMPOS)
+        include = ContratoService._parse_lista(args, 'include', tuple(ContratoService.RELACIONES))
+        if include is None:
+            include = tuple(ContratoService.RELACIONES)
+        include_fields = []
+        for rel, repositorio in ContratoService.RELACIONES.items():
+            campos = ContratoService._parse_lista(args, f'fields[{rel}]', ('id',) + repositorio.CAMPOS)
+            if campos is not None and rel in include:
+                include_fields.append((rel, campos))
+        
+        sideload = (args.get('sideload') or 'false').lower()
+        if sideload not in ('true', 'false', '1', '0'):
+            raise ValueError('El parámetro sideload debe ser true o false')
+        return {
+            'fields': fields,
+            'include': include,
+            'include_fields': tuple(include_fields),
+            'sideload': sideload in ('true', '1')
+        }
+    
+    @staticmethod
+    def get_serializer(vista=None):
+        """Serializador de filas que corresponde a la vista pedida"""
+        return ContratoRepository.serializer(vista)
+    
+    @staticmethod
+    def included_ids(rows, vista):
+        """IDs relacionados de las filas por relación incluida: {'empresa': {ids}, 'servicio': {ids}}"""
+        ids = {}
+        for rel in vista['include']:
+            ids[rel] = {getattr(row, f'{rel}_id') for row in rows}
+            ids[rel].discard(None)
+        return ids
+    
+    @staticmethod
+    def format_included(vista, datos):
+        """
+        Da forma a `included` a partir de {relación: {id: datos}}: {'empresas': {id: datos}, 'servicios': {...}}.
+        
+        Aplica ?fields[relación]=; las claves son cadenas para que el JSON sea válido.
+        """
+        campos_rel = dict(vista['include_fields'])
+        included = {}
+        for rel, por_id in datos.items():
+            campos = campos_rel.get(rel)
+            if campos is not None:
+                por_id = {i: {k: v for k, v in d.items() if k == 'id' or k in campos} for i, d in por_id.items()}
+            included[f'{rel}s'] = {str(i): por_id[i] for i in sorted(por_id)}
+        return included
+    
+    @staticmethod
+    def get_included(rows, vista):
+        """Entidades relacionadas de las filas, una vez por id, leídas a través de la caché de catálogos"""
+        datos = {
+            rel: ContratoService.RELACIONES[rel].get_cached(ids)
+            for rel, ids in ContratoService.included_ids(rows, vista).items()
+        }
+        return ContratoService.format_included(vista, datos)
+    
+    @staticmethod
+    def get_contratos_rows(filtros=None, vista=None):
+        """Obtiene todos los contratos como filas para la serialización rápida"""
+        return ContratoRepository.get_rows(filtros, ContratoRepository.serializer(vista))
+    
+    @staticmethod
+    def get_contratos_page(filtros, limit, cursor, vista=None):
+        """Obtiene una página de contratos y el cursor de la siguiente"""
+        return ContratoRepository.get_page(filtros, limit, cursor, ContratoRepository.serializer(vista))
+    
+    @staticmethod
+    def iter_contratos(filtros=None, vista=None):
+        """Itera todos los contratos para exportación en streaming"""
+        if vista and vista['sideload']:
+            raise ValueError('El parámetro sideload no está disponible en la exportación')
+        return ContratoRepository.iter_all(filtros, serializer=ContratoRepository.serializer(vista))
+    
+    @staticmethod
+    def get_contrato_row(contrato_id, vista):
+        """Obtiene un contrato como fila con las columnas de la vista (None si no existe)"""
+        return ContratoRepository.get_row_by_id(contrato_id, ContratoRepository.serializer(vista))
     
     @staticmethod
     def get_contrato_by_id(contrato_id):
@@ -21,94 +157,163 @@ class ContratoService:
         return ContratoRepository.get_by_id(contrato_id)
     
     @staticmethod
-    def create_contrato(contrato_data):
-        """Crea un nuevo contrato con validaciones y lógica de negocio"""
+    def _parse_fecha(valor, campo):
+        """Convierte una fecha YYYY-MM-DD a date; acepta valores ya convertidos"""
+        if isinstance(valor, date):
+            return valor
+        try:
+            return datetime.strptime(valor, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            raise ValueError(f'La {campo} debe tener formato YYYY-MM-DD')
+    
+    @staticmethod
+    def _parse_referencia(valor):
+        """Normaliza un ID de empresa/servicio a entero (None si no es válido)"""
+        try:
+            return int(valor)
+        except (TypeError, ValueError):
+            return None
+    
+    @staticmethod
+    def referencia_ids(contratos_data):
+        """IDs de empresa y servicio referenciados por varios contratos: (empresa_ids, servicio_ids)"""
+        empresa_ids = set()
+        servicio_ids = set()
+        for contrato_data in contratos_data:
+            empresa_id = ContratoService._parse_referencia(contrato_data.get('empresa_id'))
+            servicio_id = ContratoService._parse_referencia(contrato_data.get('servicio_id'))
+            if empresa_id:
+                empresa_ids.add(empresa_id)
+            if servicio_id:
+                servicio_ids.add(servicio_id)
+        return empresa_ids, servicio_ids
+    
+    @staticmethod
+    def load_referencias(contratos_data):
+        """
+        Resuelve en bloque las empresas y servicios referenciados por varios contratos.
+        
+        Hace una consulta IN por tipo de entidad, sin importar cuántos contratos se validen.
+        """
+        empresa_ids, servicio_ids = ContratoService.referencia_ids(contratos_data)
+        return {
+            'empresas': EmpresaRepository.get_existing_ids(empresa_ids),
+            'servicios': ServicioRepository.get_precios(servicio_ids),
+            'hoy': date.today()
+        }
+    
+    @staticmethod
+    def validate_create(contrato_data, referencias=None):
+        """
+        Valida un contrato nuevo y devuelve sus valores ya convertidos.
+        
+        precio_final se completa a partir del precio base del servicio si no se indica.
+        """
+        if referencias is None:
+            referencias = ContratoService.load_referencias([contrato_data])
+        
         # Validaciones de negocio
         errors = []
+        row = {'estado': contrato_data.get('estado') or 'activo'}
         
         empresa_id = contrato_data.get('empresa_id')
         if not empresa_id:
             errors.append('El ID de empresa es requerido')
         else:
-            empresa = EmpresaRepository.get_by_id(empresa_id)
-            if not empresa:
+            row['empresa_id'] = ContratoService._parse_referencia(empresa_id)
+            if row['empresa_id'] not in referencias['empresas']:
                 errors.append('La empresa especificada no existe')
         
         servicio_id = contrato_data.get('servicio_id')
         if not servicio_id:
             errors.append('El ID de servicio es requerido')
         else:
-            servicio = ServicioRepository.get_by_id(servicio_id)
-            if not servicio:
+            row['servicio_id'] = ContratoService._parse_referencia(servicio_id)
+            precio_base = referencias['servicios'].get(row['servicio_id'])
+            if precio_base is None:
                 errors.append('El servicio especificado no existe')
             else:
                 # Calcular precio_final basado en precio_base del servicio
                 # (puede incluir descuentos, recargos, etc. en el futuro)
                 if 'precio_final' not in contrato_data or not contrato_data['precio_final']:
-                    contrato_data['precio_final'] = servicio.precio_base
+                    contrato_data['precio_final'] = precio_base
         
+        fecha_inicio = None
         if not contrato_data.get('fecha_inicio'):
             errors.append('La fecha de inicio es requerida')
         else:
             try:
-                fecha_inicio = datetime.strptime(contrato_data['fecha_inicio'], '%Y-%m-%d').date()
-                if fecha_inicio < datetime.now().date():
+                fecha_inicio = ContratoService._parse_fecha(contrato_data['fecha_inicio'], 'fecha de inicio')
+                if fecha_inicio < referencias['hoy']:
                     errors.append('La fecha de inicio no puede ser anterior a hoy')
-            except ValueError:
-                errors.append('La fecha de inicio debe tener formato YYYY-MM-DD')
+            except ValueError as e:
+                errors.append(str(e))
+        row['fecha_inicio'] = fecha_inicio
         
+        row['fecha_fin'] = None
         if contrato_data.get('fecha_fin'):
             try:
-                fecha_fin = datetime.strptime(contrato_data['fecha_fin'], '%Y-%m-%d').date()
-                fecha_inicio = datetime.strptime(contrato_data['fecha_inicio'], '%Y-%m-%d').date()
-                if fecha_fin < fecha_inicio:
+                row['fecha_fin'] = ContratoService._parse_fecha(contrato_data['fecha_fin'], 'fecha de fin')
+                if fecha_inicio and row['fecha_fin'] < fecha_inicio:
                     errors.append('La fecha de fin debe ser posterior a la fecha de inicio')
-            except ValueError:
-                errors.append('La fecha de fin debe tener formato YYYY-MM-DD')
+            except ValueError as e:
+                errors.append(str(e))
         
         precio_final = contrato_data.get('precio_final')
         if precio_final is None:
             errors.append('El precio final es requerido')
         elif precio_final < 0:
             errors.append('El precio final debe ser mayor o igual a 0')
+        row['precio_final'] = precio_final
         
         if errors:
             raise ValueError('; '.join(errors))
-        
-        return ContratoRepository.create(contrato_data)
+        return row
     
     @staticmethod
-    def update_contrato(contrato_id, contrato_data):
-        """Actualiza un contrato con validaciones"""
-        contrato = ContratoRepository.get_by_id(contrato_id)
-        if not contrato:
-            raise ValueError('Contrato no encontrado')
+    def validate_update(contrato_data, referencias=None):
+        """Valida los datos de actualización de un contrato y devuelve los campos presentes convertidos"""
+        if referencias is None:
+            referencias = ContratoService.load_referencias([contrato_data])
+        row = {campo: contrato_data[campo] for campo in ContratoRepository.CAMPOS if campo in contrato_data}
         
         # Validaciones de negocio
-        if 'empresa_id' in contrato_data:
-            empresa = EmpresaRepository.get_by_id(contrato_data['empresa_id'])
-            if not empresa:
+        if 'empresa_id' in row:
+            row['empresa_id'] = ContratoService._parse_referencia(row['empresa_id'])
+            if row['empresa_id'] not in referencias['empresas']:
                 raise ValueError('La empresa especificada no existe')
         
-        if 'servicio_id' in contrato_data:
-            servicio = ServicioRepository.get_by_id(contrato_data['servicio_id'])
-            if not servicio:
+        if 'servicio_id' in row:
+            row['servicio_id'] = ContratoService._parse_referencia(row['servicio_id'])
+            if row['servicio_id'] not in referencias['servicios']:
                 raise ValueError('El servicio especificado no existe')
         
-        if 'fecha_inicio' in contrato_data and 'fecha_fin' in contrato_data:
-            try:
-                fecha_inicio = datetime.strptime(contrato_data['fecha_inicio'], '%Y-%m-%d').date()
-                fecha_fin = datetime.strptime(contrato_data['fecha_fin'], '%Y-%m-%d').date()
-                if fecha_fin < fecha_inicio:
-                    raise ValueError('La fecha de fin debe ser posterior a la fecha de inicio')
-            except ValueError as e:
-                if 'formato' not in str(e):
-                    raise ValueError('Las fechas deben tener formato YYYY-MM-DD')
+        if 'fecha_inicio' in row:
+            row['fecha_inicio'] = ContratoService._parse_fecha(row['fecha_inicio'], 'fecha de inicio')
+        if row.get('fecha_fin'):
+            row['fecha_fin'] = ContratoService._parse_fecha(row['fecha_fin'], 'fecha de fin')
+        elif 'fecha_fin' in row:
+            row['fecha_fin'] = None
+        if row.get('fecha_inicio') and row.get('fecha_fin') and row['fecha_fin'] < row['fecha_inicio']:
+            raise ValueError('La fecha de fin debe ser posterior a la fecha de inicio')
         
-        if 'precio_final' in contrato_data and contrato_data['precio_final'] < 0:
+        if 'precio_final' in row and row['precio_final'] < 0:
             raise ValueError('El precio final debe ser mayor o igual a 0')
+        return row
+    
+    @staticmethod
+    def create_contrato(contrato_data):
+        """Crea un nuevo contrato con validaciones y lógica de negocio"""
+        return ContratoRepository.create(ContratoService.validate_create(contrato_data))
+    
+    @staticmethod
+    def update_contrato(contrato_id, contrato_data):
+        """Actualiza un contrato con validaciones"""
+        contrato = ContratoRepository.get_by_id(contrato_id)
+        if not contrato:
+            raise ValueError('Contrato no encontrado')
         
-        return ContratoRepository.update(contrato_id, contrato_data)
+        return ContratoRepository.update(contrato_id, ContratoService.validate_update(contrato_data))
     
     @staticmethod
     def delete_contrato(contrato_id):
@@ -118,6 +323,8 @@ class ContratoService:
             raise ValueError('Contrato no encontrado')
         
         return ContratoRepository.delete(contrato_id)
-
-
-
+    
+    @staticmethod
+    def bulk_contratos(items, modo, chunk_size, on_chunk=None):
+        """Crea, actualiza o elimina contratos en lote aplicando las mismas validaciones"""
+        return BulkService.execute(ContratoService, ContratoRepository, items, modo, chunk_size, on_chunk)
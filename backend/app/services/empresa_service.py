@@ -3,14 +3,36 @@ Servicio de Empresa - Tier 2: Lógica de Negocio
 Contiene la lógica de negocio y validaciones para Empresa
 """
 from app.repositories.empresa_repository import EmpresaRepository
+from app.repositories.resumen_repository import ResumenRepository
+from app.services.bulk_service import BulkService
 
 class EmpresaService:
     """Servicio que contiene la lógica de negocio para Empresa"""
     
     @staticmethod
-    def get_all_empresas():
+    def parse_filtros(args):
+        """Obtiene los filtros de listado a partir de los parámetros de consulta"""
+        return {'nombre': args.get('nombre') or None}
+    
+    @staticmethod
+    def get_all_empresas(filtros=None):
         """Obtiene todas las empresas"""
-        return EmpresaRepository.get_all()
+        return EmpresaRepository.get_all(filtros)
+    
+    @staticmethod
+    def get_empresas_rows(filtros=None):
+        """Obtiene todas las empresas como filas para la serialización rápida"""
+        return EmpresaRepository.get_rows(filtros)
+    
+    @staticmethod
+    def get_empresas_page(filtros, limit, cursor):
+        """Obtiene una página de empresas y el cursor de la siguiente"""
+        return EmpresaRepository.get_page(filtros, limit, cursor)
+    
+    @staticmethod
+    def iter_empresas(filtros=None):
+        """Itera todas las empresas para exportación en streaming"""
+        return EmpresaRepository.iter_all(filtros)
     
     @staticmethod
     def get_empresa_by_id(empresa_id):
@@ -18,8 +40,26 @@ class EmpresaService:
         return EmpresaRepository.get_by_id(empresa_id)
     
     @staticmethod
-    def create_empresa(empresa_data):
-        """Crea una nueva empresa con validaciones"""
+    def get_resumen(empresa_id):
+        """
+        Obtiene los totales de contratos de una empresa desde el resumen materializado.
+        
+        Es una lectura por clave primaria; una empresa sin contratos devuelve totales en cero
+        y una empresa inexistente devuelve None.
+        """
+        resumen = ResumenRepository.get_by_empresa(empresa_id)
+        if resumen:
+            return resumen.to_dict()
+        if not EmpresaRepository.get_existing_ids([empresa_id]):
+            return None
+        return {
+            'empresa_id': empresa_id, 'contratos': 0, 'contratos_activos': 0,
+            'total': 0.0, 'total_activos': 0.0, 'proxima_fecha_fin': None
+        }
+    
+    @staticmethod
+    def validate_create(empresa_data):
+        """Valida los datos de una empresa nueva"""
         # Validaciones de negocio
         errors = []
         
@@ -39,7 +79,18 @@ class EmpresaService:
         
         if errors:
             raise ValueError('; '.join(errors))
-        
+    
+    @staticmethod
+    def validate_update(empresa_data):
+        """Valida los datos de actualización de una empresa"""
+        if 'email' in empresa_data and empresa_data['email']:
+            if '@' not in empresa_data['email']:
+                raise ValueError('El email debe ser válido')
+    
+    @staticmethod
+    def create_empresa(empresa_data):
+        """Crea una nueva empresa con validaciones"""
+        EmpresaService.validate_create(empresa_data)
         return EmpresaRepository.create(empresa_data)
     
     @staticmethod
@@ -49,21 +100,19 @@ class EmpresaService:
         if not empresa:
             raise ValueError('Empresa no encontrada')
         
-        # Validaciones de negocio
-        if 'email' in empresa_data and empresa_data['email']:
-            if '@' not in empresa_data['email']:
-                raise ValueError('El email debe ser válido')
-        
+        EmpresaService.validate_update(empresa_data)
         return EmpresaRepository.update(empresa_id, empresa_data)
     
     @staticmethod
-    def delete_empresa(empresa_id):
-        """Elimina una empresa"""
+    def delete_empresa(empresa_id, modo='cascade'):
+        """Elimina una empresa y sus contratos (modo cascade u orm)"""
         empresa = EmpresaRepository.get_by_id(empresa_id)
         if not empresa:
             raise ValueError('Empresa no encontrada')
         
-        return EmpresaRepository.delete(empresa_id)
-
-
-
+        return EmpresaRepository.delete(empresa_id, modo)
+    
+    @staticmethod
+    def bulk_empresas(items, modo, chunk_size, on_chunk=None):
+        """Crea, actualiza o elimina empresas en lote aplicando las mismas validaciones"""
+        return BulkService.execute(EmpresaService, EmpresaRepository, items, modo, chunk_size, on_chunk)
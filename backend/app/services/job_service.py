@@ -0,0 +1,157 @@
+"""
+Servicio de trabajos en segundo plano - Tier 2: Lógica de Negocio
+Valida y encola los trabajos (importaciones en lote y reportes) y los ejecuta
+en los workers de app/jobs.py con las mismas reglas que los endpoints síncronos
+"""
+import json
+from flask import current_app
+from app.jobs import get_job_runner
+from app.models.job import ESTADOS, ESTADOS_FINALES
+from app.repositories.job_repository import JobRepository
+from app.services.bulk_service import BulkService
+from app.services.contrato_service import ContratoService
+from app.services.empresa_service import EmpresaService
+from app.services.pagination import parse_int
+from app.services.reporte_service import ReporteService
+from app.services.servicio_service import ServicioService
+
+MAX_LIMIT = 500
+
+
+class JobQueueFull(Exception):
+    """La cola ya tiene JOBS_MAX_QUEUED trabajos pendientes"""
+
+
+class JobService:
+    """Servicio que contiene la lógica de negocio de los trabajos en segundo plano"""
+
+    # Importaciones: mismo cuerpo que POST /api/<entidad>/bulk, sin el límite de BULK_MAX_ITEMS
+    IMPORTACIONES = {
+        'import_empresas': EmpresaService.bulk_empresas,
+        'import_servicios': ServicioService.bulk_servicios,
+        'import_contratos': ContratoService.bulk_contratos
+    }
+    TIPOS = tuple(IMPORTACIONES) + ('reporte',)
+
+    @staticmethod
+    def _parse_importacion(parametros):
+        return BulkService.parse_request(
+            parametros,
+            current_app.config['BULK_CHUNK_SIZE'],
+            current_app.config.get('JOBS_IMPORT_MAX_ITEMS', 200000)
+        )
+
+    @staticmethod
+    def _parse_reporte(parametros):
+        """{"nombre": "empresas", "filtros": {"estado": "activo", ...}} -> (nombre, filtros validados)"""
+        if not isinstance(parametros, dict):
+            raise ValueError('Los parámetros del reporte deben ser un objeto con "nombre" y "filtros"')
+        nombre = parametros.get('nombre')
+        if nombre not in ReporteService.REPORTES:
+            raise ValueError(f"El reporte debe ser uno de: {', '.join(ReporteService.REPORTES)}")
+        filtros = parametros.get('filtros') or {}
+        if not isinstance(filtros, dict):
+            raise ValueError('Los filtros del reporte deben ser un objeto')
+        return nombre, ReporteService.parse_filtros(filtros)
+
+    @staticmethod
+    def parse_submit(payload):
+        """Obtiene (tipo, parametros) del cuerpo {"tipo": ..., "parametros": ...} validando los parámetros"""
+        if not isinstance(payload, dict):
+            raise ValueError('El cuerpo debe ser un objeto con "tipo" y "parametros"')
+        tipo = payload.get('tipo')
+        if tipo not in JobService.TIPOS:
+            raise ValueError(f"El tipo debe ser uno de: {', '.join(JobService.TIPOS)}")
+        parametros = payload.get('parametros')
+        if tipo in JobService.IMPORTACIONES:
+            JobService._parse_importacion(parametros)
+        else:
+            JobService._parse_reporte(parametros)
+        return tipo, parametros
+
+    @staticmethod
+    def submit(tipo, parametros):
+        """Encola un trabajo y despierta a un worker de este proceso"""
+        runner = get_job_runner()
+        if JobRepository.count_queued() >= current_app.config.get('JOBS_MAX_QUEUED', 100):
+            raise JobQueueFull('La cola de trabajos está llena; reintente más tarde')
+        job = JobRepository.create(tipo, json.dumps(parametros))
+        runner.ensure_started()
+        runner.wake()
+        return job.to_dict()
+
+    @staticmethod
+    def _con_progreso(job):
+        """Diccionario del trabajo con el progreso en memoria si se ejecuta en este proceso"""
+        datos = job.to_dict()
+        contexto = get_job_runner().active(job.id) if job.estado == 'running' else None
+        if contexto is not None:
+            datos['procesados'] = contexto.procesados
+            datos['total'] = contexto.total
+            datos['progreso'] = round(100 * contexto.procesados / contexto.total, 1) if contexto.total else None
+        return datos
+
+    @staticmethod
+    def get_job(job_id):
+        """Obtiene el estado y el progreso de un trabajo (None si no existe o caducó)"""
+        job = JobRepository.get_by_id(job_id)
+        return JobService._con_progreso(job) if job else None
+
+    @staticmethod
+    def get_jobs(args):
+        """Lista los trabajos recientes con ?estado= y ?limit="""
+        estado = args.get('estado') or None
+        if estado and estado not in ESTADOS:
+            raise ValueError(f"El estado debe ser uno de: {', '.join(ESTADOS)}")
+        limit = parse_int(args, 'limit', 1) or 50
+        if limit > MAX_LIMIT:
+            raise ValueError(f'El parámetro limit no puede ser mayor que {MAX_LIMIT}')
+        return [JobService._con_progreso(job) for job in JobRepository.get_all(estado, limit)]
+
+    @staticmethod
+    def get_result(job_id):
+        """Devuelve (trabajo, resultado JSON) o None; el resultado es None si el trabajo no terminó bien"""
+        job = JobRepository.get_by_id(job_id)
+        if job is None:
+            return None
+        return job.to_dict(), job.resultado if job.estado == 'succeeded' else None
+
+    @staticmethod
+    def cancel_job(job_id):
+        """
+        Cancela un trabajo. Devuelve (cancelado, trabajo) o None si no existe.
+
+        Si se ejecuta en este proceso se avisa directamente al worker; si no, se marca en la
+        tabla y el worker lo ve al guardar el progreso del siguiente lote.
+        """
+        job = JobRepository.get_by_id(job_id)
+        if job is None:
+            return None
+        if job.estado in ESTADOS_FINALES:
+            return False, job.to_dict()
+        contexto = get_job_runner().active(job_id)
+        if contexto is not None:
+            contexto.cancel()
+            cancelado = True
+        else:
+            cancelado = JobRepository.request_cancel(job_id, current_app.config.get('JOBS_RESULT_TTL', 86400))
+        datos = JobService._con_progreso(job)
+        datos['cancelacion_solicitada'] = datos['cancelacion_solicitada'] or cancelado
+        return cancelado, datos
+
+    @staticmethod
+    def run(tipo, parametros, contexto):
+        """Ejecuta un trabajo en un worker (con contexto de aplicación) y devuelve su resultado"""
+        contexto.progress(0)
+        if tipo in JobService.IMPORTACIONES:
+            items, modo, chunk_size = JobService._parse_importacion(parametros)
+            ok, resultados = JobService.IMPORTACIONES[tipo](items, modo, chunk_size, contexto.progress)
+            resumen = BulkService.summary(modo, resultados)
+            resumen['ok'] = ok
+            return resumen
+        if tipo == 'reporte':
+            nombre, filtros = JobService._parse_reporte(parametros)
+            reporte = ReporteService.get_reporte(nombre, filtros)
+            contexto.progress(1, 1)
+            return reporte
+        raise ValueError(f'Tipo de trabajo desconocido: {tipo}')
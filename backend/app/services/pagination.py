@@ -0,0 +1,77 @@
+"""
+Parámetros de paginación y filtros - Tier 2: Lógica de Negocio
+Valida los parámetros de consulta comunes a los listados
+"""
+from datetime import datetime
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+DELETE_MODES = ('cascade', 'orm')
+
+
+def parse_int(args, nombre, minimo):
+    """Convierte un parámetro de consulta a entero validando el mínimo (None si no se indica)"""
+    valor = args.get(nombre)
+    if valor is None or valor == '':
+        return None
+    try:
+        numero = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f'El parámetro {nombre} debe ser un número entero')
+    if numero < minimo:
+        raise ValueError(f'El parámetro {nombre} debe ser mayor o igual a {minimo}')
+    return numero
+
+
+def parse_id(args, nombre):
+    """Obtiene un parámetro de consulta que representa un ID"""
+    return parse_int(args, nombre, 1)
+
+
+def parse_fecha(args, nombre):
+    """Obtiene un parámetro de consulta con formato YYYY-MM-DD"""
+    valor = args.get(nombre)
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'El parámetro {nombre} debe tener formato YYYY-MM-DD')
+
+
+def parse_delete_mode(args):
+    """
+    Obtiene el modo de borrado de ?mode= (por defecto cascade).
+
+    cascade elimina con una sola sentencia y deja los contratos a ON DELETE CASCADE;
+    orm carga y elimina cada contrato en la sesión.
+    """
+    modo = args.get('mode') or 'cascade'
+    if modo not in DELETE_MODES:
+        raise ValueError(f"El parámetro mode debe ser uno de: {', '.join(DELETE_MODES)}")
+    return modo
+
+
+def parse_page_args(args, paginar_por_defecto=False):
+    """
+    Obtiene (limit, cursor) de los parámetros de consulta.
+
+    Devuelve None cuando el cliente no pidió paginación y la aplicación no la
+    impone, de modo que los clientes existentes siguen recibiendo la lista completa.
+    """
+    limit = parse_int(args, 'limit', 1)
+    cursor = parse_int(args, 'cursor', 0)
+    if limit is None and cursor is None and not paginar_por_defecto:
+        return None
+    if limit is None:
+        limit = DEFAULT_LIMIT
+    return min(limit, MAX_LIMIT), cursor
+
+
+def page_response(items, next_cursor, limit):
+    """Construye el cuerpo de respuesta de una página"""
+    return {
+        'items': items,
+        'next_cursor': next_cursor,
+        'limit': limit
+    }
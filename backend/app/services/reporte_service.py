@@ -0,0 +1,61 @@
+"""
+Servicio de Reportes - Tier 2: Lógica de Negocio
+Reportes de ingresos por empresa, servicio, mes y estado. Los resultados se
+guardan en caché con una clave que incluye las versiones de contratos, empresas
+y servicios, así que la siguiente escritura los invalida sin borrarlos.
+"""
+import json
+from app.repositories.reporte_repository import ReporteRepository
+from app.repositories.resumen_repository import ResumenRepository
+from app.repositories.versioning import get_version_store
+from app.repositories.cache import cached_value
+from app.services.contrato_service import ContratoService
+
+class ReporteService:
+    """Servicio que contiene la lógica de negocio para los reportes"""
+    
+    # Reporte -> (consulta agregada, campos de agrupación)
+    REPORTES = {
+        'empresas': (ReporteRepository.por_empresa, ('empresa_id', 'nombre')),
+        'servicios': (ReporteRepository.por_servicio, ('servicio_id', 'nombre')),
+        'meses': (ReporteRepository.por_mes, ('mes',)),
+        'estados': (ReporteRepository.por_estado, ('estado',))
+    }
+    COLECCIONES = ('contratos', 'empresas', 'servicios')
+    
+    @staticmethod
+    def parse_filtros(args):
+        """Filtros de los reportes: los mismos que el listado de contratos (rango con fecha_inicio_desde/hasta)"""
+        return ContratoService.parse_filtros(args)
+    
+    @staticmethod
+    def _calcular(nombre, filtros):
+        consulta, campos = ReporteService.REPORTES[nombre]
+        items = []
+        for row in consulta(filtros):
+            item = {campo: getattr(row, campo) for campo in campos}
+            item['contratos'] = row.contratos
+            item['total'] = round(float(row.total), 2)
+            items.append(item)
+        return {
+            'items': items,
+            'contratos': sum(item['contratos'] for item in items),
+            'total': round(float(sum(item['total'] for item in items)), 2)
+        }
+    
+    @staticmethod
+    def get_reporte(nombre, filtros):
+        """Obtiene un reporte agregado; se reutiliza hasta la siguiente escritura de contratos, empresas o servicios"""
+        if nombre not in ReporteService.REPORTES:
+            raise ValueError(f"El reporte debe ser uno de: {', '.join(ReporteService.REPORTES)}")
+        store = get_version_store()
+        if store is None:
+            return ReporteService._calcular(nombre, filtros)
+        versiones = [store.collection_version(coleccion) for coleccion in ReporteService.COLECCIONES]
+        clave = f"{nombre}:{'.'.join(versiones)}:{json.dumps(filtros, sort_keys=True, default=str)}"
+        return cached_value('reporte', clave, lambda: ReporteService._calcular(nombre, filtros))
+    
+    @staticmethod
+    def get_resumen_empresas():
+        """Obtiene el resumen materializado de todas las empresas con contratos"""
+        return [resumen.to_dict() for resumen in ResumenRepository.get_all()]
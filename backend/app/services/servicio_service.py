@@ -3,14 +3,35 @@ Servicio de Servicio - Tier 2: Lógica de Negocio
 Contiene la lógica de negocio y validaciones para Servicio
 """
 from app.repositories.servicio_repository import ServicioRepository
+from app.services.bulk_service import BulkService
 
 class ServicioService:
     """Servicio que contiene la lógica de negocio para Servicio"""
     
     @staticmethod
-    def get_all_servicios():
+    def parse_filtros(args):
+        """Obtiene los filtros de listado a partir de los parámetros de consulta"""
+        return {'nombre': args.get('nombre') or None}
+    
+    @staticmethod
+    def get_all_servicios(filtros=None):
         """Obtiene todos los servicios"""
-        return ServicioRepository.get_all()
+        return ServicioRepository.get_all(filtros)
+    
+    @staticmethod
+    def get_servicios_rows(filtros=None):
+        """Obtiene todos los servicios como filas para la serialización rápida"""
+        return ServicioRepository.get_rows(filtros)
+    
+    @staticmethod
+    def get_servicios_page(filtros, limit, cursor):
+        """Obtiene una página de servicios y el cursor de la siguiente"""
+        return ServicioRepository.get_page(filtros, limit, cursor)
+    
+    @staticmethod
+    def iter_servicios(filtros=None):
+        """Itera todos los servicios para exportación en streaming"""
+        return ServicioRepository.iter_all(filtros)
     
     @staticmethod
     def get_servicio_by_id(servicio_id):
@@ -18,8 +39,8 @@ class ServicioService:
         return ServicioRepository.get_by_id(servicio_id)
     
     @staticmethod
-    def create_servicio(servicio_data):
-        """Crea un nuevo servicio con validaciones"""
+    def validate_create(servicio_data):
+        """Valida los datos de un servicio nuevo"""
         # Validaciones de negocio
         errors = []
         
@@ -40,7 +61,20 @@ class ServicioService:
         
         if errors:
             raise ValueError('; '.join(errors))
+    
+    @staticmethod
+    def validate_update(servicio_data):
+        """Valida los datos de actualización de un servicio"""
+        if 'precio_base' in servicio_data and servicio_data['precio_base'] < 0:
+            raise ValueError('El precio base debe ser mayor o igual a 0')
         
+        if 'duracion_horas' in servicio_data and servicio_data['duracion_horas'] <= 0:
+            raise ValueError('La duración debe ser mayor a 0')
+    
+    @staticmethod
+    def create_servicio(servicio_data):
+        """Crea un nuevo servicio con validaciones"""
+        ServicioService.validate_create(servicio_data)
         return ServicioRepository.create(servicio_data)
     
     @staticmethod
@@ -50,23 +84,19 @@ class ServicioService:
         if not servicio:
             raise ValueError('Servicio no encontrado')
         
-        # Validaciones de negocio
-        if 'precio_base' in servicio_data and servicio_data['precio_base'] < 0:
-            raise ValueError('El precio base debe ser mayor o igual a 0')
-        
-        if 'duracion_horas' in servicio_data and servicio_data['duracion_horas'] <= 0:
-            raise ValueError('La duración debe ser mayor a 0')
-        
+        ServicioService.validate_update(servicio_data)
         return ServicioRepository.update(servicio_id, servicio_data)
     
     @staticmethod
-    def delete_servicio(servicio_id):
-        """Elimina un servicio"""
+    def delete_servicio(servicio_id, modo='cascade'):
+        """Elimina un servicio y sus contratos (modo cascade u orm)"""
         servicio = ServicioRepository.get_by_id(servicio_id)
         if not servicio:
             raise ValueError('Servicio no encontrado')
         
-        return ServicioRepository.delete(servicio_id)
-
-
-
+        return ServicioRepository.delete(servicio_id, modo)
+    
+    @staticmethod
+    def bulk_servicios(items, modo, chunk_size, on_chunk=None):
+        """Crea, actualiza o elimina servicios en lote aplicando las mismas validaciones"""
+        return BulkService.execute(ServicioService, ServicioRepository, items, modo, chunk_size, on_chunk)
@@ -0,0 +1,8 @@
+"""
+Punto de entrada ASGI - Tier 2: Lógica de Negocio
+Ejecutar con un servidor ASGI, por ejemplo:
+    uvicorn asgi:app --host 0.0.0.0 --port 5001
+"""
+from app.asgi import create_asgi_app
+
+app = create_asgi_app()
@@ -0,0 +1,150 @@
+"""
+Benchmark de carga WSGI frente a ASGI - Tier 2: Lógica de Negocio
+Levanta la aplicación con el servidor WSGI de run.py (Werkzeug con hilos) y con
+uvicorn sobre asgi.py, ambos sobre la misma base de datos SQLite, y mide
+peticiones/segundo y latencias p50/p99 con N clientes concurrentes. Con
+--lentos se mantienen además conexiones que envían la petición byte a byte,
+como clientes móviles lentos.
+
+Uso (desde backend/, requiere requirements-async.txt):
+    python -m benchmarks.bench_asgi --concurrencia 64 --segundos 10 --lentos 200
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+BACKEND = os.path.join(os.path.dirname(__file__), '..')
+
+SERVIDORES = {
+    'wsgi': [sys.executable, '-c',
+             'import sys; from werkzeug.serving import run_simple; from app import create_app; '
+             'run_simple("127.0.0.1", int(sys.argv[1]), create_app(), threaded=True)'],
+    'asgi': [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--log-level', 'warning', '--port']
+}
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def preparar_base(uri, contratos):
+    """Crea la base de datos con datos sintéticos (una sola vez para ambos servidores)"""
+    os.environ['SQLALCHEMY_DATABASE_URI'] = uri
+    from app import create_app
+    from app.config.database import db
+    from benchmarks.bench_serialization import seed
+    app = create_app()
+    with app.app_context():
+        seed(50, 10, contratos)
+        db.engine.dispose()
+
+
+def arrancar(nombre, puerto, uri, comando=None, **entorno):
+    """Lanza el servidor en un subproceso y espera a que acepte conexiones"""
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=uri, FLASK_ENV='production', **entorno)
+    comando = comando or SERVIDORES[nombre] + [str(puerto)]
+    proceso = subprocess.Popen(comando, cwd=BACKEND, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limite = time.time() + 30
+    while time.time() < limite:
+        try:
+            socket.create_connection(('127.0.0.1', puerto), timeout=0.2).close()
+            return proceso
+        except OSError:
+            time.sleep(0.1)
+    proceso.kill()
+    raise RuntimeError(f'El servidor {nombre} no arrancó')
+
+
+async def peticion(puerto, path):
+    """GET con Connection: close; devuelve el código de estado"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', puerto)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode())
+    await writer.drain()
+    datos = await reader.read()
+    writer.close()
+    return int(datos.split(b' ', 2)[1])
+
+
+async def cliente_lento(puerto, path, fin):
+    """Envía la petición un byte cada 100 ms mientras dure la prueba"""
+    mensaje = f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'.encode()
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', puerto)
+        for byte in mensaje:
+            if time.perf_counter() > fin:
+                break
+            writer.write(bytes([byte]))
+            await writer.drain()
+            await asyncio.sleep(0.1)
+        writer.close()
+    except OSError:
+        pass
+
+
+async def carga(puerto, path, concurrencia, segundos, lentos):
+    fin = time.perf_counter() + segundos
+    latencias = []
+    errores = 0
+
+    async def trabajador():
+        nonlocal errores
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            try:
+                estado = await peticion(puerto, path)
+                if estado != 200:
+                    errores += 1
+            except OSError:
+                errores += 1
+                continue
+            latencias.append(time.perf_counter() - inicio)
+
+    tareas = [cliente_lento(puerto, path, fin) for _ in range(lentos)]
+    tareas += [trabajador() for _ in range(concurrencia)]
+    inicio = time.perf_counter()
+    await asyncio.gather(*tareas)
+    duracion = time.perf_counter() - inicio
+    latencias.sort()
+
+    def percentil(p):
+        return latencias[min(len(latencias) - 1, int(len(latencias) * p))] * 1000 if latencias else float('nan')
+
+    return {'rps': len(latencias) / duracion, 'p50': percentil(0.50), 'p99': percentil(0.99), 'errores': errores}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrencia', type=int, default=64)
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--lentos', type=int, default=0, help='conexiones lentas simultáneas')
+    parser.add_argument('--contratos', type=int, default=2000)
+    parser.add_argument('--path', default='/api/contratos?limit=50')
+    args = parser.parse_args()
+
+    uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    preparar_base(uri, args.contratos)
+
+    print(f'{"servidor":<10}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"errores":>10}')
+    for nombre in SERVIDORES:
+        puerto = puerto_libre()
+        proceso = arrancar(nombre, puerto, uri)
+        try:
+            r = asyncio.run(carga(puerto, args.path, args.concurrencia, args.segundos, args.lentos))
+        finally:
+            proceso.terminate()
+            proceso.wait()
+        print(f'{nombre:<10}{r["rps"]:>10.0f}{r["p50"]:>10.1f}{r["p99"]:>10.1f}{r["errores"]:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark de compresión - Tier 2: Lógica de Negocio
+Mide GET /api/contratos completo (con empresa y servicio embebidos) sin
+compresión y con cada algoritmo disponible: bytes enviados, ratio y tiempo por
+petición, tanto la primera vez (consulta + serialización + compresión) como en
+las repeticiones servidas desde la caché de respuestas comprimidas.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_compression --contratos 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app  # noqa: E402
+from app.compression import available_codecs  # noqa: E402
+from benchmarks.bench_serialization import seed  # noqa: E402
+
+
+def medir(client, headers, repeticiones):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        respuesta = client.get('/api/contratos', headers=headers)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, respuesta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--empresas', type=int, default=500)
+    parser.add_argument('--servicios', type=int, default=50)
+    parser.add_argument('--contratos', type=int, default=20000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    with app.app_context():
+        seed(args.empresas, args.servicios, args.contratos)
+    client = app.test_client()
+    cache = app.extensions['compression'].cache
+
+    t_plano, plano = medir(client, {}, args.repeticiones)
+    tamano = len(plano.get_data())
+    print(f'{"codificación":<14}{"bytes":>12}{"ratio":>8}{"1ª ms":>10}{"caché ms":>10}')
+    print(f'{"identity":<14}{tamano:>12}{1:>8.1f}{t_plano * 1000:>10.1f}{"-":>10}')
+    for nombre in available_codecs():
+        headers = {'Accept-Encoding': nombre}
+        if cache is not None:
+            cache.clear()
+        t_primera, respuesta = medir(client, headers, 1)
+        t_cache, _ = medir(client, headers, args.repeticiones)
+        comprimido = len(respuesta.get_data())
+        print(f'{nombre:<14}{comprimido:>12}{tamano / comprimido:>8.1f}{t_primera * 1000:>10.1f}{t_cache * 1000:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark de borrado en cascada - Tier 3: Acceso a Datos
+Compara el borrado de una empresa con muchos contratos en modo orm (los
+contratos se cargan en la sesión y se eliminan uno a uno) y en modo cascade
+(una sola sentencia DELETE y ON DELETE CASCADE en la base de datos).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_delete --contratos 20000 --rondas 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import event, func, insert, select  # noqa: E402
+from app import create_app  # noqa: E402
+from app.config.database import db  # noqa: E402
+from app.models import Empresa, Servicio, Contrato  # noqa: E402
+from app.repositories.empresa_repository import EmpresaRepository  # noqa: E402
+
+
+def seed(n_contratos):
+    """Crea una empresa grande con `n_contratos` contratos y otra pequeña que no debe verse afectada"""
+    db.session.execute(insert(Empresa), [
+        {'nombre': nombre, 'direccion': 'Calle 1', 'telefono': '0990000000', 'email': 'bench@example.com'}
+        for nombre in ('Grande', 'Pequeña')
+    ])
+    db.session.execute(insert(Servicio), [{'nombre': 'Limpieza', 'precio_base': 100, 'duracion_horas': 2}])
+    empresa_id, otra_id = db.session.execute(select(Empresa.id).order_by(Empresa.id)).scalars()
+    servicio_id = db.session.execute(select(func.max(Servicio.id))).scalar()
+    db.session.execute(insert(Contrato), [
+        {'empresa_id': otra_id if i % 100 == 0 else empresa_id, 'servicio_id': servicio_id,
+         'fecha_inicio': date.today(), 'estado': 'activo', 'precio_final': 100}
+        for i in range(n_contratos)
+    ])
+    db.session.commit()
+    db.session.expunge_all()
+    return empresa_id
+
+
+def run(modo, n_contratos):
+    """Borra la empresa grande y devuelve (segundos, sentencias SQL, contratos restantes)"""
+    empresa_id = seed(n_contratos)
+    sentencias = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', contar)
+    inicio = time.perf_counter()
+    EmpresaRepository.delete(empresa_id, modo)
+    duracion = time.perf_counter() - inicio
+    event.remove(db.engine, 'before_cursor_execute', contar)
+    restantes = db.session.execute(select(func.count()).select_from(Contrato)).scalar()
+    return duracion, len(sentencias), restantes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--contratos', type=int, default=20000)
+    parser.add_argument('--rondas', type=int, default=3)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    os.environ['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    os.environ['CATALOG_CACHE_BACKEND'] = 'none'
+    app = create_app()
+
+    print(f'{"modo":<10}{"ms":>10}{"sentencias":>12}{"restantes":>11}')
+    with app.app_context():
+        for modo in ('orm', 'cascade'):
+            mejores = None
+            for _ in range(args.rondas):
+                db.drop_all()
+                db.create_all()
+                resultado = run(modo, args.contratos)
+                if mejores is None or resultado[0] < mejores[0]:
+                    mejores = resultado
+            duracion, sentencias, restantes = mejores
+            print(f'{modo:<10}{duracion * 1000:>10.1f}{sentencias:>12}{restantes:>11}')
+
+
+if __name__ == '__main__':
+    main()
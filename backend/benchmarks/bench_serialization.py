@@ -0,0 +1,95 @@
+"""
+Benchmark de serialización - Tier 2: Lógica de Negocio
+Compara filas/segundo del camino anterior (objetos ORM + to_dict() + jsonify)
+con el serializador por filas (SELECT de columnas + función compilada + backend
+JSON rápido) para los tres modelos, y verifica que la salida sea idéntica.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_serialization --contratos 20000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import insert  # noqa: E402
+from app import create_app  # noqa: E402
+from app.config.database import db  # noqa: E402
+from app.controllers.serialization import backend_name, dumps, rows_payload  # noqa: E402
+from app.models import Empresa, Servicio, Contrato  # noqa: E402
+from app.models.serialization import empresa_rows, servicio_rows, contrato_rows  # noqa: E402
+from app.repositories.contrato_repository import ContratoRepository  # noqa: E402
+
+
+def seed(n_empresas, n_servicios, n_contratos):
+    """Inserta datos sintéticos (incluye caracteres no ASCII para verificar el escape)"""
+    db.session.execute(insert(Empresa), [
+        {'nombre': f'Compañía Nº{i}', 'direccion': f'Av. Pérez {i}', 'telefono': f'09{i:08d}',
+         'email': f'info{i}@empresa.ec'} for i in range(n_empresas)
+    ])
+    db.session.execute(insert(Servicio), [
+        {'nombre': f'Limpieza {i}', 'descripcion': 'Desinfección «profunda» ✓', 'precio_base': 100 + i * 0.25,
+         'duracion_horas': 1.5 + i % 8} for i in range(n_servicios)
+    ])
+    hoy = date.today()
+    db.session.execute(insert(Contrato), [
+        {'empresa_id': 1 + i % n_empresas, 'servicio_id': 1 + i % n_servicios,
+         'fecha_inicio': hoy + timedelta(days=i % 365),
+         'fecha_fin': None if i % 3 else hoy + timedelta(days=400),
+         'estado': 'activo', 'precio_final': 99.99 + i % 50} for i in range(n_contratos)
+    ])
+    db.session.commit()
+
+
+def antes(app, cargar):
+    db.session.expunge_all()
+    objetos = cargar()
+    return app.json.response([objeto.to_dict() for objeto in objetos]).get_data()
+
+
+def despues(serializer):
+    rows = db.session.execute(serializer.select().order_by(serializer.model.id)).all()
+    items, floats_ok = rows_payload(serializer, rows)
+    return dumps(items, floats_ok) + b'\n'
+
+
+def medir(funcion, repeticiones):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        salida = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, salida
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--empresas', type=int, default=500)
+    parser.add_argument('--servicios', type=int, default=50)
+    parser.add_argument('--contratos', type=int, default=20000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app()
+    with app.test_request_context():
+        seed(args.empresas, args.servicios, args.contratos)
+        casos = [
+            ('empresas', args.empresas, lambda: Empresa.query.order_by(Empresa.id).all(), empresa_rows),
+            ('servicios', args.servicios, lambda: Servicio.query.order_by(Servicio.id).all(), servicio_rows),
+            ('contratos', args.contratos, lambda: ContratoRepository.get_all(), contrato_rows)
+        ]
+        print(f'backend JSON: {backend_name()}')
+        print(f'{"modelo":<12}{"filas":>8}{"antes filas/s":>16}{"después filas/s":>18}{"x":>7}  idéntico')
+        for nombre, filas, cargar, serializer in casos:
+            t_antes, salida_antes = medir(lambda: antes(app, cargar), args.repeticiones)
+            t_despues, salida_despues = medir(lambda: despues(serializer), args.repeticiones)
+            print(f'{nombre:<12}{filas:>8}{filas / t_antes:>16.0f}{filas / t_despues:>18.0f}'
+                  f'{t_antes / t_despues:>7.1f}  {salida_antes == salida_despues}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark de escalado por workers - Tier 2: Lógica de Negocio
+Lanza la aplicación con gunicorn.conf.py variando el número de workers (por
+defecto 1, 2, 4, ... hasta el número de núcleos) sobre la misma base de datos
+SQLite y mide peticiones/segundo y latencias p50/p99. Como referencia incluye el
+servidor de desarrollo de run.py (Werkzeug, un proceso con hilos).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_workers --concurrencia 64 --segundos 10
+    python -m benchmarks.bench_workers --workers 1,2,4,8 --threads 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.bench_asgi import arrancar, carga, preparar_base, puerto_libre
+
+
+def niveles(maximo):
+    """1, 2, 4, ... hasta el máximo (incluido)"""
+    valores = []
+    n = 1
+    while n < maximo:
+        valores.append(n)
+        n *= 2
+    return valores + [maximo]
+
+
+def medir(nombre, uri, args, gunicorn=False, **entorno):
+    """Arranca run.py (Werkzeug) o gunicorn con gunicorn.conf.py y ejecuta la carga"""
+    puerto = puerto_libre()
+    comando = None
+    if gunicorn:
+        comando = [sys.executable, '-m', 'gunicorn', 'run:app', '--bind', f'127.0.0.1:{puerto}']
+    proceso = arrancar(nombre, puerto, uri, comando, **entorno)
+    try:
+        return asyncio.run(carga(puerto, args.path, args.concurrencia, args.segundos, 0))
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', help='lista separada por comas (por defecto potencias de 2 hasta los núcleos)')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--concurrencia', type=int, default=64)
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--contratos', type=int, default=2000)
+    parser.add_argument('--path', default='/api/contratos?limit=50')
+    args = parser.parse_args()
+
+    workers = [int(n) for n in args.workers.split(',')] if args.workers else niveles(os.cpu_count() or 1)
+    uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    preparar_base(uri, args.contratos)
+
+    print(f'núcleos: {os.cpu_count()}  hilos por worker: {args.threads}')
+    print(f'{"servidor":<14}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"errores":>10}')
+
+    def fila(nombre, r):
+        print(f'{nombre:<14}{r["rps"]:>10.0f}{r["p50"]:>10.1f}{r["p99"]:>10.1f}{r["errores"]:>10}')
+
+    fila('run.py', medir('wsgi', uri, args))
+    for n in workers:
+        # Sin almacenes en memoria del proceso, que gunicorn no admite con varios workers
+        fila(f'gunicorn x{n}', medir('gunicorn', uri, args, gunicorn=True,
+                                     WEB_WORKERS=str(n), WEB_THREADS=str(args.threads),
+                                     CATALOG_CACHE_BACKEND='none', VERSION_STORE_BACKEND='none'))
+
+
+if __name__ == '__main__':
+    main()
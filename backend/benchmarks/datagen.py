@@ -0,0 +1,143 @@
+"""
+Generador de datos sintéticos - Tier 3: Acceso a Datos
+Llena empresas, servicios y contratos a la escala indicada con inserciones en
+lote (INSERT de varias filas por sentencia, un commit por bloque) y recalcula
+el resumen por empresa. Los datos son deterministas para una misma semilla, de
+modo que dos ejecuciones del benchmark parten de la misma base de datos.
+
+Uso (desde backend/, sobre SQLALCHEMY_DATABASE_URI):
+    python -m benchmarks.datagen --escala 100k
+    python -m benchmarks.datagen --empresas 500 --servicios 40 --contratos 250000 --semilla 7
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import insert, select  # noqa: E402
+from app.config.database import db  # noqa: E402
+from app.models import Empresa, Servicio, Contrato  # noqa: E402
+from app.repositories.resumen_repository import ResumenRepository  # noqa: E402
+from app.repositories.versioning import mark_changed  # noqa: E402
+
+# (empresas, servicios, contratos) de cada escala predefinida
+ESCALAS = {
+    '1k': (50, 10, 1000),
+    '10k': (200, 20, 10000),
+    '100k': (2000, 50, 100000),
+    '1m': (20000, 100, 1000000),
+}
+
+ESTADOS = (('activo', 70), ('finalizado', 20), ('cancelado', 10))
+SERVICIOS = ('Limpieza General', 'Limpieza Profunda', 'Limpieza de Alfombras', 'Desinfección',
+             'Limpieza de Vidrios', 'Mantenimiento de Pisos')
+
+
+def _bloques(filas, tamano):
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) == tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def _insertar(modelo, filas, tamano):
+    total = 0
+    for bloque in _bloques(filas, tamano):
+        db.session.execute(insert(modelo), bloque)
+        db.session.commit()
+        total += len(bloque)
+    return total
+
+
+def generate(n_empresas, n_servicios, n_contratos, semilla=42, chunk_size=5000):
+    """
+    Inserta los datos sintéticos en la base de datos de la aplicación actual.
+
+    Se añaden a los existentes; los contratos referencian solo las empresas y servicios
+    creados en esta llamada. Devuelve {tabla: filas insertadas}.
+    """
+    rnd = random.Random(semilla)
+    hoy = date.today()
+
+    primera_empresa = db.session.scalar(select(db.func.coalesce(db.func.max(Empresa.id), 0)))
+    _insertar(Empresa, (
+        {'nombre': f'Empresa {i:06d} S.A.', 'direccion': f'Av. Principal {rnd.randint(1, 9999)}',
+         'telefono': f'09{rnd.randint(0, 99999999):08d}', 'email': f'contacto{i}@empresa{i}.com'}
+        for i in range(n_empresas)
+    ), chunk_size)
+    empresa_ids = db.session.scalars(select(Empresa.id).where(Empresa.id > primera_empresa)).all()
+
+    primer_servicio = db.session.scalar(select(db.func.coalesce(db.func.max(Servicio.id), 0)))
+    _insertar(Servicio, (
+        {'nombre': f'{SERVICIOS[i % len(SERVICIOS)]} {i}', 'descripcion': f'Servicio sintético {i}',
+         'precio_base': round(rnd.uniform(50, 500), 2), 'duracion_horas': float(rnd.randint(1, 12))}
+        for i in range(n_servicios)
+    ), chunk_size)
+    servicios = db.session.execute(
+        select(Servicio.id, Servicio.precio_base).where(Servicio.id > primer_servicio)
+    ).all()
+
+    estados = [estado for estado, _ in ESTADOS]
+    pesos = [peso for _, peso in ESTADOS]
+
+    def contratos():
+        for _ in range(n_contratos):
+            servicio_id, precio_base = rnd.choice(servicios)
+            inicio = hoy + timedelta(days=rnd.randint(-730, 365))
+            yield {
+                'empresa_id': rnd.choice(empresa_ids),
+                'servicio_id': servicio_id,
+                'fecha_inicio': inicio,
+                'fecha_fin': inicio + timedelta(days=rnd.randint(30, 365)) if rnd.random() < 0.6 else None,
+                'estado': rnd.choices(estados, pesos)[0],
+                'precio_final': round(precio_base * rnd.uniform(0.8, 1.2), 2),
+            }
+
+    insertados = _insertar(Contrato, contratos(), chunk_size)
+    ResumenRepository.rebuild()
+    for coleccion in ('empresas', 'servicios', 'contratos'):
+        mark_changed(db.session, coleccion)
+    db.session.commit()
+    return {'empresas': len(empresa_ids), 'servicios': len(servicios), 'contratos': insertados}
+
+
+def add_arguments(parser):
+    """Opciones de escala compartidas por el generador y la suite de benchmarks"""
+    parser.add_argument('--escala', choices=ESCALAS, default='1k', help='tamaño predefinido')
+    parser.add_argument('--empresas', type=int, help='sustituye el valor de la escala')
+    parser.add_argument('--servicios', type=int, help='sustituye el valor de la escala')
+    parser.add_argument('--contratos', type=int, help='sustituye el valor de la escala')
+    parser.add_argument('--semilla', type=int, default=42)
+
+
+def scale_from_args(args):
+    """(empresas, servicios, contratos) según --escala y los valores indicados explícitamente"""
+    empresas, servicios, contratos = ESCALAS[args.escala]
+    return (args.empresas or empresas, args.servicios or servicios, args.contratos or contratos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        inicio = time.perf_counter()
+        filas = generate(*scale_from_args(args), semilla=args.semilla, chunk_size=args.chunk_size)
+        duracion = time.perf_counter() - inicio
+    print(', '.join(f'{tabla}: {n}' for tabla, n in filas.items()) + f' ({duracion:.1f} s)')
+
+
+if __name__ == '__main__':
+    main()
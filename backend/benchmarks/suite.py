@@ -0,0 +1,346 @@
+"""
+Suite de benchmarks de la API - Tier 2: Lógica de Negocio
+Genera una base de datos sintética (benchmarks.datagen) y recorre todos los
+endpoints de empresas, servicios y contratos: lecturas, vistas, exportaciones,
+altas, modificaciones, bajas y lotes. Para cada caso informa peticiones/segundo,
+latencias p50/p99 y la memoria residente máxima, y guarda los resultados en JSON
+para compararlos entre ejecuciones.
+
+Modos:
+    cliente  en proceso con el cliente de pruebas de Flask (sin red)
+    http     contra un servidor local (run.py, gunicorn o uvicorn) o --url
+
+Uso (desde backend/):
+    python -m benchmarks.suite --escala 10k --salida base.json
+    python -m benchmarks.suite --escala 100k --modo http --servidor gunicorn --concurrencia 16 --salida nuevo.json
+    python -m benchmarks.suite --comparar base.json nuevo.json
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.datagen import add_arguments, generate, scale_from_args  # noqa: E402
+
+BACKEND = os.path.join(os.path.dirname(__file__), '..')
+
+
+class Caso:
+    """Petición de un endpoint; `preparar(i)` devuelve (ruta, cuerpo) de la iteración i"""
+
+    def __init__(self, nombre, metodo, preparar, peticiones=None, esperado=(200,), guardar_id=None):
+        self.nombre = nombre
+        self.metodo = metodo
+        self.preparar = preparar
+        self.peticiones = peticiones
+        self.esperado = esperado
+        self.guardar_id = guardar_id
+
+
+def casos(escala, peticiones, semilla):
+    """Casos de la suite, en orden: lecturas, altas, modificaciones, bajas y lotes"""
+    n_empresas, n_servicios, n_contratos = escala
+    rnd = random.Random(semilla)
+    creados = {'empresas': [], 'servicios': [], 'contratos': []}
+    inicio = (date.today() + timedelta(days=1)).isoformat()
+    lote = max(1, peticiones // 10)
+
+    def aleatorio(n):
+        return lambda i: rnd.randint(1, n)
+
+    empresa, servicio, contrato = aleatorio(n_empresas), aleatorio(n_servicios), aleatorio(n_contratos)
+
+    def creado(coleccion):
+        return lambda i: creados[coleccion][i % len(creados[coleccion])]
+
+    def nueva_empresa(i):
+        return {'nombre': f'Bench {i}', 'direccion': 'Calle 1', 'telefono': '0990000000', 'email': f'b{i}@bench.ec'}
+
+    def nuevo_servicio(i):
+        return {'nombre': f'Bench {i}', 'descripcion': 'bench', 'precio_base': 100.0, 'duracion_horas': 2.0}
+
+    def nuevo_contrato(i):
+        return {'empresa_id': empresa(i), 'servicio_id': servicio(i), 'fecha_inicio': inicio}
+
+    def get(ruta):
+        return lambda i: (ruta(i) if callable(ruta) else ruta, None)
+
+    pocas = max(1, peticiones // 20)
+    return creados, [
+        Caso('empresas.listar', 'GET', get('/api/empresas')),
+        Caso('empresas.pagina', 'GET', get('/api/empresas?limit=100')),
+        Caso('empresas.filtro', 'GET', get(lambda i: f'/api/empresas?nombre=Empresa%20{empresa(i) % 1000:03d}&limit=50')),
+        Caso('empresas.detalle', 'GET', get(lambda i: f'/api/empresas/{empresa(i)}')),
+        Caso('empresas.resumen', 'GET', get(lambda i: f'/api/empresas/{empresa(i)}/resumen')),
+        Caso('empresas.export', 'GET', get('/api/empresas/export'), pocas),
+        Caso('servicios.listar', 'GET', get('/api/servicios')),
+        Caso('servicios.pagina', 'GET', get('/api/servicios?limit=100')),
+        Caso('servicios.detalle', 'GET', get(lambda i: f'/api/servicios/{servicio(i)}')),
+        Caso('servicios.export', 'GET', get('/api/servicios/export'), pocas),
+        Caso('contratos.pagina', 'GET', get('/api/contratos?limit=100')),
+        Caso('contratos.filtro', 'GET', get(lambda i: f'/api/contratos?empresa_id={empresa(i)}&estado=activo&limit=100')),
+        Caso('contratos.campos', 'GET', get('/api/contratos?limit=100&fields=id,estado,precio_final&include=')),
+        Caso('contratos.sideload', 'GET', get('/api/contratos?limit=100&sideload=true')),
+        Caso('contratos.detalle', 'GET', get(lambda i: f'/api/contratos/{contrato(i)}')),
+        Caso('contratos.export', 'GET', get(lambda i: f'/api/contratos/export?empresa_id={empresa(i)}'), pocas),
+        Caso('contratos.listar', 'GET', get('/api/contratos'), pocas),
+        Caso('empresas.crear', 'POST', lambda i: ('/api/empresas', nueva_empresa(i)), esperado=(201,),
+             guardar_id='empresas'),
+        Caso('servicios.crear', 'POST', lambda i: ('/api/servicios', nuevo_servicio(i)), esperado=(201,),
+             guardar_id='servicios'),
+        Caso('contratos.crear', 'POST', lambda i: ('/api/contratos', nuevo_contrato(i)), esperado=(201,),
+             guardar_id='contratos'),
+        Caso('empresas.modificar', 'PUT', lambda i: (f'/api/empresas/{creado("empresas")(i)}', {'telefono': f'09{i:08d}'})),
+        Caso('servicios.modificar', 'PUT', lambda i: (f'/api/servicios/{creado("servicios")(i)}', {'precio_base': 100.0 + i})),
+        Caso('contratos.modificar', 'PUT', lambda i: (f'/api/contratos/{creado("contratos")(i)}', {'estado': 'finalizado'})),
+        Caso('contratos.eliminar', 'DELETE', lambda i: (f'/api/contratos/{creados["contratos"][i]}', None)),
+        Caso('servicios.eliminar', 'DELETE', lambda i: (f'/api/servicios/{creados["servicios"][i]}', None)),
+        Caso('empresas.eliminar', 'DELETE', lambda i: (f'/api/empresas/{creados["empresas"][i]}', None)),
+        Caso('empresas.lote', 'POST', lambda i: ('/api/empresas/bulk', [nueva_empresa(i * 100 + j) for j in range(100)]),
+             lote),
+        Caso('servicios.lote', 'POST', lambda i: ('/api/servicios/bulk', [nuevo_servicio(i * 100 + j) for j in range(100)]),
+             lote),
+        Caso('contratos.lote', 'POST', lambda i: ('/api/contratos/bulk', [nuevo_contrato(i * 100 + j) for j in range(100)]),
+             lote),
+    ]
+
+
+def percentil(valores, p):
+    return valores[min(len(valores) - 1, int(len(valores) * p))] * 1000 if valores else None
+
+
+def rss_pico_mb(pid=None):
+    """Memoria residente máxima (MB) de este proceso o de un servidor y sus procesos hijos (Linux)"""
+    if pid is None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    pico = 0
+    pendientes = [pid]
+    while pendientes:
+        actual = pendientes.pop()
+        try:
+            with open(f'/proc/{actual}/status') as status:
+                for linea in status:
+                    if linea.startswith('VmHWM:'):
+                        pico = max(pico, int(linea.split()[1]) / 1024)
+            with open(f'/proc/{actual}/task/{actual}/children') as hijos:
+                pendientes.extend(int(hijo) for hijo in hijos.read().split())
+        except OSError:
+            continue
+    return pico or None
+
+
+class ClienteFlask:
+    """Ejecuta las peticiones en proceso con el cliente de pruebas de Flask"""
+
+    concurrencia = 1
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def __call__(self, metodo, ruta, cuerpo):
+        respuesta = self.client.open(ruta, method=metodo, json=cuerpo)
+        datos = respuesta.get_data()
+        return respuesta.status_code, datos
+
+    def rss(self):
+        return rss_pico_mb()
+
+
+class ClienteHttp:
+    """Ejecuta las peticiones contra un servidor HTTP con una conexión persistente por hilo"""
+
+    def __init__(self, url, concurrencia, pid=None):
+        partes = urlsplit(url)
+        self.host, self.port = partes.hostname, partes.port or 80
+        self.concurrencia = concurrencia
+        self.pid = pid
+        self._local = threading.local()
+
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = self._local.conexion = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        return conexion
+
+    def __call__(self, metodo, ruta, cuerpo):
+        cabeceras = {'Content-Type': 'application/json'} if cuerpo is not None else {}
+        datos = json.dumps(cuerpo) if cuerpo is not None else None
+        for intento in range(2):
+            conexion = self._conexion()
+            try:
+                conexion.request(metodo, ruta, datos, cabeceras)
+                respuesta = conexion.getresponse()
+                return respuesta.status, respuesta.read()
+            except (http.client.HTTPException, ConnectionError):
+                # El servidor cerró la conexión persistente: se reintenta una vez con una nueva
+                conexion.close()
+                self._local.conexion = None
+                if intento:
+                    raise
+
+    def rss(self):
+        return rss_pico_mb(self.pid) if self.pid else None
+
+
+def ejecutar(cliente, caso, peticiones, creados):
+    n = caso.peticiones or peticiones
+    if caso.metodo == 'DELETE':
+        n = min(n, len(creados[caso.nombre.split('.')[0]]))
+    peticiones_caso = [caso.preparar(i) for i in range(n)]
+    latencias = []
+    errores = 0
+
+    def una(peticion):
+        ruta, cuerpo = peticion
+        inicio = time.perf_counter()
+        estado, datos = cliente(caso.metodo, ruta, cuerpo)
+        return time.perf_counter() - inicio, estado, datos
+
+    inicio = time.perf_counter()
+    if cliente.concurrencia > 1:
+        with ThreadPoolExecutor(cliente.concurrencia) as pool:
+            resultados = list(pool.map(una, peticiones_caso))
+    else:
+        resultados = [una(peticion) for peticion in peticiones_caso]
+    duracion = time.perf_counter() - inicio
+
+    for latencia, estado, datos in resultados:
+        latencias.append(latencia)
+        if estado not in caso.esperado:
+            errores += 1
+        elif caso.guardar_id:
+            creados[caso.guardar_id].append(json.loads(datos)['id'])
+    latencias.sort()
+    return {
+        'caso': caso.nombre,
+        'metodo': caso.metodo,
+        'peticiones': n,
+        'errores': errores,
+        'rps': round(n / duracion, 1) if duracion else None,
+        'p50_ms': round(percentil(latencias, 0.50), 2) if latencias else None,
+        'p99_ms': round(percentil(latencias, 0.99), 2) if latencias else None,
+        'rss_pico_mb': round(cliente.rss(), 1) if cliente.rss() else None,
+    }
+
+
+def arrancar_servidor(servidor, uri):
+    """Arranca el servidor indicado sobre la base de datos generada; devuelve (proceso, url)"""
+    from benchmarks.bench_asgi import arrancar, puerto_libre, SERVIDORES
+    puerto = puerto_libre()
+    comando = None
+    if servidor == 'gunicorn':
+        comando = [sys.executable, '-m', 'gunicorn', 'run:app', '--bind', f'127.0.0.1:{puerto}']
+    elif servidor not in SERVIDORES:
+        raise ValueError(f'Servidor desconocido: {servidor}')
+    return arrancar(servidor, puerto, uri, comando), f'http://127.0.0.1:{puerto}'
+
+
+def commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(resultados):
+    print(f'{"caso":<22}{"pet.":>6}{"err.":>6}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"RSS MB":>9}')
+    for r in resultados:
+        print(f'{r["caso"]:<22}{r["peticiones"]:>6}{r["errores"]:>6}{r["rps"] or 0:>10.1f}'
+              f'{r["p50_ms"] or 0:>10.2f}{r["p99_ms"] or 0:>10.2f}{r["rss_pico_mb"] or 0:>9.1f}')
+
+
+def comparar(base, nuevo):
+    """Diferencia porcentual de req/s y p99 por caso entre dos ficheros de resultados"""
+    with open(base) as a, open(nuevo) as b:
+        antes, despues = json.load(a), json.load(b)
+    previos = {r['caso']: r for r in antes['resultados']}
+    print(f'{antes.get("commit")} -> {despues.get("commit")}')
+    print(f'{"caso":<22}{"req/s":>10}{"Δ req/s":>10}{"p99 ms":>10}{"Δ p99":>10}')
+    for r in despues['resultados']:
+        previo = previos.get(r['caso'])
+        if not previo or not previo['rps'] or not previo['p99_ms']:
+            continue
+        delta_rps = (r['rps'] - previo['rps']) / previo['rps'] * 100
+        delta_p99 = (r['p99_ms'] - previo['p99_ms']) / previo['p99_ms'] * 100
+        print(f'{r["caso"]:<22}{r["rps"]:>10.1f}{delta_rps:>+9.1f}%{r["p99_ms"]:>10.2f}{delta_p99:>+9.1f}%')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--modo', choices=('cliente', 'http'), default='cliente')
+    parser.add_argument('--servidor', choices=('wsgi', 'gunicorn', 'asgi'), default='gunicorn',
+                        help='servidor local del modo http')
+    parser.add_argument('--url', help='servidor ya en marcha (modo http, sin generar datos)')
+    parser.add_argument('--peticiones', type=int, default=200, help='peticiones por caso')
+    parser.add_argument('--concurrencia', type=int, default=8, help='clientes simultáneos (modo http)')
+    parser.add_argument('--casos', help='prefijos de casos separados por comas (p. ej. contratos,empresas.detalle)')
+    parser.add_argument('--salida', help='fichero JSON de resultados')
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NUEVO'), help='compara dos ficheros de resultados')
+    args = parser.parse_args()
+
+    if args.comparar:
+        return comparar(*args.comparar)
+
+    escala = scale_from_args(args)
+    proceso = None
+    if args.url:
+        cliente = ClienteHttp(args.url, args.concurrencia)
+    else:
+        uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'suite.db')}"
+        os.environ['SQLALCHEMY_DATABASE_URI'] = uri
+        from app import create_app
+        app = create_app()
+        with app.app_context():
+            inicio = time.perf_counter()
+            generate(*escala, semilla=args.semilla)
+            print(f'Datos generados: {escala} en {time.perf_counter() - inicio:.1f} s')
+        if args.modo == 'cliente':
+            cliente = ClienteFlask(app)
+        else:
+            proceso, url = arrancar_servidor(args.servidor, uri)
+            cliente = ClienteHttp(url, args.concurrencia, proceso.pid)
+
+    creados, lista = casos(escala, args.peticiones, args.semilla)
+    if args.casos:
+        prefijos = tuple(args.casos.split(','))
+        lista = [caso for caso in lista if caso.nombre.startswith(prefijos)]
+    try:
+        resultados = [ejecutar(cliente, caso, args.peticiones, creados) for caso in lista]
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+    imprimir(resultados)
+    if args.salida:
+        with open(args.salida, 'w') as salida:
+            json.dump({
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'commit': commit_actual(),
+                'python': platform.python_version(),
+                'modo': 'http' if args.url else args.modo,
+                'servidor': args.url or (args.servidor if args.modo == 'http' else None),
+                'concurrencia': args.concurrencia if args.modo == 'http' or args.url else 1,
+                'escala': dict(zip(('empresas', 'servicios', 'contratos'), escala)),
+                'resultados': resultados,
+            }, salida, indent=2)
+        print(f'Resultados guardados en {args.salida}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Lanzador de producción - Tier 2: Lógica de Negocio
+Configuración de gunicorn: workers pre-cargados (la aplicación se importa una vez
+en el proceso maestro y se comparte por fork), motor de base de datos propio en
+cada worker, reciclado por número de peticiones y recarga sin cortes con SIGHUP.
+
+Uso (desde backend/):
+    gunicorn run:app
+    kill -HUP <pid del maestro>    # reemplaza los workers sin cortar conexiones
+"""
+import os
+from dotenv import load_dotenv
+from app.config.server import ServerSettings, check_workers, init_worker, local_stores, process_local_stores
+
+# Las mismas variables que lee create_app (también las del fichero .env)
+load_dotenv()
+_settings = ServerSettings.from_env()
+
+bind = _settings.bind
+workers = _settings.workers
+threads = _settings.threads
+worker_class = _settings.worker_class
+max_requests = _settings.max_requests
+max_requests_jitter = _settings.max_requests_jitter
+timeout = _settings.timeout
+graceful_timeout = _settings.graceful_timeout
+preload_app = _settings.preload
+accesslog = '-'
+
+
+def when_ready(server):
+    """
+    Comprueba que los almacenes se comparten si hay varios workers y, con la aplicación
+    precargada, cierra las conexiones que abrió el maestro (no atiende peticiones)
+    """
+    if not preload_app:
+        check_workers(server.cfg.workers, local_stores(os.environ))
+        return
+    from app.config.database import db
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose()
+    # server.cfg incluye lo indicado en la línea de comandos (p. ej. gunicorn -w 4)
+    check_workers(server.cfg.workers, process_local_stores(app))
+
+
+def post_fork(server, worker):
+    if preload_app:
+        init_worker(server.app.wsgi())
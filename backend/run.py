@@ -9,8 +9,9 @@ app = create_app()
 if __name__ == '__main__':
     # Obtener puerto de variable de entorno o usar 5001 por defecto
     port = int(os.environ.get('PORT', 5001))
-    # Obtener modo debug de variable de entorno (False en producción)
-    debug = os.environ.get('FLASK_ENV', 'development') == 'development'
+    # Modo debug solo si se pide explícitamente con FLASK_ENV=development
+    # (en producción usar el lanzador multi-proceso: gunicorn run:app)
+    debug = os.environ.get('FLASK_ENV', 'production') == 'development'
     
     app.run(debug=debug, host='0.0.0.0', port=port)
 
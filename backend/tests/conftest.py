@@ -0,0 +1,66 @@
+"""
+Fixtures de las pruebas del backend
+Cada prueba crea su propia aplicación sobre una base de datos SQLite en memoria;
+la configuración se pasa por variables de entorno, igual que en producción.
+"""
+import datetime
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app import create_app
+from app.config.database import db
+from app.models.contrato import Contrato
+from app.models.empresa import Empresa
+from app.models.servicio import Servicio
+
+
+@pytest.fixture
+def make_app(monkeypatch):
+    """Crea una aplicación con las variables de entorno indicadas"""
+    def crear(**entorno):
+        monkeypatch.setenv('SQLALCHEMY_DATABASE_URI', 'sqlite:///:memory:')
+        for nombre, valor in entorno.items():
+            monkeypatch.setenv(nombre, str(valor))
+        return create_app()
+    return crear
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+def seed_contratos(app, n):
+    """Crea n contratos, cada uno con su propia empresa y su propio servicio"""
+    hoy = datetime.date.today()
+    with app.app_context():
+        empresas = [Empresa(nombre=f'Empresa {i}', direccion='Calle 1', telefono='600000000',
+                            email=f'e{i}@ejemplo.com') for i in range(n)]
+        servicios = [Servicio(nombre=f'Servicio {i}', descripcion='', precio_base=10.0 + i, duracion_horas=2)
+                     for i in range(n)]
+        db.session.add_all(empresas + servicios)
+        db.session.flush()
+        db.session.add_all([
+            Contrato(empresa_id=empresa.id, servicio_id=servicio.id, fecha_inicio=hoy,
+                     fecha_fin=hoy + datetime.timedelta(days=30), estado='activo', precio_final=servicio.precio_base)
+            for empresa, servicio in zip(empresas, servicios)
+        ])
+        db.session.commit()
+
+
+@contextmanager
+def count_selects(app):
+    """Cuenta las sentencias SELECT que llegan al cursor mientras dura el bloque"""
+    selects = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            selects.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', contar)
+    try:
+        yield selects
+    finally:
+        event.remove(engine, 'before_cursor_execute', contar)
@@ -0,0 +1,129 @@
+"""
+Control de admisión
+Cubo de fichas con un reloj simulado, 429 y 503 con Retry-After, cubos por
+blueprint y por API key, liberación del hueco de concurrencia en el teardown
+y rutas exentas (/metrics y los streams de cambios).
+"""
+import pytest
+from app.admission import ConcurrencyLimiter, RateLimiter, parse_blueprint_rates, parse_rate
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def test_cubo_de_fichas_con_reloj_simulado():
+    reloj = Reloj()
+    limitador = RateLimiter(2.0, 3, clock=reloj)
+    assert [limitador.acquire('a') for _ in range(3)] == [None, None, None]
+    assert limitador.acquire('a') == pytest.approx(0.5)
+    assert limitador.acquire('b') is None
+
+    reloj.ahora += 0.5
+    assert limitador.acquire('a') is None
+    assert limitador.acquire('a') == pytest.approx(0.5)
+    # La recarga no supera la ráfaga
+    reloj.ahora += 60
+    assert [limitador.acquire('a') for _ in range(4)][-1] == pytest.approx(0.5)
+    assert (limitador.permitidas, limitador.rechazadas) == (8, 3)
+
+
+def test_cubo_acota_los_clientes():
+    limitador = RateLimiter(1.0, 1, max_clients=2, clock=Reloj())
+    for cliente in 'abc':
+        limitador.acquire(cliente)
+    assert limitador.clients() == 2
+    # 'a' salió del LRU y vuelve con el cubo lleno
+    assert limitador.acquire('a') is None
+
+
+def test_semaforo_saturado():
+    limitador = ConcurrencyLimiter(1)
+    assert limitador.acquire() is True
+    assert limitador.acquire() is False
+    assert limitador.acquire(timeout=0.01) is False
+    limitador.release()
+    assert limitador.acquire() is True
+    assert (limitador.en_curso, limitador.rechazadas) == (1, 2)
+
+
+def test_parseo_de_limites():
+    assert parse_rate('20/40') == (20.0, 40)
+    assert parse_rate('0.5') == (0.5, 1)
+    assert parse_rate('off') is None
+    assert parse_blueprint_rates('contrato=10/20, reporte=off') == {'contrato': (10.0, 20), 'reporte': None}
+    with pytest.raises(ValueError):
+        parse_rate('-1')
+
+
+def test_429_con_retry_after_por_blueprint(make_app):
+    app = make_app(RATE_LIMIT_DEFAULT='0.01/1', RATE_LIMIT_BLUEPRINTS='servicio=0.01/3,reporte=off')
+    client = app.test_client()
+
+    assert client.get('/api/empresas').status_code == 200
+    rechazada = client.get('/api/empresas')
+    assert rechazada.status_code == 429
+    assert 1 <= int(rechazada.headers['Retry-After']) <= 100
+    # Cada blueprint tiene su propio cubo
+    assert [client.get('/api/servicios').status_code for _ in range(4)] == [200, 200, 200, 429]
+    assert client.get('/api/contratos').status_code == 200
+    assert all(client.get('/api/reportes/estados').status_code == 200 for _ in range(5))
+    assert all(client.get('/metrics').status_code == 200 for _ in range(5))
+
+
+def test_cubos_por_api_key_configurada(make_app):
+    app = make_app(RATE_LIMIT_DEFAULT='0.01/1', RATE_LIMIT_API_KEYS='clave-a,clave-b')
+    client = app.test_client()
+
+    assert client.get('/api/empresas', headers={'X-API-Key': 'clave-a'}).status_code == 200
+    assert client.get('/api/empresas', headers={'X-API-Key': 'clave-a'}).status_code == 429
+    assert client.get('/api/empresas', headers={'X-API-Key': 'clave-b'}).status_code == 200
+    assert client.get('/api/empresas').status_code == 200
+    # Una clave que no está configurada comparte el cubo de la IP
+    assert client.get('/api/empresas', headers={'X-API-Key': 'inventada'}).status_code == 429
+
+
+def test_503_con_el_semaforo_saturado(make_app):
+    app = make_app(ADMISSION_MAX_CONCURRENT=1, ADMISSION_QUEUE_TIMEOUT=0)
+    controller = app.extensions['admission']
+    client = app.test_client()
+
+    assert controller.enter(timeout=0)
+    try:
+        ocupado = client.get('/api/empresas')
+        assert ocupado.status_code == 503
+        assert ocupado.headers['Retry-After'] == '1'
+        # Exentas: las métricas y los streams, que no ocupan hueco
+        assert client.get('/metrics').status_code == 200
+        stream = client.get('/api/changes/stream', buffered=False)
+        assert stream.status_code == 200
+        stream.close()
+    finally:
+        controller.leave()
+    assert controller.concurrencia.rechazadas == 1
+
+
+def test_hueco_liberado_en_el_teardown(make_app):
+    app = make_app(ADMISSION_MAX_CONCURRENT=1, ADMISSION_QUEUE_TIMEOUT=0)
+
+    def fallar():
+        raise RuntimeError('sin capturar')
+
+    app.add_url_rule('/fallo', 'fallo', fallar)
+    concurrencia = app.extensions['admission'].concurrencia
+    client = app.test_client()
+
+    respuestas = [
+        client.get('/api/empresas'),
+        client.get('/api/empresas/999'),
+        client.post('/api/empresas', json={}),
+        client.get('/fallo'),
+    ]
+    assert [r.status_code for r in respuestas] == [200, 404, 400, 500]
+    assert concurrencia.en_curso == 0
+    assert concurrencia.rechazadas == 0
+    assert client.get('/api/empresas').status_code == 200
@@ -0,0 +1,84 @@
+"""
+Modo ASGI
+Los listados y detalles asíncronos de app/asgi.py devuelven el mismo estado,
+cuerpo y ETag que los controladores Flask (WSGI) sobre la misma base de datos.
+Las llamadas ASGI se hacen directamente, sin servidor ni cliente HTTP.
+"""
+import asyncio
+import json
+import pytest
+from tests.conftest import seed_contratos
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('asgiref')
+
+RUTAS = [
+    '/api/empresas',
+    '/api/empresas?limit=2',
+    '/api/empresas/1',
+    '/api/empresas/999',
+    '/api/servicios',
+    '/api/servicios?limit=2&cursor=2',
+    '/api/servicios/3',
+    '/api/contratos',
+    '/api/contratos?estado=activo',
+    '/api/contratos?limit=2',
+    '/api/contratos?limit=1&sideload=true',
+    '/api/contratos?sideload=true',
+    '/api/contratos/1',
+    '/api/contratos/1?fields=estado&include=',
+    '/api/contratos/999',
+    '/api/contratos?estado=desconocido',
+]
+
+
+async def _llamar(asgi, ruta):
+    path, _, query = ruta.partition('?')
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'localhost')], 'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+    }
+    mensajes = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(mensaje):
+        mensajes.append(mensaje)
+
+    await asgi(scope, receive, send)
+    inicio = next(m for m in mensajes if m['type'] == 'http.response.start')
+    headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in inicio['headers']}
+    cuerpo = b''.join(m.get('body', b'') for m in mensajes if m['type'] == 'http.response.body')
+    return inicio['status'], headers, cuerpo
+
+
+@pytest.fixture
+def app(make_app, tmp_path):
+    # Fichero y no memoria: el motor asíncrono abre sus propias conexiones
+    app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'asgi.db'}", API_PAGINATION_REQUIRED='false')
+    seed_contratos(app, 5)
+    return app
+
+
+def test_mismas_respuestas_que_wsgi(app):
+    from app.asgi import create_asgi_app
+
+    asgi = create_asgi_app(app)
+    # Las rutas se resuelven en el manejador asíncrono, no en el adaptador WSGI
+    assert all(asgi._resolver('GET', ruta.partition('?')[0])[0] is not None for ruta in RUTAS)
+
+    async def llamar_todas():
+        try:
+            return [await _llamar(asgi, ruta) for ruta in RUTAS]
+        finally:
+            await asgi.engine.dispose()
+
+    asincronas = asyncio.run(llamar_todas())
+    client = app.test_client()
+    for ruta, (status, headers, cuerpo) in zip(RUTAS, asincronas):
+        wsgi = client.get(ruta)
+        assert status == wsgi.status_code, ruta
+        assert json.loads(cuerpo) == wsgi.get_json(), ruta
+        assert headers.get('etag') == wsgi.headers.get('ETag'), ruta
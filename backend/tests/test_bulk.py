@@ -0,0 +1,106 @@
+"""
+Operaciones en lote
+all_or_nothing no escribe nada si un elemento es inválido (los válidos quedan
+'skipped') o si falla la base de datos en cualquier lote; best_effort responde
+207 y conserva los lotes confirmados. Las operaciones mixtas devuelven los ids
+en el orden de los elementos y chunk_size fija las filas por sentencia.
+"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from app.config.database import db
+from app.models.empresa import Empresa
+from app.repositories.bulk import insert_returning_ids
+from app.repositories.empresa_repository import EmpresaRepository
+from tests.conftest import seed_contratos
+
+RUTA = '/api/empresas/bulk'
+
+
+def _empresa(nombre):
+    return {'nombre': nombre, 'direccion': 'Calle 1', 'telefono': '600000000', 'email': f'{nombre}@ejemplo.com'}
+
+
+def _nombres(client):
+    return sorted(empresa['nombre'] for empresa in client.get('/api/empresas').get_json())
+
+
+@pytest.fixture
+def lotes(monkeypatch):
+    """Registra el tamaño de cada bulk_insert; falla el lote cuyo número (desde 1) esté en `fallar`"""
+    original = EmpresaRepository.bulk_insert
+    registro = {'tamanos': [], 'fallar': set()}
+
+    def bulk_insert(rows):
+        registro['tamanos'].append(len(rows))
+        if len(registro['tamanos']) in registro['fallar']:
+            raise OperationalError('INSERT INTO empresas', {}, Exception('disco lleno'))
+        return original(rows)
+
+    monkeypatch.setattr(EmpresaRepository, 'bulk_insert', staticmethod(bulk_insert))
+    return registro
+
+
+def test_all_or_nothing_con_un_elemento_invalido(app):
+    client = app.test_client()
+    response = client.post(RUTA, json=[_empresa('a'), {'nombre': ''}, _empresa('c')])
+    assert response.status_code == 400
+    cuerpo = response.get_json()
+    assert cuerpo['errors'] == 1
+    assert [r['status'] for r in cuerpo['results']] == ['skipped', 'error', 'skipped']
+    assert _nombres(client) == []
+
+
+def test_all_or_nothing_deshace_los_lotes_anteriores(app, lotes):
+    lotes['fallar'] = {3}
+    client = app.test_client()
+    response = client.post(RUTA, json={'items': [_empresa(n) for n in 'abcde'], 'chunk_size': 2})
+    assert response.status_code == 400
+    assert lotes['tamanos'] == [2, 2, 1]
+    assert all(r['status'] == 'error' and 'OperationalError' in r['error'] for r in response.get_json()['results'])
+    assert _nombres(client) == []
+
+
+def test_best_effort_responde_207(app, lotes):
+    lotes['fallar'] = {2}
+    client = app.test_client()
+    items = [_empresa('a'), _empresa('b'), {'nombre': ''}, _empresa('d'), _empresa('e'), _empresa('f')]
+    response = client.post(RUTA, json={'items': items, 'mode': 'best_effort', 'chunk_size': 2})
+    assert response.status_code == 207
+    cuerpo = response.get_json()
+    # El elemento inválido no llega a escribirse: quedan 5 operaciones en lotes de 2, 2 y 1
+    assert lotes['tamanos'] == [2, 2, 1]
+    assert [r['status'] for r in cuerpo['results']] == ['created', 'created', 'error', 'error', 'error', 'created']
+    assert cuerpo['errors'] == 3
+    assert _nombres(client) == ['a', 'b', 'f']
+
+
+def test_operaciones_mixtas(app):
+    seed_contratos(app, 3)
+    client = app.test_client()
+    response = client.post(RUTA, json={'chunk_size': 10, 'items': [
+        _empresa('nueva-1'),
+        {'op': 'update', 'id': 2, 'data': {'nombre': 'Renombrada'}},
+        {'op': 'delete', 'id': 3},
+        {'op': 'create', 'data': _empresa('nueva-2')},
+    ]})
+    assert response.status_code == 200
+    resultados = response.get_json()['results']
+    assert [(r['status'], r['id']) for r in resultados[1:3]] == [('updated', 2), ('deleted', 3)]
+    creados = [client.get(f"/api/empresas/{r['id']}").get_json()['nombre'] for r in (resultados[0], resultados[3])]
+    assert creados == ['nueva-1', 'nueva-2']
+    assert _nombres(client) == ['Empresa 0', 'Renombrada', 'nueva-1', 'nueva-2']
+    # Los contratos de la empresa eliminada se borran en cascada
+    assert all(c['empresa_id'] != 3 for c in client.get('/api/contratos').get_json())
+
+
+@pytest.mark.parametrize('dialecto', ['sqlite', 'postgresql'])
+def test_ids_en_el_orden_de_las_filas(app, monkeypatch, dialecto):
+    with app.app_context():
+        # Fuera de SQLite se usa RETURNING con sort_by_parameter_order
+        with monkeypatch.context() as parche:
+            parche.setattr(db.engine.dialect, 'name', dialecto)
+            ids = insert_returning_ids(Empresa, [_empresa(n) for n in 'edcba'])
+        nombres = dict(db.session.execute(select(Empresa.id, Empresa.nombre)).all())
+        db.session.rollback()
+    assert [nombres[empresa_id] for empresa_id in ids] == list('edcba')
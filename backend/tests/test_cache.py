@@ -0,0 +1,37 @@
+"""
+Invalidación de la caché de catálogos
+Las escrituras en lote invalidan las entradas al confirmar la transacción, no
+antes: otra petición no puede volver a guardar la fila anterior en ese hueco.
+"""
+from app.config.database import db
+from app.repositories.cache import get_catalog_cache
+from app.repositories.empresa_repository import EmpresaRepository
+from tests.conftest import seed_contratos
+
+
+def _en_cache(empresa_id):
+    encontrados, _ = get_catalog_cache().get_many('empresa', [empresa_id])
+    return empresa_id in encontrados
+
+
+def test_bulk_update_invalida_al_confirmar(app):
+    seed_contratos(app, 2)
+    with app.app_context():
+        EmpresaRepository.get_cached([1, 2])
+        EmpresaRepository.bulk_update([(1, {'nombre': 'Nueva'})])
+        assert _en_cache(1)
+        db.session.commit()
+        assert not _en_cache(1)
+        assert _en_cache(2)
+        assert EmpresaRepository.get_cached([1])[1]['nombre'] == 'Nueva'
+
+
+def test_bulk_delete_deshecho_no_invalida(app):
+    seed_contratos(app, 2)
+    with app.app_context():
+        EmpresaRepository.get_cached([1])
+        EmpresaRepository.bulk_delete([1])
+        db.session.rollback()
+        assert _en_cache(1)
+        db.session.commit()
+        assert _en_cache(1)
@@ -0,0 +1,122 @@
+"""
+Registro de cambios
+GET /api/changes?since= en orden y por páginas (more / last_seq), filas
+actuales tras los borrados (también los contratos borrados en cascada), 410
+cuando la secuencia ya se purgó y el stream SSE con un cambio confirmado
+después de conectar.
+"""
+import json
+import pytest
+from app.config.database import db
+from app.repositories.change_log_repository import ChangeLogRepository
+from tests.conftest import seed_contratos
+
+RUTA = '/api/changes'
+
+
+def _empresa(i):
+    return {'nombre': f'Nueva {i}', 'direccion': 'Calle 2', 'telefono': '600000001', 'email': f'n{i}@ejemplo.com'}
+
+
+def _cambios(client, since, **params):
+    response = client.get(RUTA, query_string={'since': since, **params})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_cambios_en_orden_con_filas_actuales(app):
+    client = app.test_client()
+    desde = _cambios(client, '')['last_seq']
+    primera = client.post('/api/empresas', json=_empresa(1)).get_json()
+    segunda = client.post('/api/empresas', json=_empresa(2)).get_json()
+    client.put(f"/api/empresas/{primera['id']}", json={'nombre': 'Renombrada'})
+
+    cambios = _cambios(client, desde)
+    assert [(c['id'], c['op']) for c in cambios['changes']] == [
+        (primera['id'], 'create'), (segunda['id'], 'create'), (primera['id'], 'update')
+    ]
+    secuencias = [c['seq'] for c in cambios['changes']]
+    assert secuencias == sorted(secuencias) and len(set(secuencias)) == 3
+    assert cambios['last_seq'] == secuencias[-1] and cambios['more'] is False
+    assert cambios['rows']['empresas'][str(primera['id'])]['nombre'] == 'Renombrada'
+    assert _cambios(client, cambios['last_seq'])['changes'] == []
+
+
+def test_paginas_con_more_y_last_seq(app):
+    client = app.test_client()
+    for i in range(5):
+        client.post('/api/empresas', json=_empresa(i))
+
+    vistas, cursor, paginas = [], 0, 0
+    while True:
+        pagina = _cambios(client, cursor, limit=2)
+        vistas += [c['seq'] for c in pagina['changes']]
+        cursor = pagina['last_seq']
+        paginas += 1
+        if not pagina['more']:
+            break
+        assert len(pagina['changes']) == 2
+    assert paginas == 3
+    assert vistas == sorted(set(vistas)) and len(vistas) == 5
+    assert cursor == vistas[-1]
+
+
+@pytest.mark.parametrize('modo', ['cascade', 'orm'])
+def test_borrados_en_cascada_registrados(app, modo):
+    seed_contratos(app, 2)
+    client = app.test_client()
+    desde = _cambios(client, '')['last_seq']
+    contrato = next(c for c in client.get('/api/contratos').get_json() if c['empresa_id'] == 1)
+
+    assert client.delete('/api/empresas/1', query_string={'mode': modo}).status_code == 200
+    client.put('/api/empresas/2', json={'nombre': 'Sigue'})
+
+    cambios = _cambios(client, desde)
+    registrados = {(c['entidad'], c['id'], c['op']) for c in cambios['changes']}
+    assert ('empresas', 1, 'delete') in registrados
+    assert ('contratos', contrato['id'], 'delete') in registrados
+    # Un id cambiado que no está en rows fue eliminado
+    assert '1' not in cambios['rows']['empresas']
+    assert str(contrato['id']) not in cambios['rows'].get('contratos', {})
+    assert cambios['rows']['empresas']['2']['nombre'] == 'Sigue'
+
+
+def test_secuencia_purgada_devuelve_410(app):
+    client = app.test_client()
+    for i in range(3):
+        client.post('/api/empresas', json=_empresa(i))
+    ultima = _cambios(client, '')['last_seq']
+
+    with app.app_context():
+        ChangeLogRepository.purge(db.session.connection(), 1)
+        db.session.commit()
+
+    caducada = client.get(RUTA, query_string={'since': 0})
+    assert caducada.status_code == 410
+    assert caducada.get_json()['reset'] is True
+    assert client.get(RUTA, query_string={'since': ultima + 1}).status_code == 410
+    assert _cambios(client, ultima - 1)['changes'][0]['seq'] == ultima
+
+
+def test_stream_envia_cambio_confirmado_despues_de_conectar(make_app):
+    app = make_app(CHANGE_FEED_POLL_INTERVAL=0.05, CHANGE_FEED_STREAM_TIMEOUT=5)
+    client = app.test_client()
+    response = client.get(f'{RUTA}/stream', buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    eventos = iter(response.response)
+    try:
+        assert next(eventos) == b'retry: 3000\n\n'
+        inicial = next(eventos).decode()
+        assert inicial.startswith('id: 0\nevent: changes\n')
+
+        creada = client.post('/api/empresas', json=_empresa(1)).get_json()
+        evento = next(eventos).decode()
+    finally:
+        response.close()
+
+    cabecera, datos = evento.split('data: ', 1)
+    cambios = json.loads(datos)
+    assert cabecera == f"id: {cambios['last_seq']}\nevent: changes\n"
+    assert [(c['entidad'], c['id'], c['op']) for c in cambios['changes']] == [('empresas', creada['id'], 'create')]
+    assert cambios['rows']['empresas'][str(creada['id'])]['nombre'] == 'Nueva 1'
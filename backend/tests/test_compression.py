@@ -0,0 +1,73 @@
+"""
+Compresión de respuestas
+Cada representación comprimida se descomprime exactamente en la respuesta sin
+comprimir, y una repetición con el mismo Accept-Encoding sale de la caché de
+respuestas comprimidas sin volver a ejecutar la vista.
+"""
+import gzip
+from unittest import mock
+import pytest
+from app.config.server import etags_consistent
+from tests.conftest import seed_contratos
+
+RUTA = '/api/contratos'
+
+
+def _descomprimir(codec, datos):
+    if codec == 'gzip':
+        return gzip.decompress(datos)
+    if codec == 'br':
+        return pytest.importorskip('brotli').decompress(datos)
+    zstandard = pytest.importorskip('zstandard')
+    return zstandard.ZstdDecompressor().decompressobj().decompress(datos)
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(COMPRESSION_MIN_SIZE=64)
+    seed_contratos(app, 30)
+    return app
+
+
+@pytest.mark.parametrize('codec', ['gzip', 'br', 'zstd'])
+def test_cuerpo_comprimido_igual_al_original(app, codec):
+    if codec not in app.extensions['compression'].codecs:
+        pytest.skip(f'{codec} no está instalado')
+    client = app.test_client()
+    plano = client.get(RUTA)
+    assert 'Content-Encoding' not in plano.headers
+    comprimido = client.get(RUTA, headers={'Accept-Encoding': codec})
+    assert comprimido.headers['Content-Encoding'] == codec
+    assert comprimido.headers['ETag'] == 'W/' + plano.headers['ETag']
+    assert _descomprimir(codec, comprimido.data) == plano.data
+
+
+def test_repeticion_servida_desde_cache(app):
+    compressor = app.extensions['compression']
+    assert compressor.cache is not None
+    client = app.test_client()
+    primera = client.get(RUTA, headers={'Accept-Encoding': 'gzip'})
+    aciertos = compressor.cache.stats.hits
+    with mock.patch('app.controllers.contrato_controller.ContratoService.get_contratos_rows',
+                    side_effect=AssertionError('no debe consultar')):
+        segunda = client.get(RUTA, headers={'Accept-Encoding': 'gzip'})
+    assert segunda.status_code == 200
+    assert segunda.data == primera.data
+    assert segunda.headers['ETag'] == primera.headers['ETag']
+    assert compressor.cache.stats.hits == aciertos + 1
+
+
+def test_escritura_cambia_la_respuesta_cacheada(app):
+    client = app.test_client()
+    antes = gzip.decompress(client.get(RUTA, headers={'Accept-Encoding': 'gzip'}).data)
+    client.put('/api/contratos/1', json={'estado': 'cancelado'})
+    despues = gzip.decompress(client.get(RUTA, headers={'Accept-Encoding': 'gzip'}).data)
+    assert despues != antes and b'cancelado' in despues
+
+
+def test_sin_cache_con_varios_workers_y_versiones_en_memoria(make_app, monkeypatch):
+    app = make_app()
+    assert etags_consistent(app, workers=1)
+    assert not etags_consistent(app, workers=4)
+    monkeypatch.setenv('WEB_WORKERS', '4')
+    assert make_app().extensions['compression'].cache is None
@@ -0,0 +1,81 @@
+"""
+Escrituras idempotentes
+Cada caso se ejecuta con los dos almacenes de claves (IDEMPOTENCY_STORE=memory
+y database): reintento con la respuesta guardada, misma clave con otro cuerpo
+y duplicado concurrente mientras la primera petición sigue en curso.
+"""
+import threading
+import pytest
+from app.services.empresa_service import EmpresaService
+
+RUTA = '/api/empresas'
+EMPRESA = {'nombre': 'Acme', 'direccion': 'Calle 1', 'telefono': '600000000', 'email': 'acme@ejemplo.com'}
+
+
+@pytest.fixture(params=['memory', 'database'])
+def app(request, make_app, tmp_path):
+    # Fichero y no memoria: el caso concurrente usa una conexión por hilo
+    return make_app(IDEMPOTENCY_STORE=request.param,
+                    SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'idempotency.db'}")
+
+
+def _empresas(client):
+    return client.get(RUTA).get_json()
+
+
+def test_reintento_devuelve_la_respuesta_guardada(app):
+    client = app.test_client()
+    cabeceras = {'Idempotency-Key': 'alta-1'}
+    primera = client.post(RUTA, json=EMPRESA, headers=cabeceras)
+    assert primera.status_code == 201
+    assert 'Idempotent-Replayed' not in primera.headers
+
+    segunda = client.post(RUTA, json=EMPRESA, headers=cabeceras)
+    assert segunda.status_code == 201
+    assert segunda.headers['Idempotent-Replayed'] == 'true'
+    assert segunda.data == primera.data
+    assert len(_empresas(client)) == 1
+
+
+def test_misma_clave_con_otro_cuerpo(app):
+    client = app.test_client()
+    cabeceras = {'Idempotency-Key': 'alta-1'}
+    assert client.post(RUTA, json=EMPRESA, headers=cabeceras).status_code == 201
+
+    distinta = client.post(RUTA, json={**EMPRESA, 'nombre': 'Otra'}, headers=cabeceras)
+    assert distinta.status_code == 422
+    assert len(_empresas(client)) == 1
+
+
+def test_duplicado_en_curso_rechazado(app, monkeypatch):
+    dentro, continuar = threading.Event(), threading.Event()
+    crear = EmpresaService.create_empresa
+
+    def crear_lento(datos):
+        dentro.set()
+        assert continuar.wait(10)
+        return crear(datos)
+
+    monkeypatch.setattr(EmpresaService, 'create_empresa', staticmethod(crear_lento))
+    cabeceras = {'Idempotency-Key': 'alta-1'}
+    respuestas = {}
+    hilo = threading.Thread(
+        target=lambda: respuestas.setdefault('primera', app.test_client().post(RUTA, json=EMPRESA, headers=cabeceras))
+    )
+    hilo.start()
+    try:
+        assert dentro.wait(10)
+        duplicado = app.test_client().post(RUTA, json=EMPRESA, headers=cabeceras)
+    finally:
+        continuar.set()
+        hilo.join(10)
+
+    assert duplicado.status_code == 409
+    assert duplicado.headers['Retry-After'] == '1'
+    assert respuestas['primera'].status_code == 201
+
+    client = app.test_client()
+    reintento = client.post(RUTA, json=EMPRESA, headers=cabeceras)
+    assert reintento.headers['Idempotent-Replayed'] == 'true'
+    assert reintento.data == respuestas['primera'].data
+    assert len(_empresas(client)) == 1
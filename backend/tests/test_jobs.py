@@ -0,0 +1,130 @@
+"""
+Trabajos en segundo plano
+Ciclo de vida de un trabajo (queued -> running -> succeeded), resultado,
+cancelación antes de empezar y durante la ejecución, y caducidad. Se usa una
+base de datos en fichero para que los workers tengan conexiones propias.
+"""
+import threading
+import time
+import pytest
+from sqlalchemy import update
+from app.config.database import db
+from app.jobs import JobCancelled, JobContext
+from app.models.empresa import Empresa
+from app.models.job import Job, ESTADOS_FINALES
+from app.repositories.job_repository import JobRepository
+from app.services.job_service import JobService
+
+RUTA = '/api/jobs'
+
+
+def _empresas(n):
+    return [{'nombre': f'Empresa {i}', 'direccion': 'Calle 1', 'telefono': '600000000',
+             'email': f'e{i}@ejemplo.com'} for i in range(n)]
+
+
+def _esperar(client, job_id, plazo=10):
+    limite = time.monotonic() + plazo
+    while time.monotonic() < limite:
+        job = client.get(f'{RUTA}/{job_id}').get_json()
+        if job['estado'] in ESTADOS_FINALES:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f'El trabajo {job_id} no terminó')
+
+
+@pytest.fixture
+def app(make_app, tmp_path):
+    return make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'jobs.db'}",
+                    JOBS_WORKERS=1, JOBS_POLL_INTERVAL=0.05, JOBS_PROGRESS_INTERVAL=0)
+
+
+def test_importacion_termina_con_resultado(app):
+    client = app.test_client()
+    enviado = client.post(RUTA, json={'tipo': 'import_empresas',
+                                      'parametros': {'items': _empresas(5), 'chunk_size': 2}})
+    assert enviado.status_code == 202
+    job = enviado.get_json()
+    assert job['estado'] in ('queued', 'running')
+    assert enviado.headers['Location'] == f"{RUTA}/{job['id']}"
+
+    terminado = _esperar(client, job['id'])
+    assert terminado['estado'] == 'succeeded'
+    assert terminado['procesados'] == terminado['total'] == 5
+    resultado = client.get(f"{RUTA}/{job['id']}/result")
+    assert resultado.status_code == 200
+    assert resultado.get_json()['ok'] is True
+    assert len(client.get('/api/empresas').get_json()) == 5
+
+
+def test_cancelar_antes_de_empezar(app, monkeypatch):
+    # Sin hilos en este proceso el trabajo sigue en la cola
+    monkeypatch.setattr(app.extensions['jobs'], 'ensure_started', lambda: None)
+    with app.app_context():
+        job_id = JobRepository.create('reporte', '{"nombre": "estados"}').id
+    client = app.test_client()
+
+    cancelado = client.post(f'{RUTA}/{job_id}/cancel')
+    assert cancelado.status_code == 202
+    assert client.get(f'{RUTA}/{job_id}').get_json()['estado'] == 'cancelled'
+    assert client.get(f'{RUTA}/{job_id}/result').status_code == 409
+    assert client.post(f'{RUTA}/{job_id}/cancel').status_code == 409
+
+
+def test_cancelar_en_curso(app, monkeypatch):
+    dentro, continuar = threading.Event(), threading.Event()
+
+    def importar(items, modo, chunk_size, on_chunk):
+        on_chunk(0, len(items))
+        dentro.set()
+        assert continuar.wait(10)
+        on_chunk(1, len(items))
+        return True, []
+
+    monkeypatch.setitem(JobService.IMPORTACIONES, 'import_empresas', importar)
+    client = app.test_client()
+    job_id = client.post(RUTA, json={'tipo': 'import_empresas', 'parametros': _empresas(2)}).get_json()['id']
+    try:
+        assert dentro.wait(10)
+        cancelado = client.post(f'{RUTA}/{job_id}/cancel')
+    finally:
+        continuar.set()
+
+    assert cancelado.status_code == 202
+    assert cancelado.get_json()['cancelacion_solicitada'] is True
+    assert _esperar(client, job_id)['estado'] == 'cancelled'
+    resultado = client.get(f'{RUTA}/{job_id}/result')
+    assert resultado.status_code == 409
+    assert resultado.get_json()['estado'] == 'cancelled'
+
+
+def test_cancelacion_leida_fuera_de_la_transaccion_del_trabajo(app):
+    with app.app_context():
+        job_id = JobRepository.create('import_empresas', '[]').id
+        with db.engine.begin() as conexion:
+            conexion.execute(update(Job).where(Job.id == job_id).values(estado='running', cancelar=True))
+
+        # Transacción del trabajo abierta con escrituras sin confirmar (importación all_or_nothing)
+        db.session.add(Empresa(**_empresas(1)[0]))
+        db.session.flush()
+        contexto = JobContext(job_id, progress_interval=0)
+        with pytest.raises(JobCancelled):
+            contexto.progress(1, 1)
+        assert db.session().in_transaction()
+        assert db.session.query(Empresa).count() == 1
+        db.session.rollback()
+
+
+def test_trabajo_caducado(app):
+    client = app.test_client()
+    job_id = client.post(RUTA, json={'tipo': 'reporte', 'parametros': {'nombre': 'estados'}}).get_json()['id']
+    assert _esperar(client, job_id)['estado'] == 'succeeded'
+
+    with app.app_context():
+        db.session.execute(update(Job).where(Job.id == job_id).values(expira_en=time.time() - 1))
+        db.session.commit()
+        assert client.get(f'{RUTA}/{job_id}').status_code == 404
+        assert client.get(f'{RUTA}/{job_id}/result').status_code == 404
+        assert job_id not in [job['id'] for job in client.get(RUTA).get_json()]
+        assert JobRepository.purge() == 1
+        assert db.session.get(Job, job_id) is None
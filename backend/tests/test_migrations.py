@@ -0,0 +1,100 @@
+"""
+Migraciones del esquema
+Una base de datos SQLite con el esquema original (claves foráneas de contratos
+sin ON DELETE CASCADE, sin schema_version) se actualiza al arrancar: se
+conservan las filas, la cascada funciona, los contratos huérfanos se descartan
+con un aviso y schema_version queda en la última versión.
+"""
+import logging
+import sqlite3
+import pytest
+from app.config.migrations import MIGRATIONS, latest_version
+
+# Esquema que creaba db.create_all() con los modelos originales
+ESQUEMA_ORIGINAL = '''
+CREATE TABLE empresas (
+    id INTEGER NOT NULL, nombre VARCHAR(100) NOT NULL, direccion VARCHAR(200) NOT NULL,
+    telefono VARCHAR(20) NOT NULL, email VARCHAR(100) NOT NULL, PRIMARY KEY (id)
+);
+CREATE TABLE servicios (
+    id INTEGER NOT NULL, nombre VARCHAR(100) NOT NULL, descripcion TEXT, precio_base FLOAT NOT NULL,
+    duracion_horas FLOAT NOT NULL, PRIMARY KEY (id)
+);
+CREATE TABLE contratos (
+    id INTEGER NOT NULL, empresa_id INTEGER NOT NULL, servicio_id INTEGER NOT NULL, fecha_inicio DATE NOT NULL,
+    fecha_fin DATE, estado VARCHAR(20) NOT NULL, precio_final FLOAT NOT NULL, PRIMARY KEY (id),
+    FOREIGN KEY(empresa_id) REFERENCES empresas (id), FOREIGN KEY(servicio_id) REFERENCES servicios (id)
+);
+INSERT INTO empresas VALUES (1, 'Acme', 'Calle 1', '600000000', 'acme@ejemplo.com');
+INSERT INTO empresas VALUES (2, 'Brillo', 'Calle 2', '600000001', 'brillo@ejemplo.com');
+INSERT INTO servicios VALUES (1, 'Oficinas', '', 100.0, 4);
+INSERT INTO servicios VALUES (2, 'Cristales', NULL, 50.0, 2);
+INSERT INTO contratos VALUES (1, 1, 1, '2024-01-01', NULL, 'activo', 100.0);
+INSERT INTO contratos VALUES (2, 1, 2, '2024-02-01', '2024-12-31', 'finalizado', 45.0);
+INSERT INTO contratos VALUES (3, 2, 1, '2024-03-01', NULL, 'activo', 90.0);
+INSERT INTO contratos VALUES (4, 99, 1, '2024-04-01', NULL, 'activo', 10.0);
+'''
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    ruta = tmp_path / 'original.db'
+    with sqlite3.connect(ruta) as conexion:
+        conexion.executescript(ESQUEMA_ORIGINAL)
+    conexion.close()
+    return ruta
+
+
+def _conectar(ruta):
+    conexion = sqlite3.connect(ruta)
+    conexion.execute('PRAGMA foreign_keys=ON')
+    return conexion
+
+
+def test_actualiza_el_esquema_original(make_app, ruta, caplog):
+    with caplog.at_level(logging.WARNING, logger='app.config.migrations'):
+        make_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{ruta}')
+    assert any('Se descartan 1 contratos' in r.getMessage() and '(ids: 4)' in r.getMessage() for r in caplog.records)
+
+    conexion = _conectar(ruta)
+    try:
+        versiones = [v for (v,) in conexion.execute('SELECT version FROM schema_version ORDER BY version')]
+        assert versiones == sorted(m.version for m in MIGRATIONS)
+        assert versiones[-1] == latest_version()
+
+        assert conexion.execute('SELECT id, empresa_id, servicio_id, fecha_inicio, fecha_fin, estado, precio_final '
+                                'FROM contratos ORDER BY id').fetchall() == [
+            (1, 1, 1, '2024-01-01', None, 'activo', 100.0),
+            (2, 1, 2, '2024-02-01', '2024-12-31', 'finalizado', 45.0),
+            (3, 2, 1, '2024-03-01', None, 'activo', 90.0),
+        ]
+        claves = {fila[3]: fila[6] for fila in conexion.execute('PRAGMA foreign_key_list(contratos)')}
+        assert claves == {'empresa_id': 'CASCADE', 'servicio_id': 'CASCADE'}
+        indices = {fila[1] for fila in conexion.execute('PRAGMA index_list(contratos)')}
+        assert {'ix_contratos_servicio_id', 'ix_contratos_estado', 'ix_contratos_empresa_estado_fecha'} <= indices
+        # El resumen por empresa se calculó con los contratos conservados
+        resumen = conexion.execute('SELECT empresa_id, contratos, total FROM resumen_empresas ORDER BY empresa_id')
+        assert resumen.fetchall() == [(1, 2, 145.0), (2, 1, 90.0)]
+
+        # estado mantiene su valor por defecto y borrar una empresa elimina sus contratos
+        conexion.execute("INSERT INTO contratos (empresa_id, servicio_id, fecha_inicio, precio_final) "
+                         "VALUES (2, 2, '2024-05-01', 50.0)")
+        assert conexion.execute('SELECT estado FROM contratos WHERE fecha_inicio = ?', ('2024-05-01',)).fetchone() \
+            == ('activo',)
+        conexion.execute('DELETE FROM empresas WHERE id = 1')
+        assert [id_ for (id_,) in conexion.execute('SELECT id FROM contratos ORDER BY id')] == [3, 4]
+        conexion.rollback()
+    finally:
+        conexion.close()
+
+
+def test_arranque_repetido_no_vuelve_a_migrar(make_app, ruta):
+    make_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{ruta}')
+    make_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{ruta}')
+    conexion = _conectar(ruta)
+    try:
+        assert conexion.execute('SELECT COUNT(*), MAX(version) FROM schema_version').fetchone() \
+            == (len(MIGRATIONS), latest_version())
+        assert conexion.execute('SELECT COUNT(*) FROM contratos').fetchone() == (3,)
+    finally:
+        conexion.close()
@@ -0,0 +1,37 @@
+"""
+Número de consultas de los endpoints de contratos
+Listado, detalle y exportación deben ejecutar un número fijo de SELECT, sea cual
+sea la cantidad de contratos (sin consultas N+1 al cargar empresa y servicio).
+"""
+import pytest
+from tests.conftest import count_selects, seed_contratos
+
+RUTAS = [
+    '/api/contratos',
+    '/api/contratos?limit=20',
+    '/api/contratos?include=empresa,servicio&sideload=true',
+    '/api/contratos?fields=precio_final&include=empresa',
+    '/api/contratos/export?format=ndjson',
+    '/api/contratos/export?format=json',
+    '/api/contratos/1',
+    '/api/contratos/1?include=empresa,servicio',
+]
+
+
+def _selects(make_app, n, ruta):
+    app = make_app()
+    seed_contratos(app, n)
+    client = app.test_client()
+    with count_selects(app) as selects:
+        response = client.get(ruta)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        response.get_data()
+    return len(selects)
+
+
+@pytest.mark.parametrize('ruta', RUTAS)
+def test_selects_no_dependen_del_numero_de_contratos(make_app, ruta):
+    pocos = _selects(make_app, 3, ruta)
+    muchos = _selects(make_app, 40, ruta)
+    assert pocos == muchos, f'{ruta}: {pocos} SELECT con 3 contratos y {muchos} con 40'
+    assert muchos <= 3, f'{ruta}: {muchos} SELECT'
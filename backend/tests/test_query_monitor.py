@@ -0,0 +1,44 @@
+"""
+Modo estricto del detector de N+1 (DB_QUERY_CHECK_STRICT)
+Una petición que carga las relaciones de cada contrato en un bucle debe fallar
+con RepeatedQueryError; los listados con carga anticipada no deben fallar.
+"""
+import pytest
+from flask import jsonify
+from sqlalchemy import select
+from app.config.database import db
+from app.config.query_monitor import RepeatedQueryError
+from app.models.contrato import Contrato
+from tests.conftest import seed_contratos
+
+ESTRICTO = {'DB_REPEATED_QUERY_THRESHOLD': 5, 'DB_QUERY_CHECK_STRICT': 'true'}
+
+
+@pytest.fixture
+def strict_app(make_app):
+    app = make_app(**ESTRICTO)
+    # Con testing la excepción del modo estricto llega al cliente de pruebas en lugar de un 500
+    app.testing = True
+    seed_contratos(app, 20)
+    return app
+
+
+def test_n_mas_1_falla_en_modo_estricto(strict_app):
+    @strict_app.route('/pruebas/n-mas-1')
+    def n_mas_1():
+        # to_dict() carga empresa y servicio de cada contrato con una consulta por fila
+        return jsonify([contrato.to_dict() for contrato in db.session.scalars(select(Contrato))])
+
+    with pytest.raises(RepeatedQueryError, match='/pruebas/n-mas-1'):
+        strict_app.test_client().get('/pruebas/n-mas-1')
+
+
+@pytest.mark.parametrize('ruta', [
+    '/api/contratos',
+    '/api/contratos?limit=10',
+    '/api/contratos?include=empresa,servicio&sideload=true',
+])
+def test_listado_con_carga_anticipada_no_falla(strict_app, ruta):
+    response = strict_app.test_client().get(ruta)
+    assert response.status_code == 200
+    assert response.get_data()
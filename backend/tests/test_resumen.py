@@ -0,0 +1,84 @@
+"""
+Resumen de contratos por empresa
+Tras cada escritura (alta, modificación, cambio de empresa o de estado, lote,
+borrado de contratos y borrados en cascada de servicios y empresas) la tabla
+mantenida con deltas coincide con la que calcula ResumenRepository.rebuild().
+"""
+import datetime
+import pytest
+from sqlalchemy import select
+from app.config.database import db
+from app.models.resumen_empresa import ResumenEmpresa
+from app.repositories.resumen_repository import ResumenRepository
+from tests.conftest import seed_contratos
+
+_TABLA = ResumenEmpresa.__table__
+
+
+def _filas():
+    filas = db.session.execute(select(_TABLA).order_by(_TABLA.c.empresa_id)).all()
+    return [(f.empresa_id, f.contratos, f.contratos_activos, pytest.approx(f.total), pytest.approx(f.total_activos),
+             f.proxima_fecha_fin) for f in filas]
+
+
+def _assert_igual_a_rebuild(app):
+    with app.app_context():
+        incremental = _filas()
+        ResumenRepository.rebuild()
+        recalculado = _filas()
+        db.session.rollback()
+    assert incremental == recalculado
+
+
+def _fecha(dias):
+    return (datetime.date.today() + datetime.timedelta(days=dias)).isoformat()
+
+
+def _ok(response, status=200):
+    assert response.status_code == status, response.get_json()
+    return response.get_json()
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    seed_contratos(app, 4)
+    # seed_contratos escribe con el ORM directamente: el resumen de partida se calcula completo
+    with app.app_context():
+        ResumenRepository.rebuild()
+        db.session.commit()
+    return app
+
+
+def test_resumen_igual_a_rebuild_tras_cada_escritura(app):
+    client = app.test_client()
+    pasos = [
+        # Alta y modificación de importe y fecha
+        lambda: _ok(client.post('/api/contratos', json={
+            'empresa_id': 1, 'servicio_id': 2, 'fecha_inicio': _fecha(0), 'fecha_fin': _fecha(5),
+            'precio_final': 7.5}), 201),
+        lambda: _ok(client.put('/api/contratos/1', json={'precio_final': 99.0, 'fecha_fin': _fecha(3)})),
+        # Cambio de empresa: resta de la anterior y suma en la nueva
+        lambda: _ok(client.put('/api/contratos/2', json={'empresa_id': 3})),
+        # Cambios de estado, incluido el contrato con la próxima fecha de su empresa
+        lambda: _ok(client.put('/api/contratos/5', json={'estado': 'cancelado'})),
+        lambda: _ok(client.put('/api/contratos/3', json={'estado': 'finalizado'})),
+        lambda: _ok(client.put('/api/contratos/3', json={'estado': 'activo'})),
+        # Lote con altas, modificaciones (también de empresa) y borrados
+        lambda: _ok(client.post('/api/contratos/bulk', json={'mode': 'all_or_nothing', 'items': [
+            {'empresa_id': 2, 'servicio_id': 1, 'fecha_inicio': _fecha(0), 'fecha_fin': _fecha(1)},
+            {'op': 'create', 'data': {'empresa_id': 4, 'servicio_id': 3, 'fecha_inicio': _fecha(0)}},
+            {'op': 'update', 'id': 1, 'data': {'empresa_id': 4, 'estado': 'finalizado'}},
+            {'op': 'update', 'id': 4, 'data': {'precio_final': 1.25}},
+            {'op': 'delete', 'id': 3},
+        ]})),
+        lambda: _ok(client.delete('/api/contratos/4')),
+        # Borrados en cascada de un servicio y de empresas en ambos modos
+        lambda: _ok(client.delete('/api/servicios/1')),
+        lambda: _ok(client.delete('/api/empresas/3', query_string={'mode': 'orm'})),
+        lambda: _ok(client.delete('/api/empresas/4', query_string={'mode': 'cascade'})),
+    ]
+    _assert_igual_a_rebuild(app)
+    for paso in pasos:
+        paso()
+        _assert_igual_a_rebuild(app)
@@ -0,0 +1,51 @@
+"""
+Configuración y arranque
+AppSettings lee app.config de las variables de entorno, y una aplicación que
+arranca sobre un esquema ya en la última versión no ejecuta create_all (salvo
+con DB_SCHEMA_CHECK=always).
+"""
+from app.config.database import db
+from app.config.settings import AppSettings
+
+
+def test_valores_por_defecto_y_del_entorno():
+    assert AppSettings.from_env({}) == AppSettings()
+    settings = AppSettings.from_env({
+        'JOBS_WORKERS': '3', 'JOBS_POLL_INTERVAL': '0.5', 'METRICS_ENABLED': 'false', 'DB_AUTO_MIGRATE': 'true',
+        'ADMISSION_MAX_CONCURRENT': '8', 'CORS_ORIGINS': 'http://a,http://b', 'IDEMPOTENCY_STORE': 'memory',
+        'BULK_CHUNK_SIZE': '',
+    })
+    assert settings.jobs_workers == 3
+    assert settings.jobs_poll_interval == 0.5
+    assert settings.metrics_enabled is False
+    assert settings.db_auto_migrate is True
+    assert settings.admission_max_concurrent == 8
+    assert settings.idempotency_store == 'memory'
+    assert settings.bulk_chunk_size == 500
+    config = settings.to_config()
+    assert config['CORS_ORIGINS'] == ['http://a', 'http://b']
+    assert config['ADMISSION_MAX_CONCURRENT'] == 8
+    assert AppSettings().to_config()['ADMISSION_MAX_CONCURRENT'] is None
+
+
+def test_create_app_usa_la_configuracion(make_app):
+    app = make_app(JOBS_WORKERS=0, RATE_LIMIT_DEFAULT='5/10')
+    assert app.config['JOBS_WORKERS'] == 0
+    assert app.extensions['jobs'] is None
+    assert app.config['RATE_LIMIT_DEFAULT'] == '5/10'
+    assert app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] is False
+
+
+def test_esquema_actual_omite_create_all(make_app, monkeypatch, tmp_path):
+    uri = f"sqlite:///{tmp_path / 'actual.db'}"
+    make_app(SQLALCHEMY_DATABASE_URI=uri)
+
+    llamadas = []
+    create_all = db.create_all
+    monkeypatch.setattr(db, 'create_all', lambda *args, **kwargs: llamadas.append(1) or create_all(*args, **kwargs))
+    app = make_app(SQLALCHEMY_DATABASE_URI=uri)
+    assert llamadas == []
+    assert app.test_client().get('/api/empresas').status_code == 200
+
+    make_app(SQLALCHEMY_DATABASE_URI=uri, DB_SCHEMA_CHECK='always')
+    assert llamadas == [1]
@@ -32,5 +32,76 @@ CREATE TABLE IF NOT EXISTS contratos (
     FOREIGN KEY (servicio_id) REFERENCES servicios(id) ON DELETE CASCADE
 );
 
+-- Índices de contratos (migración 1): claves foráneas y filtros frecuentes.
+-- El índice compuesto también sirve para las búsquedas solo por empresa_id.
+CREATE INDEX IF NOT EXISTS ix_contratos_servicio_id ON contratos (servicio_id);
+CREATE INDEX IF NOT EXISTS ix_contratos_estado ON contratos (estado);
+CREATE INDEX IF NOT EXISTS ix_contratos_empresa_estado_fecha ON contratos (empresa_id, estado, fecha_inicio);
 
+-- Resumen de contratos por empresa (migración 3): totales mantenidos con deltas en la
+-- misma transacción que cada escritura de contratos
+CREATE TABLE IF NOT EXISTS resumen_empresas (
+    empresa_id INTEGER PRIMARY KEY,
+    contratos INTEGER NOT NULL DEFAULT 0,
+    contratos_activos INTEGER NOT NULL DEFAULT 0,
+    total REAL NOT NULL DEFAULT 0,
+    total_activos REAL NOT NULL DEFAULT 0,
+    proxima_fecha_fin DATE,
+    FOREIGN KEY (empresa_id) REFERENCES empresas(id) ON DELETE CASCADE
+);
+
+-- Respuestas guardadas por Idempotency-Key (migración 4). estado_http es NULL mientras
+-- la petición original está en curso; las filas se purgan a partir de expira_en
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    clave VARCHAR(400) PRIMARY KEY,
+    huella VARCHAR(64) NOT NULL,
+    estado_http INTEGER,
+    cuerpo BLOB,
+    content_type VARCHAR(100),
+    creada_en REAL NOT NULL,
+    expira_en REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_creada_en ON idempotency_keys (creada_en);
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expira_en ON idempotency_keys (expira_en);
+
+-- Registro de cambios para /api/changes (migración 5). AUTOINCREMENT: una secuencia nunca
+-- se reutiliza aunque se purguen las últimas filas (en PostgreSQL, seq es SERIAL)
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    entidad VARCHAR(20) NOT NULL,
+    entidad_id INTEGER NOT NULL,
+    op VARCHAR(10) NOT NULL,
+    creado_en REAL NOT NULL
+);
+
+-- Cola de trabajos en segundo plano (migración 6). Un worker toma el pendiente más antiguo
+-- con un UPDATE condicional sobre estado; parametros y resultado son JSON
+CREATE TABLE IF NOT EXISTS jobs (
+    id VARCHAR(32) PRIMARY KEY,
+    tipo VARCHAR(30) NOT NULL,
+    estado VARCHAR(12) NOT NULL DEFAULT 'queued',
+    parametros TEXT NOT NULL,
+    procesados INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    resultado TEXT,
+    error TEXT,
+    cancelar BOOLEAN NOT NULL DEFAULT 0,
+    worker VARCHAR(100),
+    creado_en REAL NOT NULL,
+    iniciado_en REAL,
+    terminado_en REAL,
+    expira_en REAL
+);
 
+-- Índices de la cola (migración 7): pendientes por orden de llegada y purga de caducados
+CREATE INDEX IF NOT EXISTS ix_jobs_estado_creado_en ON jobs (estado, creado_en);
+CREATE INDEX IF NOT EXISTS ix_jobs_creado_en ON jobs (creado_en);
+CREATE INDEX IF NOT EXISTS ix_jobs_expira_en ON jobs (expira_en);
+
+-- Control de versiones del esquema (lo mantiene app/config/migrations.py)
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    descripcion VARCHAR(200) NOT NULL,
+    aplicada_en FLOAT NOT NULL
+);
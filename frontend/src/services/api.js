@@ -13,6 +13,56 @@ const api = axios.create({
   },
 });
 
+// Peticiones condicionales: se guarda la última respuesta de cada GET junto con su ETag
+// y se envía If-None-Match; si el backend responde 304 se reutilizan los datos guardados.
+const etagCache = new Map();
+
+const cacheKey = (config) => api.getUri(config);
+
+api.interceptors.request.use((config) => {
+  if ((config.method || 'get').toLowerCase() === 'get') {
+    const cached = etagCache.get(cacheKey(config));
+    if (cached) {
+      config.headers['If-None-Match'] = cached.etag;
+    }
+    config.validateStatus = (status) => (status >= 200 && status < 300) || status === 304;
+  }
+  return config;
+});
+
+// Escrituras idempotentes: cada POST/PUT lleva una Idempotency-Key propia; si la misma
+// petición se reenvía (reintento tras un corte de red) el backend devuelve la respuesta guardada.
+const newIdempotencyKey = () => (
+  window.crypto && window.crypto.randomUUID
+    ? window.crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+);
+
+api.interceptors.request.use((config) => {
+  const method = (config.method || 'get').toLowerCase();
+  if ((method === 'post' || method === 'put') && !config.headers['Idempotency-Key']) {
+    config.headers['Idempotency-Key'] = newIdempotencyKey();
+  }
+  return config;
+});
+
+api.interceptors.response.use((response) => {
+  const { config } = response;
+  if ((config.method || 'get').toLowerCase() !== 'get') {
+    return response;
+  }
+  const key = cacheKey(config);
+  if (response.status === 304) {
+    const cached = etagCache.get(key);
+    return { ...response, status: 200, data: cached ? cached.data : response.data };
+  }
+  const etag = response.headers.etag;
+  if (etag) {
+    etagCache.set(key, { etag, data: response.data });
+  }
+  return response;
+});
+
 // Empresas API
 export const empresasAPI = {
   getAll: () => api.get('/empresas'),
@@ -40,6 +90,136 @@ export const contratosAPI = {
   delete: (id) => api.delete(`/contratos/${id}`),
 };
 
+// Trabajos en segundo plano: importaciones masivas y reportes pesados se encolan y se consulta
+// su estado (con el progreso) hasta que terminan; el resultado se pide aparte.
+export const jobsAPI = {
+  submit: (tipo, parametros) => api.post('/jobs', { tipo, parametros }),
+  getAll: (params) => api.get('/jobs', { params }),
+  getById: (id) => api.get(`/jobs/${id}`),
+  getResult: (id) => api.get(`/jobs/${id}/result`),
+  cancel: (id) => api.post(`/jobs/${id}/cancel`),
+};
+
+// Registro de cambios: las vistas cargan los listados una vez y después aplican los cambios
+// que publica el backend (stream SSE, o consultas periódicas si no hay EventSource o se
+// rechaza el stream) en lugar de volver a pedirlos completos.
+export const changesAPI = {
+  since: (seq, limit) => api.get('/changes', { params: { since: seq, limit } }),
+};
+
+const CHANGES_POLL_MS = 5000;
+
+const sortById = (list) => list.sort((a, b) => a.id - b.id);
+
+// Aplica un lote de /api/changes a un listado: los ids cambiados se sustituyen por su fila
+// actual y los que no aparecen en `rows` (eliminados) se quitan del listado.
+export const applyChanges = (list, entidad, { changes, rows }) => {
+  const ids = new Set(changes.filter((cambio) => cambio.entidad === entidad).map((cambio) => cambio.id));
+  if (ids.size === 0) {
+    return list;
+  }
+  const actuales = (rows && rows[entidad]) || {};
+  const resultado = list.filter((item) => !ids.has(item.id));
+  ids.forEach((id) => {
+    if (actuales[id]) {
+      resultado.push(actuales[id]);
+    }
+  });
+  return sortById(resultado);
+};
+
+// Inserta o sustituye una fila devuelta por una escritura propia sin esperar al registro de cambios
+export const upsertRow = (list, row) => sortById([...list.filter((item) => item.id !== row.id), row]);
+
+export const removeRow = (list, id) => list.filter((item) => item.id !== id);
+
+// Lee la última secuencia, ejecuta `load` (la carga completa) y sigue el registro desde esa
+// secuencia llamando a `onChanges` con cada lote. Si la secuencia caduca (410 o evento reset)
+// vuelve a cargar. Devuelve la función que deja de seguir los cambios.
+export const followChanges = (load, onChanges) => {
+  let cerrado = false;
+  let fuente = null;
+  let temporizador = null;
+  let seq = null;
+
+  const detener = () => {
+    if (fuente) {
+      fuente.close();
+      fuente = null;
+    }
+    clearTimeout(temporizador);
+  };
+
+  const aplicar = (payload) => {
+    seq = payload.last_seq;
+    if (payload.changes.length > 0) {
+      onChanges(payload);
+    }
+  };
+
+  const sondear = async () => {
+    try {
+      let more = true;
+      while (more && !cerrado) {
+        const { data } = await changesAPI.since(seq);
+        aplicar(data);
+        more = data.more;
+      }
+    } catch (err) {
+      if (err.response?.status === 410) {
+        reiniciar();
+        return;
+      }
+    }
+    if (!cerrado) {
+      temporizador = setTimeout(sondear, CHANGES_POLL_MS);
+    }
+  };
+
+  const escuchar = () => {
+    if (!window.EventSource) {
+      sondear();
+      return;
+    }
+    // Al reconectar, EventSource envía Last-Event-ID y el backend continúa desde esa secuencia
+    fuente = new EventSource(`${API_BASE_URL}/changes/stream?since=${seq}`);
+    fuente.addEventListener('changes', (evento) => aplicar(JSON.parse(evento.data)));
+    fuente.addEventListener('reset', reiniciar);
+    fuente.onerror = () => {
+      if (fuente && fuente.readyState === window.EventSource.CLOSED) {
+        fuente = null;
+        sondear();
+      }
+    };
+  };
+
+  const iniciar = async () => {
+    try {
+      const { data } = await changesAPI.since();
+      seq = data.last_seq;
+    } catch (err) {
+      seq = null;
+    }
+    await load();
+    if (!cerrado && seq !== null) {
+      escuchar();
+    }
+  };
+
+  function reiniciar() {
+    detener();
+    if (!cerrado) {
+      iniciar();
+    }
+  }
+
+  iniciar();
+  return () => {
+    cerrado = true;
+    detener();
+  };
+};
+
 export default api;
 
 
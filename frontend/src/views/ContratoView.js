@@ -3,7 +3,9 @@
  * Componente React que representa la vista de gestión de contratos
  */
 import React, { useState, useEffect } from 'react';
-import { contratosAPI, empresasAPI, serviciosAPI } from '../services/api';
+import {
+  contratosAPI, empresasAPI, serviciosAPI, applyChanges, followChanges, upsertRow, removeRow,
+} from '../services/api';
 
 const ContratoView = () => {
   const [contratos, setContratos] = useState([]);
@@ -22,9 +24,15 @@ const ContratoView = () => {
     precio_final: '',
   });
 
-  useEffect(() => {
-    loadData();
-  }, []);
+  useEffect(() => (
+    // Carga inicial y, después, solo los cambios publicados por el backend (los contratos
+    // eliminados en cascada al borrar una empresa o un servicio llegan como cambios propios)
+    followChanges(loadData, (cambios) => {
+      setContratos((prev) => applyChanges(prev, 'contratos', cambios));
+      setEmpresas((prev) => applyChanges(prev, 'empresas', cambios));
+      setServicios((prev) => applyChanges(prev, 'servicios', cambios));
+    })
+  ), []);
 
   const loadData = async () => {
     try {
@@ -80,15 +88,16 @@ const ContratoView = () => {
       };
       
       if (editingId) {
-        await contratosAPI.update(editingId, data);
+        const response = await contratosAPI.update(editingId, data);
+        setContratos((prev) => upsertRow(prev, response.data));
         setSuccess('Contrato actualizado correctamente');
       } else {
-        await contratosAPI.create(data);
+        const response = await contratosAPI.create(data);
+        setContratos((prev) => upsertRow(prev, response.data));
         setSuccess('Contrato creado correctamente');
       }
       
       resetForm();
-      loadData();
     } catch (err) {
       setError(err.response?.data?.error || 'Error al guardar contrato');
     }
@@ -115,8 +124,8 @@ const ContratoView = () => {
     try {
       setError(null);
       await contratosAPI.delete(id);
+      setContratos((prev) => removeRow(prev, id));
       setSuccess('Contrato eliminado correctamente');
-      loadData();
     } catch (err) {
       setError(err.response?.data?.error || 'Error al eliminar contrato');
     }
@@ -3,7 +3,7 @@
  * Componente React que representa la vista de gestión de empresas
  */
 import React, { useState, useEffect } from 'react';
-import { empresasAPI } from '../services/api';
+import { empresasAPI, applyChanges, followChanges, upsertRow, removeRow } from '../services/api';
 
 const EmpresaView = () => {
   const [empresas, setEmpresas] = useState([]);
@@ -18,9 +18,10 @@ const EmpresaView = () => {
     email: '',
   });
 
-  useEffect(() => {
-    loadEmpresas();
-  }, []);
+  useEffect(() => (
+    // Carga inicial y, después, solo los cambios publicados por el backend
+    followChanges(loadEmpresas, (cambios) => setEmpresas((prev) => applyChanges(prev, 'empresas', cambios)))
+  ), []);
 
   const loadEmpresas = async () => {
     try {
@@ -49,15 +50,16 @@ const EmpresaView = () => {
       setSuccess(null);
       
       if (editingId) {
-        await empresasAPI.update(editingId, formData);
+        const response = await empresasAPI.update(editingId, formData);
+        setEmpresas((prev) => upsertRow(prev, response.data));
         setSuccess('Empresa actualizada correctamente');
       } else {
-        await empresasAPI.create(formData);
+        const response = await empresasAPI.create(formData);
+        setEmpresas((prev) => upsertRow(prev, response.data));
         setSuccess('Empresa creada correctamente');
       }
       
       resetForm();
-      loadEmpresas();
     } catch (err) {
       setError(err.response?.data?.error || 'Error al guardar empresa');
     }
@@ -82,8 +84,8 @@ const EmpresaView = () => {
     try {
       setError(null);
       await empresasAPI.delete(id);
+      setEmpresas((prev) => removeRow(prev, id));
       setSuccess('Empresa eliminada correctamente');
-      loadEmpresas();
     } catch (err) {
       setError(err.response?.data?.error || 'Error al eliminar empresa');
     }
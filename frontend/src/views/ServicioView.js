@@ -3,7 +3,7 @@
  * Componente React que representa la vista de gestión de servicios
  */
 import React, { useState, useEffect } from 'react';
-import { serviciosAPI } from '../services/api';
+import { serviciosAPI, applyChanges, followChanges, upsertRow, removeRow } from '../services/api';
 
 const ServicioView = () => {
   const [servicios, setServicios] = useState([]);
@@ -18,9 +18,10 @@ const ServicioView = () => {
     duracion_horas: '',
   });
 
-  useEffect(() => {
-    loadServicios();
-  }, []);
+  useEffect(() => (
+    // Carga inicial y, después, solo los cambios publicados por el backend
+    followChanges(loadServicios, (cambios) => setServicios((prev) => applyChanges(prev, 'servicios', cambios)))
+  ), []);
 
   const loadServicios = async () => {
     try {
@@ -55,15 +56,16 @@ const ServicioView = () => {
       };
       
       if (editingId) {
-        await serviciosAPI.update(editingId, data);
+        const response = await serviciosAPI.update(editingId, data);
+        setServicios((prev) => upsertRow(prev, response.data));
         setSuccess('Servicio actualizado correctamente');
       } else {
-        await serviciosAPI.create(data);
+        const response = await serviciosAPI.create(data);
+        setServicios((prev) => upsertRow(prev, response.data));
         setSuccess('Servicio creado correctamente');
       }
       
       resetForm();
-      loadServicios();
     } catch (err) {
       setError(err.response?.data?.error || 'Error al guardar servicio');
     }
@@ -88,8 +90,8 @@ const ServicioView = () => {
     try {
       setError(null);
       await serviciosAPI.delete(id);
+      setServicios((prev) => removeRow(prev, id));
       setSuccess('Servicio eliminado correctamente');
-      loadServicios();
     } catch (err) {
       setError(err.response?.data?.error || 'Error al eliminar servicio');
     }
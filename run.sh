@@ -174,7 +174,7 @@ run_backend() {
     source venv/bin/activate 2>/dev/null || source venv/Scripts/activate 2>/dev/null
     
     echo -e "${GREEN}Iniciando servidor Flask en http://localhost:5001${NC}"
-    PORT=5001 python3 run.py 2>/dev/null || PORT=5001 python run.py
+    FLASK_ENV=development PORT=5001 python3 run.py 2>/dev/null || FLASK_ENV=development PORT=5001 python run.py
     
     cd ..
 }